@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+CT-085 batch classification benchmark
+
+Classifies synthetic Modbus devices (unique register text, so nothing is
+served from the classification cache) one at a time with classify_device
+and in batches with classify_many at 1, 2 and 4 worker processes. Reports
+devices per second and the worst event loop stall seen by a 10 ms ticker,
+which is the delay network I/O would have suffered during classification.
+
+Usage:
+    python3 benchmark_batch_classification.py --devices 2000 --workers 1 2 4
+"""
+
+import sys
+import time
+import random
+import asyncio
+import argparse
+import logging
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from device_classifier import DeviceClassifier
+
+TICK = 0.01
+VENDORS = ['ALLEN-BRADLEY CONTROLLOGIX', 'SCHNEIDER MODICON M340', 'SIEMENS SIMATIC S7-1500',
+           'OMRON SYSMAC NJ', 'DANFOSS VLT DRIVE', 'ABB ACS880 VFD', 'EMERSON FLOW METER']
+AREAS = ['TANK', 'PUMP', 'BOILER', 'LINE', 'MIXER', 'REACTOR', 'VALVE', 'MOTOR', 'CONVEYOR']
+MEASUREMENTS = ['TEMP', 'PRESSURE', 'FLOW', 'LEVEL', 'SPEED', 'CURRENT', 'POSITION']
+SUFFIXES = ['PV', 'SP', 'CV', 'HIGH_ALARM', 'FAULT', 'STATUS', 'BATCH_COUNT', 'GAIN', 'SAFETY_SHUTDOWN']
+
+def synthetic_devices(count: int, seed: int = 85):
+    rng = random.Random(seed)
+    devices = []
+    for index in range(count):
+        registers = [{'address': 0, 'ascii': f"{rng.choice(VENDORS)} SN{index:06d}"}]
+        for address in range(1, 21):
+            tag = f"{rng.choice(AREAS)}_{rng.randint(1, 99):02d}_{rng.choice(MEASUREMENTS)}_{rng.choice(SUFFIXES)}"
+            registers.append({'address': address * 10, 'ascii': tag})
+        devices.append({
+            'ip_address': f"10.{index // 65536 % 256}.{index // 256 % 256}.{index % 256}",
+            'port': 502,
+            'protocol': 'modbus',
+            'capabilities': ['holding_registers', 'input_registers'],
+            'registers_found': registers,
+            'manufacturer_detection': {}
+        })
+    return devices
+
+async def loop_lag_monitor(stop: asyncio.Event) -> float:
+    """Largest delay between scheduled 10 ms ticks"""
+    worst = 0.0
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(TICK)
+        worst = max(worst, time.perf_counter() - start - TICK)
+    return worst
+
+async def run_mode(devices, workers):
+    classifier = DeviceClassifier(process_workers=workers or 0)
+    if workers:
+        # Start the pool (and build each worker's pattern indexes) outside the timed region
+        await asyncio.gather(*(classifier._classify_batch([]) for _ in range(workers)))
+
+    stop = asyncio.Event()
+    monitor = asyncio.create_task(loop_lag_monitor(stop))
+    await asyncio.sleep(TICK)
+
+    start = time.perf_counter()
+    if workers is None:
+        results = [await classifier.classify_device(device) for device in devices]
+    else:
+        results = [None] * len(devices)
+        async for index, result in classifier.classify_many(devices):
+            results[index] = result
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    lag = await monitor
+    classifier.shutdown()
+
+    assert all(result and result['manufacturer'] for result in results), "Missing classification results"
+    assert classifier.cache_stats['hits'] == 0, "Synthetic devices should not hit the cache"
+    return elapsed, lag, results
+
+async def run_benchmark(device_count: int, worker_counts):
+    devices = synthetic_devices(device_count)
+    modes = [('inline', None)] + [(f"{workers} worker{'s' if workers > 1 else ''}", workers) for workers in worker_counts]
+
+    timings = {}
+    baseline = None
+    for label, workers in modes:
+        elapsed, lag, results = await run_mode(devices, workers)
+        if baseline is None:
+            baseline = results
+        else:
+            assert results == baseline, f"{label} results differ from inline classification"
+        timings[label] = (elapsed, lag)
+
+    print(f"Batch classification benchmark: {device_count} unique devices, results identical across modes")
+    for label, (elapsed, lag) in timings.items():
+        print(f"  {label:<10} {elapsed * 1000:9.1f} ms  {device_count / elapsed:9,.0f} devices/s  "
+              f"max loop stall {lag * 1000:8.1f} ms")
+    return timings
+
+def main():
+    parser = argparse.ArgumentParser(description="CT-085 batch classification benchmark")
+    parser.add_argument("--devices", type=int, default=2000, help="Number of synthetic devices")
+    parser.add_argument("--workers", type=int, nargs='+', default=[1, 2, 4], help="Worker process counts")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    asyncio.run(run_benchmark(args.devices, args.workers))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+CT-085 tag classification microbenchmark
+
+Classifies synthetic industrial tag names with the DeviceClassifier
+pattern index and with the previous per-pattern re.search approach,
+checks that both agree on every tag, and reports tags per second. Run it
+after changing the pattern tables to catch throughput regressions.
+
+Usage:
+    python3 benchmark_tag_classification.py --tags 10000 --repeat 3
+"""
+
+import re
+import sys
+import time
+import random
+import asyncio
+import argparse
+import logging
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from device_classifier import DeviceClassifier
+
+AREAS = ['TANK', 'PUMP', 'BOILER', 'LINE', 'MIXER', 'REACTOR', 'VALVE', 'MOTOR', 'CONVEYOR', 'COMPRESSOR']
+MEASUREMENTS = ['TEMP', 'TEMPERATURE', 'PRESSURE', 'PRESS', 'FLOW', 'LEVEL', 'SPEED', 'CURRENT', 'POSITION', 'PH']
+SUFFIXES = ['PV', 'SP', 'CV', 'ALARM', 'HIGH_ALARM', 'FAULT', 'STATUS', 'RUNNING', 'COUNT', 'BATCH_COUNT',
+            'TOTAL', 'CONFIG', 'GAIN', 'OFFSET', 'TIMER', 'SETPOINT', 'ENABLE', 'MODE', 'TRIP',
+            'SAFETY_SHUTDOWN', 'MESSAGE_TEXT', 'PCT_OPEN', 'CYCLE_TIME']
+
+def synthetic_tags(count: int, seed: int = 85):
+    rng = random.Random(seed)
+    tags = []
+    for _ in range(count):
+        parts = [rng.choice(AREAS), f"{rng.randint(1, 99):02d}"]
+        if rng.random() < 0.8:
+            parts.append(rng.choice(MEASUREMENTS))
+        parts.append(rng.choice(SUFFIXES))
+        tags.append('_'.join(parts))
+    return tags
+
+def first_label(table, tag_lower, default):
+    for label, patterns in table.items():
+        if any(re.search(pattern, tag_lower) for pattern in patterns):
+            return label
+    return default
+
+def legacy_attributes(classifier: DeviceClassifier, tag_name: str):
+    """Tag attributes computed pattern-by-pattern, as before the index"""
+    tag_lower = tag_name.lower()
+    scores = {}
+    for purpose, patterns in classifier.TAG_PURPOSE_PATTERNS.items():
+        score = sum(1 for pattern in patterns if re.search(pattern, tag_lower))
+        if score > 0:
+            scores[purpose] = score / len(patterns)
+    purpose = max(scores, key=scores.get) if scores else 'Unknown'
+    confidence = scores[purpose] if scores else 0.1
+
+    category = 'General'
+    if purpose in ['Process Variable', 'Setpoint', 'Control Output']:
+        category = first_label(classifier.TAG_CATEGORY_PATTERNS, tag_lower, 'Process Control')
+    elif purpose in ['Alarm', 'Status']:
+        category = 'Monitoring'
+    elif purpose == 'Counter':
+        category = 'Production Tracking'
+    elif purpose == 'Configuration':
+        category = 'System Configuration'
+
+    criticality = first_label(classifier.CRITICALITY_PATTERNS, tag_lower, None)
+    if criticality is None:
+        criticality = 'Medium' if purpose in ['Process Variable', 'Control Output'] else 'Low'
+
+    frequency = {'Alarm': 'Event-driven', 'Status': 'Event-driven', 'Counter': 'On-change',
+                 'Configuration': 'Static'}.get(purpose, 'Unknown')
+    if purpose == 'Process Variable':
+        frequency = first_label(classifier.UPDATE_FREQUENCY_PATTERNS, tag_lower, 'Medium (1-5 sec)')
+
+    return (purpose, confidence,
+            first_label(classifier.DATA_TYPE_PATTERNS, tag_lower, 'UNKNOWN'),
+            first_label(classifier.UNIT_PATTERNS, tag_lower, 'dimensionless'),
+            category, criticality, frequency)
+
+def indexed_attributes(classifier: DeviceClassifier, tag_name: str):
+    """Tag attributes from one pattern index scan"""
+    hits = classifier.tag_index.match_counts(tag_name)
+    purpose, confidence = classifier._classify_tag_purpose(tag_name, hits)
+    return (purpose, confidence,
+            classifier._infer_data_type(tag_name, hits),
+            classifier._infer_units(tag_name, hits),
+            classifier._determine_tag_category(tag_name, purpose, hits),
+            classifier._assess_tag_criticality(tag_name, purpose, hits),
+            classifier._estimate_update_frequency(tag_name, purpose, hits))
+
+def timed(func, tags, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for tag in tags:
+            func(tag)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+async def analyze_all(classifier: DeviceClassifier, tags):
+    for tag in tags:
+        await classifier._analyze_single_tag(tag)
+
+def run_benchmark(tag_count: int, repeat: int):
+    classifier = DeviceClassifier()
+    tags = synthetic_tags(tag_count)
+
+    mismatches = [tag for tag in tags if legacy_attributes(classifier, tag) != indexed_attributes(classifier, tag)]
+    assert not mismatches, f"Index disagrees with per-pattern search on {len(mismatches)} tags, e.g. {mismatches[:3]}"
+
+    results = {
+        'per_pattern': timed(lambda tag: legacy_attributes(classifier, tag), tags, repeat),
+        'indexed': timed(lambda tag: indexed_attributes(classifier, tag), tags, repeat),
+    }
+
+    start = time.perf_counter()
+    asyncio.run(analyze_all(classifier, tags))
+    full_analysis = time.perf_counter() - start
+
+    print(f"Tag classification benchmark: {tag_count} synthetic tags, best of {repeat}, outputs identical")
+    for mode, elapsed in results.items():
+        print(f"  {mode:<12} {elapsed * 1000:9.1f} ms  {tag_count / elapsed:12,.0f} tags/s")
+    print(f"  speedup      {results['per_pattern'] / results['indexed']:9.2f}x")
+    print(f"  _analyze_single_tag {full_analysis * 1000:9.1f} ms  {tag_count / full_analysis:12,.0f} tags/s")
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="CT-085 tag classification microbenchmark")
+    parser.add_argument("--tags", type=int, default=10000, help="Number of synthetic tag names")
+    parser.add_argument("--repeat", type=int, default=3, help="Timing repetitions (best is reported)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    run_benchmark(args.tags, args.repeat)
+
+if __name__ == "__main__":
+    main()
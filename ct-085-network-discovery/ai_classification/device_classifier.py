@@ -8,19 +8,180 @@ using machine learning models and semantic analysis techniques.
 """
 
 import asyncio
+import copy
+import hashlib
 import json
 import logging
 import re
 import pickle
+from bisect import bisect_left
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from typing import Dict, List, Optional, Tuple, Any
 from datetime import datetime
 from dataclasses import dataclass
 import numpy as np
-from collections import defaultdict
+from collections import defaultdict, deque, OrderedDict
 import sqlite3
 
 logger = logging.getLogger(__name__)
 
+class PatternIndex:
+    """
+    Precompiled keyword index that scores every pattern category in one scan
+    
+    Patterns are literal keywords, optionally chained with '.*' (e.g.
+    'set.*point'). All keywords are combined into a single case-insensitive
+    alternation inside a lookahead, longest first, so one regex pass finds
+    every keyword occurrence; shorter keywords starting at the same position
+    are recovered from precomputed prefix lists. Chained patterns are then
+    checked against the occurrence positions, line by line since '.' does
+    not match a newline, giving the same result as re.search per pattern
+    without rescanning the text. Patterns using other
+    regex syntax fall back to a precompiled per-pattern search.
+    """
+    
+    REGEX_METACHARACTERS = set('.^$*+?{}[]\\|()')
+    
+    def __init__(self, categories: Dict[Any, List[str]]):
+        """Build the index from {category: [pattern, ...]}"""
+        self.categories = list(categories)
+        self.chains_by_keyword: Dict[str, List[Tuple[Any, int, Tuple[str, ...]]]] = defaultdict(list)
+        self.fallback: List[Tuple[Any, int, re.Pattern]] = []
+        self.chain_patterns: Dict[Tuple[Any, int], re.Pattern] = {}  # full regex for first_match text
+        
+        keywords = set()
+        for category, patterns in categories.items():
+            for position, pattern in enumerate(patterns):
+                segments = tuple(segment.lower() for segment in pattern.split('.*'))
+                if all(segments) and not any(self.REGEX_METACHARACTERS & set(segment) for segment in segments):
+                    self.chains_by_keyword[segments[0]].append((category, position, segments))
+                    keywords.update(segments)
+                    if len(segments) > 1:
+                        self.chain_patterns[(category, position)] = re.compile(pattern, re.IGNORECASE)
+                else:
+                    self.fallback.append((category, position, re.compile(pattern, re.IGNORECASE)))
+        
+        ordered = sorted(keywords, key=lambda keyword: (-len(keyword), keyword))
+        self.scanner = re.compile('(?=(' + self._trie_pattern(ordered) + '))', re.IGNORECASE) if ordered else None
+        self.prefixes = {keyword: [other for other in ordered if keyword.startswith(other)] for keyword in ordered}
+    
+    @classmethod
+    def _trie_pattern(cls, keywords: List[str]) -> str:
+        """
+        Regex alternation structured as a prefix trie, so the engine follows
+        one branch per character and greedily returns the longest keyword
+        """
+        trie: Dict[str, Dict] = {}
+        for keyword in keywords:
+            node = trie
+            for char in keyword:
+                node = node.setdefault(char, {})
+            node[''] = {}  # end of keyword
+        return cls._trie_node_pattern(trie)
+    
+    @classmethod
+    def _trie_node_pattern(cls, node: Dict[str, Dict]) -> str:
+        branches = [re.escape(char) + cls._trie_node_pattern(child)
+                    for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        pattern = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        if '' in node:
+            # Keyword ends here; a longer keyword through this node is tried first
+            pattern = ('(?:' + pattern + ')?') if len(branches) == 1 and len(pattern) > 1 else pattern + '?'
+        return pattern
+    
+    def _occurrences(self, text: str) -> Dict[str, List[int]]:
+        """Sorted start positions of every keyword in text"""
+        found: Dict[str, List[int]] = defaultdict(list)
+        if self.scanner is None:
+            return found
+        for match in self.scanner.finditer(text):
+            start = match.start()
+            for keyword in self.prefixes.get(match.group(1).lower(), ()):
+                found[keyword].append(start)
+        return found
+    
+    def _line_occurrences(self, text: str) -> List[Tuple[int, Dict[str, List[int]]]]:
+        """(line offset, keyword occurrences) per line; one entry when text has no newline"""
+        if '\n' not in text:
+            return [(0, self._occurrences(text))]
+        lines = []
+        offset = 0
+        for line in text.split('\n'):
+            lines.append((offset, self._occurrences(line)))
+            offset += len(line) + 1
+        return lines
+    
+    def _line_chain_span(self, segments: Tuple[str, ...],
+                         lines: List[Tuple[int, Dict[str, List[int]]]]) -> Optional[Tuple[int, int]]:
+        """Span of the leftmost chain match that lies within a single line"""
+        for offset, found in lines:
+            span = self._chain_span(segments, found)
+            if span is not None:
+                return span[0] + offset, span[1] + offset
+        return None
+    
+    @staticmethod
+    def _chain_span(segments: Tuple[str, ...], found: Dict[str, List[int]]) -> Optional[Tuple[int, int]]:
+        """Span of the first segment of the leftmost match of a keyword chain, if any"""
+        span = None
+        position = 0
+        for segment in segments:
+            starts = found.get(segment)
+            if not starts:
+                return None
+            index = bisect_left(starts, position)
+            if index == len(starts):
+                return None
+            if span is None:
+                span = (starts[index], starts[index] + len(segment))
+            position = starts[index] + len(segment)
+        return span
+    
+    def _matches(self, text: str) -> Dict[Any, Dict[int, Tuple[int, int]]]:
+        """{category: {pattern position: first-segment span}} for matching patterns"""
+        matches: Dict[Any, Dict[int, Tuple[int, int]]] = defaultdict(dict)
+        lines = self._line_occurrences(text)
+        for keyword in {keyword for _, found in lines for keyword in found}:
+            for category, position, segments in self.chains_by_keyword.get(keyword, ()):
+                span = self._line_chain_span(segments, lines)
+                if span is not None:
+                    matches[category][position] = span
+        for category, position, pattern in self.fallback:
+            match = pattern.search(text)
+            if match:
+                matches[category][position] = match.span()
+        return matches
+    
+    def match_counts(self, text: str) -> Dict[Any, int]:
+        """Number of matching patterns per category (categories without matches omitted)"""
+        counts: Dict[Any, int] = {}
+        lines = self._line_occurrences(text)
+        for keyword in {keyword for _, found in lines for keyword in found}:
+            for category, position, segments in self.chains_by_keyword.get(keyword, ()):
+                # Single-keyword patterns match by occurring at all
+                if len(segments) == 1 or self._line_chain_span(segments, lines) is not None:
+                    counts[category] = counts.get(category, 0) + 1
+        for category, position, pattern in self.fallback:
+            if pattern.search(text):
+                counts[category] = counts.get(category, 0) + 1
+        return counts
+    
+    def first_match(self, text: str, category: Any) -> Optional[str]:
+        """Text matched by the first pattern of a category (declaration order) that matches"""
+        positions = self._matches(text).get(category)
+        if not positions:
+            return None
+        position = min(positions)
+        chain = self.chain_patterns.get((category, position))
+        if chain is not None:
+            # The index knows which pattern matched; re gives its greedy extent
+            return chain.search(text).group(0)
+        start, end = positions[position]
+        return text[start:end]
+
 @dataclass
 class TagAnalysis:
     """Data class for analyzed industrial tag information"""
@@ -116,6 +277,45 @@ class DeviceClassifier:
         ]
     }
     
+    # Tag attribute patterns, checked in declaration order (first match wins)
+    DATA_TYPE_PATTERNS = {
+        'REAL': [r'temp', r'pressure', r'flow', r'level', r'speed', r'rate'],
+        'INT': [r'count', r'total', r'batch', r'cycle'],
+        'BOOL': [r'running', r'stopped', r'alarm', r'fault', r'enable'],
+        'STRING': [r'name', r'description', r'message', r'text']
+    }
+    
+    UNIT_PATTERNS = {
+        'degC': [r'temp', r'temperature'],
+        'bar': [r'pressure', r'press'],
+        'L/min': [r'flow'],
+        'mm': [r'level', r'position'],
+        'rpm': [r'speed', r'motor'],
+        '%': [r'percent', r'pct', r'valve'],
+        'count': [r'count', r'total', r'batch'],
+        'seconds': [r'time', r'timer']
+    }
+    
+    TAG_CATEGORY_PATTERNS = {
+        'Temperature Control': [r'temp', r'temperature'],
+        'Pressure Control': [r'pressure', r'press'],
+        'Flow Control': [r'flow'],
+        'Level Control': [r'level']
+    }
+    
+    CRITICALITY_PATTERNS = {
+        'Critical': [r'safety', r'emergency', r'critical', r'shutdown', r'trip'],
+        'High': [r'alarm', r'fault', r'error', r'warning']
+    }
+    
+    UPDATE_FREQUENCY_PATTERNS = {
+        'Slow (1-10 sec)': [r'temp', r'temperature', r'pressure'],
+        'Fast (100ms-1sec)': [r'flow', r'speed', r'current']
+    }
+    
+    # Tag-like tokens in register ASCII data (e.g. "TAG_NAME", "PV_01")
+    TAG_TOKEN_PATTERN = re.compile(r'[A-Z][A-Z0-9_]{2,}')
+    
     # Manufacturer identification patterns
     MANUFACTURER_SIGNATURES = {
         'Allen-Bradley': {
@@ -144,19 +344,157 @@ class DeviceClassifier:
         }
     }
     
-    def __init__(self):
-        """Initialize the AI device classifier"""
-        self.classification_cache = {}
+    # Register text kept per learning entry (matches the tags analyzed per device)
+    LEARNING_TEXT_LIMIT = 20
+    
+    def __init__(self, database=None, cache_size: int = 4096, process_workers: int = 2,
+                 learning_window: int = 1000):
+        """
+        Initialize the AI device classifier
+        
+        Args:
+            database: Optional DiscoveryDatabase used to persist the classification cache
+            cache_size: Maximum in-memory cached classifications (LRU)
+            process_workers: Worker processes used by classify_many (0 classifies inline)
+            learning_window: Recent learning entries kept in memory per device type
+        """
+        # Classification results keyed by feature fingerprint, least recently used first
+        self.classification_cache: OrderedDict = OrderedDict()
+        self.cache_size = cache_size
+        self.cache_stats = {'hits': 0, 'misses': 0, 'persistent_hits': 0, 'evictions': 0}
+        self.inflight_classifications: Dict[str, asyncio.Future] = {}
+        self.device_classifications = {}  # ip:port -> latest classification result
+        self.database = database
+        self.process_workers = process_workers
+        self.executor = None  # Created on first classify_many batch
         self.tag_database = {}
-        self.learning_data = defaultdict(list)
+        # Bounded per-type windows; the full history goes to the database learning log
+        self.learning_window = learning_window
+        self.learning_data: Dict[str, deque] = defaultdict(lambda: deque(maxlen=self.learning_window))
+        self.pending_learning_entries: List[Dict[str, Any]] = []
         self.confidence_threshold = 0.7
         
+        # Precompiled pattern indexes: one scan of a text scores every category
+        self.device_type_index = PatternIndex(self.DEVICE_TYPE_PATTERNS)
+        self.manufacturer_index = PatternIndex({
+            (manufacturer, kind): signature[kind]
+            for manufacturer, signature in self.MANUFACTURER_SIGNATURES.items()
+            for kind in ('tag_patterns', 'model_patterns')
+        })
+        self.tag_index = PatternIndex({
+            (group, label): patterns
+            for group, table in [('purpose', self.TAG_PURPOSE_PATTERNS),
+                                 ('data_type', self.DATA_TYPE_PATTERNS),
+                                 ('units', self.UNIT_PATTERNS),
+                                 ('category', self.TAG_CATEGORY_PATTERNS),
+                                 ('criticality', self.CRITICALITY_PATTERNS),
+                                 ('update_frequency', self.UPDATE_FREQUENCY_PATTERNS)]
+            for label, patterns in table.items()
+        })
+        
+        # Cache keys include a digest of the pattern tables, so rule changes invalidate old entries
+        self.rules_digest = self._rules_digest()
+        if self.database is not None:
+            self._warm_classification_cache()
+        
         # Load pre-trained models (in a real implementation, these would be actual ML models)
         self.device_embeddings = self._load_device_embeddings()
         self.tag_embeddings = self._load_tag_embeddings()
         
         logger.info("AI Device Classifier initialized successfully")
     
+    def _rules_digest(self) -> str:
+        """Digest of the pattern tables that drive classification"""
+        rules = [self.DEVICE_TYPE_PATTERNS, self.TAG_PURPOSE_PATTERNS, self.DATA_TYPE_PATTERNS,
+                 self.UNIT_PATTERNS, self.TAG_CATEGORY_PATTERNS, self.CRITICALITY_PATTERNS,
+                 self.UPDATE_FREQUENCY_PATTERNS, self.MANUFACTURER_SIGNATURES]
+        return hashlib.sha256(json.dumps(rules, sort_keys=True).encode()).hexdigest()[:16]
+    
+    def _warm_classification_cache(self):
+        """Load the most recently used persisted classifications into memory"""
+        try:
+            for fingerprint, result in self.database.load_cached_classifications(self.cache_size):
+                self.classification_cache[fingerprint] = result
+            logger.info(f"Loaded {len(self.classification_cache)} cached classifications")
+        except Exception as e:
+            logger.error(f"Failed to load classification cache: {e}")
+    
+    def _feature_fingerprint(self, features: Dict[str, Any]) -> str:
+        """Content hash of the features classification depends on (not the address)"""
+        key = {
+            'rules': self.rules_digest,
+            'protocol': features['protocol'],
+            'port': features['port'],
+            'capabilities': features['capabilities'],
+            'ascii_data': features['ascii_data'],
+            'manufacturer_detection': features['manufacturer_detection'],
+            'vendor_ids': features.get('vendor_ids', {})
+        }
+        return hashlib.sha256(json.dumps(key, sort_keys=True, default=str).encode()).hexdigest()
+    
+    async def _lookup_cached_classification(self, fingerprint: str) -> Optional[Dict[str, Any]]:
+        """Cached result from memory or from a classification already in flight"""
+        result = self.classification_cache.get(fingerprint)
+        if result is not None:
+            self.classification_cache.move_to_end(fingerprint)
+            self.cache_stats['hits'] += 1
+            return result
+        
+        pending = self.inflight_classifications.get(fingerprint)
+        if pending is not None:
+            result = await pending
+            if result is not None:
+                self.cache_stats['hits'] += 1
+                return result
+        
+        return None
+    
+    async def _load_persisted_classification(self, fingerprint: str) -> Optional[Dict[str, Any]]:
+        """Cached result evicted from memory or stored by an earlier run"""
+        if self.database is None:
+            return None
+        try:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(None, self.database.get_cached_classification, fingerprint)
+        except Exception as e:
+            logger.error(f"Classification cache lookup failed: {e}")
+            return None
+        if result is not None:
+            self.cache_stats['hits'] += 1
+            self.cache_stats['persistent_hits'] += 1
+        return result
+    
+    def _remember_classification(self, fingerprint: str, result: Dict[str, Any]):
+        """Insert into the in-memory LRU, evicting the least recently used entries"""
+        self.classification_cache[fingerprint] = result
+        self.classification_cache.move_to_end(fingerprint)
+        while len(self.classification_cache) > self.cache_size:
+            self.classification_cache.popitem(last=False)
+            self.cache_stats['evictions'] += 1
+    
+    async def _persist_classification(self, fingerprint: str, result: Dict[str, Any]):
+        """Write a new classification to the database cache"""
+        if self.database is None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, self.database.store_cached_classification, fingerprint, result)
+        except Exception as e:
+            logger.error(f"Failed to persist classification: {e}")
+    
+    def get_executor(self) -> ProcessPoolExecutor:
+        """Worker pool for batch classification, created on first use"""
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(max_workers=self.process_workers,
+                                                initializer=_init_classification_worker)
+        return self.executor
+    
+    def shutdown(self):
+        """Stop the batch classification workers"""
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+    
     def _load_device_embeddings(self) -> Dict[str, np.ndarray]:
         """Load pre-trained device embeddings for classification"""
         # In a real implementation, this would load actual embeddings
@@ -190,69 +528,245 @@ class DeviceClassifier:
         Returns:
             Classification results with confidence scores
         """
+        endpoint = f"{device_info.get('ip_address')}:{device_info.get('port')}"
         try:
             # Extract features for classification
             features = await self._extract_device_features(device_info)
             
-            # Perform device type classification
-            device_type, type_confidence = await self._classify_device_type(features)
-            
-            # Perform manufacturer identification
-            manufacturer, manufacturer_confidence = await self._identify_manufacturer(features)
+            # Identical feature sets (e.g. one PLC model across a plant) are classified once
+            fingerprint = self._feature_fingerprint(features)
+            classification = None
+            result = await self._lookup_cached_classification(fingerprint)
             
-            # Perform model identification
-            model, model_confidence = await self._identify_model(features, manufacturer)
+            if result is None:
+                # Concurrent lookups for the same fingerprint wait on this classification
+                pending = asyncio.get_running_loop().create_future()
+                self.inflight_classifications[fingerprint] = pending
+                try:
+                    result = await self._load_persisted_classification(fingerprint)
+                    if result is None:
+                        self.cache_stats['misses'] += 1
+                        result, classification = await self._classify_features(features)
+                    self._remember_classification(fingerprint, result)
+                    pending.set_result(result)
+                finally:
+                    self.inflight_classifications.pop(fingerprint, None)
+                    if not pending.done():
+                        pending.set_result(None)
             
-            # Analyze tags if available
-            tag_analysis = await self._analyze_device_tags(features)
+            self.device_classifications[endpoint] = result
             
-            # Calculate overall confidence
-            overall_confidence = (type_confidence + manufacturer_confidence + model_confidence) / 3
-            
-            # Generate semantic fingerprint
-            semantic_fingerprint = await self._generate_semantic_fingerprint(features, tag_analysis)
-            
-            # Create classification result
-            classification = DeviceClassification(
-                device_type=device_type,
-                manufacturer=manufacturer,
-                model=model,
-                confidence_score=overall_confidence,
-                capabilities=features.get('capabilities', []),
-                tag_analysis=tag_analysis,
-                semantic_fingerprint=semantic_fingerprint
-            )
+            if classification is None:
+                logger.debug(f"Device {endpoint} classified from cache: {result['manufacturer']} {result['model']}")
+                return copy.deepcopy(result)
             
-            # Cache result for future use
-            cache_key = f"{device_info.get('ip_address')}:{device_info.get('port')}"
-            self.classification_cache[cache_key] = classification
+            await self._persist_classification(fingerprint, result)
             
             # Learn from this classification for future improvements
             await self._update_learning_data(features, classification)
+            await self._flush_learning_log()
             
-            logger.info(f"Device classified: {manufacturer} {model} ({device_type}) with {overall_confidence:.2f} confidence")
+            logger.info(f"Device classified: {result['manufacturer']} {result['model']} ({result['device_type']}) "
+                        f"with {result['confidence_score']:.2f} confidence")
             
-            return {
-                'device_type': device_type,
-                'manufacturer': manufacturer,
-                'model': model,
-                'confidence_score': overall_confidence,
-                'capabilities': features.get('capabilities', []),
-                'tag_count': len(tag_analysis),
-                'semantic_fingerprint': semantic_fingerprint
-            }
+            return copy.deepcopy(result)
             
         except Exception as e:
             logger.error(f"Device classification failed: {e}")
-            return {
-                'device_type': 'Unknown',
-                'manufacturer': 'Unknown',
-                'model': 'Unknown',
-                'confidence_score': 0.0,
-                'capabilities': [],
-                'tag_count': 0,
-                'semantic_fingerprint': {}
-            }
+            return self._unclassified_result(str(e))
+    
+    async def classify_many(self, device_infos: List[Dict], batch_size: int = 32):
+        """
+        Classify many devices in worker processes, yielding results as batches complete
+        
+        Cached fingerprints are answered immediately; the remaining unique feature
+        sets are shipped to the process pool so the event loop stays free for
+        network I/O while the pattern matching runs.
+        
+        Args:
+            device_infos: Device information dicts from network discovery
+            batch_size: Feature sets sent to a worker per task
+            
+        Yields:
+            (index into device_infos, classification result) tuples in completion order;
+            results for devices that could not be classified carry an 'error' key
+        """
+        loop = asyncio.get_running_loop()
+        waiting: Dict[str, List[int]] = defaultdict(list)  # fingerprint -> device indexes
+        features_by_fingerprint: Dict[str, Dict[str, Any]] = {}
+        pending: Dict[str, asyncio.Future] = {}
+        batch: List[str] = []
+        tasks = set()
+        
+        def submit(fingerprints: List[str]):
+            task = asyncio.ensure_future(
+                self._classify_batch([features_by_fingerprint[fingerprint] for fingerprint in fingerprints]))
+            task.fingerprints = fingerprints
+            tasks.add(task)
+        
+        try:
+            for index, device_info in enumerate(device_infos):
+                try:
+                    features = await self._extract_device_features(device_info)
+                except Exception as e:
+                    logger.error(f"Device classification failed: {e}")
+                    yield index, self._unclassified_result(str(e))
+                    continue
+                
+                fingerprint = self._feature_fingerprint(features)
+                if fingerprint in waiting:
+                    # Same features earlier in this batch
+                    self.cache_stats['hits'] += 1
+                    waiting[fingerprint].append(index)
+                    continue
+                
+                result = await self._lookup_cached_classification(fingerprint)
+                if result is None:
+                    pending[fingerprint] = loop.create_future()
+                    self.inflight_classifications[fingerprint] = pending[fingerprint]
+                    result = await self._load_persisted_classification(fingerprint)
+                    if result is not None:
+                        self._resolve_pending(pending, fingerprint, result)
+                        self._remember_classification(fingerprint, result)
+                
+                if result is not None:
+                    self._record_device_classification(device_info, result)
+                    yield index, copy.deepcopy(result)
+                    continue
+                
+                self.cache_stats['misses'] += 1
+                waiting[fingerprint].append(index)
+                features_by_fingerprint[fingerprint] = features
+                batch.append(fingerprint)
+                if len(batch) >= batch_size:
+                    # Workers start on full batches while the rest are still being extracted
+                    submit(batch)
+                    batch = []
+                    await asyncio.sleep(0)
+            
+            if batch:
+                submit(batch)
+            
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    for fingerprint, outcome in zip(task.fingerprints, task.result()):
+                        if outcome is None:
+                            self._resolve_pending(pending, fingerprint, None)
+                            for index in waiting[fingerprint]:
+                                yield index, self._unclassified_result("classification worker failed")
+                            continue
+                        
+                        result, classification = outcome
+                        self._remember_classification(fingerprint, result)
+                        self._resolve_pending(pending, fingerprint, result)
+                        await self._persist_classification(fingerprint, result)
+                        await self._update_learning_data(features_by_fingerprint[fingerprint], classification)
+                        
+                        logger.info(f"Device classified: {result['manufacturer']} {result['model']} "
+                                    f"({result['device_type']}) with {result['confidence_score']:.2f} confidence")
+                        for index in waiting[fingerprint]:
+                            self._record_device_classification(device_infos[index], result)
+                            yield index, copy.deepcopy(result)
+                    
+                    # One learning log write per completed batch
+                    await self._flush_learning_log()
+        finally:
+            for task in tasks:
+                task.cancel()
+            for fingerprint in list(pending):
+                self._resolve_pending(pending, fingerprint, None)
+    
+    def _resolve_pending(self, pending: Dict[str, asyncio.Future], fingerprint: str, result: Optional[Dict[str, Any]]):
+        """Release lookups waiting on an in-flight batch classification"""
+        future = pending.pop(fingerprint, None)
+        if future is None:
+            return
+        if self.inflight_classifications.get(fingerprint) is future:
+            del self.inflight_classifications[fingerprint]
+        if not future.done():
+            future.set_result(result)
+    
+    def _record_device_classification(self, device_info: Dict, result: Dict[str, Any]):
+        """Track the latest classification per endpoint for statistics"""
+        endpoint = f"{device_info.get('ip_address')}:{device_info.get('port')}"
+        self.device_classifications[endpoint] = result
+    
+    async def _classify_batch(self, features_list: List[Dict[str, Any]]) -> List[Optional[Tuple[Dict[str, Any], DeviceClassification]]]:
+        """Classify feature sets in the worker pool, falling back to inline classification"""
+        if self.process_workers > 0:
+            try:
+                loop = asyncio.get_running_loop()
+                outcomes = await loop.run_in_executor(self.get_executor(), classify_features_batch, features_list)
+                return [(outcome[0], unpack_classification(outcome[1])) if outcome else None for outcome in outcomes]
+            except BrokenProcessPool:
+                logger.error("Classification worker pool broke, classifying inline")
+                self.executor = None
+            except Exception as e:
+                logger.error(f"Batch classification in worker pool failed, classifying inline: {e}")
+        
+        outcomes = []
+        for features in features_list:
+            try:
+                outcomes.append(await self._classify_features(features))
+            except Exception as e:
+                logger.error(f"Device classification failed: {e}")
+                outcomes.append(None)
+        return outcomes
+    
+    def _unclassified_result(self, error: str) -> Dict[str, Any]:
+        """Result returned when a device cannot be classified (never cached)"""
+        return {
+            'device_type': 'Unknown',
+            'manufacturer': 'Unknown',
+            'model': 'Unknown',
+            'confidence_score': 0.0,
+            'capabilities': [],
+            'tag_count': 0,
+            'semantic_fingerprint': {},
+            'error': error
+        }
+    
+    async def _classify_features(self, features: Dict[str, Any]) -> Tuple[Dict[str, Any], DeviceClassification]:
+        """Run the classification models on extracted features"""
+        # Perform device type classification
+        device_type, type_confidence = await self._classify_device_type(features)
+        
+        # Perform manufacturer identification
+        manufacturer, manufacturer_confidence = await self._identify_manufacturer(features)
+        
+        # Perform model identification
+        model, model_confidence = await self._identify_model(features, manufacturer)
+        
+        # Analyze tags if available
+        tag_analysis = await self._analyze_device_tags(features)
+        
+        # Calculate overall confidence
+        overall_confidence = (type_confidence + manufacturer_confidence + model_confidence) / 3
+        
+        # Generate semantic fingerprint
+        semantic_fingerprint = await self._generate_semantic_fingerprint(features, tag_analysis)
+        
+        # Create classification result
+        classification = DeviceClassification(
+            device_type=device_type,
+            manufacturer=manufacturer,
+            model=model,
+            confidence_score=overall_confidence,
+            capabilities=features.get('capabilities', []),
+            tag_analysis=tag_analysis,
+            semantic_fingerprint=semantic_fingerprint
+        )
+        
+        return {
+            'device_type': device_type,
+            'manufacturer': manufacturer,
+            'model': model,
+            'confidence_score': overall_confidence,
+            'capabilities': list(features.get('capabilities', [])),
+            'tag_count': len(tag_analysis),
+            'semantic_fingerprint': semantic_fingerprint
+        }, classification
     
     async def _extract_device_features(self, device_info: Dict) -> Dict[str, Any]:
         """Extract relevant features from device information"""
@@ -269,6 +783,14 @@ class DeviceClassifier:
             'string_patterns': []
         }
         
+        # Protocol-level identity codes (e.g. EtherNet/IP vendor and product)
+        protocol_specific = device_info.get('protocol_specific') or {}
+        features['vendor_ids'] = {
+            key: protocol_specific[key]
+            for key in ('vendor_id', 'device_type_id', 'product_code')
+            if key in protocol_specific
+        }
+        
         # Extract ASCII data from registers
         for register_info in features['registers_found']:
             ascii_text = register_info.get('ascii', '')
@@ -305,14 +827,8 @@ class DeviceClassifier:
         # Pattern-based classification
         ascii_text = ' '.join(features['ascii_data']).lower()
         
-        for device_type, patterns in self.DEVICE_TYPE_PATTERNS.items():
-            score = 0
-            for pattern in patterns:
-                if re.search(pattern, ascii_text, re.IGNORECASE):
-                    score += 1
-            
-            if score > 0:
-                scores[device_type] = score / len(patterns)
+        for device_type, score in self.device_type_index.match_counts(ascii_text).items():
+            scores[device_type] = score / len(self.DEVICE_TYPE_PATTERNS[device_type])
         
         # Protocol-based hints
         protocol = features['protocol']
@@ -356,19 +872,12 @@ class DeviceClassifier:
         
         # ASCII pattern matching
         ascii_text = ' '.join(features['ascii_data']).upper()
+        pattern_counts = self.manufacturer_index.match_counts(ascii_text)
         
         for manufacturer, signature in self.MANUFACTURER_SIGNATURES.items():
-            score = 0
-            
-            # Check tag patterns
-            for pattern in signature['tag_patterns']:
-                if re.search(pattern, ascii_text, re.IGNORECASE):
-                    score += 2
-            
-            # Check model patterns
-            for pattern in signature['model_patterns']:
-                if re.search(pattern, ascii_text, re.IGNORECASE):
-                    score += 3
+            # Tag patterns score 2, model patterns 3
+            score = 2 * pattern_counts.get((manufacturer, 'tag_patterns'), 0)
+            score += 3 * pattern_counts.get((manufacturer, 'model_patterns'), 0)
             
             # Check protocol compatibility
             protocol = features['protocol']
@@ -394,12 +903,9 @@ class DeviceClassifier:
         ascii_text = ' '.join(features['ascii_data']).upper()
         
         if manufacturer in self.MANUFACTURER_SIGNATURES:
-            signature = self.MANUFACTURER_SIGNATURES[manufacturer]
-            
-            for model_pattern in signature['model_patterns']:
-                match = re.search(model_pattern, ascii_text, re.IGNORECASE)
-                if match:
-                    return match.group(0), 0.8
+            model = self.manufacturer_index.first_match(ascii_text, (manufacturer, 'model_patterns'))
+            if model:
+                return model, 0.8
         
         # Generic model identification based on protocol and capabilities
         protocol = features['protocol']
@@ -433,7 +939,7 @@ class DeviceClassifier:
         # From ASCII data (look for tag-like patterns)
         for ascii_data in features['ascii_data']:
             # Look for tag patterns like "TAG_NAME", "PV_01", etc.
-            tag_matches = re.findall(r'[A-Z][A-Z0-9_]{2,}', ascii_data)
+            tag_matches = self.TAG_TOKEN_PATTERN.findall(ascii_data)
             tags.extend(tag_matches)
         
         # From capabilities (convert to tag-like names)
@@ -452,26 +958,29 @@ class DeviceClassifier:
     async def _analyze_single_tag(self, tag_name: str) -> Optional[TagAnalysis]:
         """Analyze a single tag for purpose and meaning"""
         try:
+            # Single index scan shared by all tag attribute lookups
+            hits = self.tag_index.match_counts(tag_name)
+            
             # Determine tag purpose
-            purpose, purpose_confidence = self._classify_tag_purpose(tag_name)
+            purpose, purpose_confidence = self._classify_tag_purpose(tag_name, hits)
             
             # Determine data type
-            data_type = self._infer_data_type(tag_name)
+            data_type = self._infer_data_type(tag_name, hits)
             
             # Determine units
-            units = self._infer_units(tag_name)
+            units = self._infer_units(tag_name, hits)
             
             # Generate description
             description = self._generate_tag_description(tag_name, purpose)
             
             # Determine category
-            category = self._determine_tag_category(tag_name, purpose)
+            category = self._determine_tag_category(tag_name, purpose, hits)
             
             # Assess criticality
-            criticality = self._assess_tag_criticality(tag_name, purpose)
+            criticality = self._assess_tag_criticality(tag_name, purpose, hits)
             
             # Estimate update frequency
-            update_frequency = self._estimate_update_frequency(tag_name, purpose)
+            update_frequency = self._estimate_update_frequency(tag_name, purpose, hits)
             
             return TagAnalysis(
                 tag_name=tag_name,
@@ -490,18 +999,25 @@ class DeviceClassifier:
             logger.debug(f"Tag analysis failed for {tag_name}: {e}")
             return None
     
-    def _classify_tag_purpose(self, tag_name: str) -> Tuple[str, float]:
+    def _tag_hits(self, tag_name: str, hits: Optional[Dict]) -> Dict:
+        """Tag index match counts, reusing a scan done by the caller"""
+        return hits if hits is not None else self.tag_index.match_counts(tag_name)
+    
+    def _first_label(self, group: str, table: Dict[str, List[str]], hits: Dict, default: Optional[str]) -> Optional[str]:
+        """First label of a pattern table (declaration order) with a matching pattern"""
+        for label in table:
+            if (group, label) in hits:
+                return label
+        return default
+    
+    def _classify_tag_purpose(self, tag_name: str, hits: Optional[Dict] = None) -> Tuple[str, float]:
         """Classify the purpose of a tag"""
         scores = {}
         
-        tag_lower = tag_name.lower()
+        hits = self._tag_hits(tag_name, hits)
         
         for purpose, patterns in self.TAG_PURPOSE_PATTERNS.items():
-            score = 0
-            for pattern in patterns:
-                if re.search(pattern, tag_lower):
-                    score += 1
-            
+            score = hits.get(('purpose', purpose), 0)
             if score > 0:
                 scores[purpose] = score / len(patterns)
         
@@ -512,42 +1028,15 @@ class DeviceClassifier:
         else:
             return 'Unknown', 0.1
     
-    def _infer_data_type(self, tag_name: str) -> str:
+    def _infer_data_type(self, tag_name: str, hits: Optional[Dict] = None) -> str:
         """Infer data type from tag name"""
-        tag_lower = tag_name.lower()
-        
-        if re.search(r'temp|pressure|flow|level|speed|rate', tag_lower):
-            return 'REAL'
-        elif re.search(r'count|total|batch|cycle', tag_lower):
-            return 'INT'
-        elif re.search(r'running|stopped|alarm|fault|enable', tag_lower):
-            return 'BOOL'
-        elif re.search(r'name|description|message|text', tag_lower):
-            return 'STRING'
-        else:
-            return 'UNKNOWN'
+        hits = self._tag_hits(tag_name, hits)
+        return self._first_label('data_type', self.DATA_TYPE_PATTERNS, hits, 'UNKNOWN')
     
-    def _infer_units(self, tag_name: str) -> str:
+    def _infer_units(self, tag_name: str, hits: Optional[Dict] = None) -> str:
         """Infer engineering units from tag name"""
-        tag_lower = tag_name.lower()
-        
-        unit_patterns = {
-            'degC': [r'temp', r'temperature'],
-            'bar': [r'pressure', r'press'],
-            'L/min': [r'flow'],
-            'mm': [r'level', r'position'],
-            'rpm': [r'speed', r'motor'],
-            '%': [r'percent', r'pct', r'valve'],
-            'count': [r'count', r'total', r'batch'],
-            'seconds': [r'time', r'timer']
-        }
-        
-        for unit, patterns in unit_patterns.items():
-            for pattern in patterns:
-                if re.search(pattern, tag_lower):
-                    return unit
-        
-        return 'dimensionless'
+        hits = self._tag_hits(tag_name, hits)
+        return self._first_label('units', self.UNIT_PATTERNS, hits, 'dimensionless')
     
     def _generate_tag_description(self, tag_name: str, purpose: str) -> str:
         """Generate human-readable description for tag"""
@@ -555,21 +1044,11 @@ class DeviceClassifier:
         base_description = tag_name.replace('_', ' ').title()
         return f"{purpose}: {base_description}"
     
-    def _determine_tag_category(self, tag_name: str, purpose: str) -> str:
+    def _determine_tag_category(self, tag_name: str, purpose: str, hits: Optional[Dict] = None) -> str:
         """Determine functional category of tag"""
-        tag_lower = tag_name.lower()
-        
         if purpose in ['Process Variable', 'Setpoint', 'Control Output']:
-            if re.search(r'temp|temperature', tag_lower):
-                return 'Temperature Control'
-            elif re.search(r'pressure|press', tag_lower):
-                return 'Pressure Control'
-            elif re.search(r'flow', tag_lower):
-                return 'Flow Control'
-            elif re.search(r'level', tag_lower):
-                return 'Level Control'
-            else:
-                return 'Process Control'
+            hits = self._tag_hits(tag_name, hits)
+            return self._first_label('category', self.TAG_CATEGORY_PATTERNS, hits, 'Process Control')
         elif purpose in ['Alarm', 'Status']:
             return 'Monitoring'
         elif purpose == 'Counter':
@@ -579,31 +1058,24 @@ class DeviceClassifier:
         else:
             return 'General'
     
-    def _assess_tag_criticality(self, tag_name: str, purpose: str) -> str:
+    def _assess_tag_criticality(self, tag_name: str, purpose: str, hits: Optional[Dict] = None) -> str:
         """Assess criticality level of tag"""
-        tag_lower = tag_name.lower()
+        hits = self._tag_hits(tag_name, hits)
         
-        # High criticality indicators
-        if re.search(r'safety|emergency|critical|shutdown|trip', tag_lower):
-            return 'Critical'
-        elif re.search(r'alarm|fault|error|warning', tag_lower):
-            return 'High'
+        # Critical/high criticality indicators
+        criticality = self._first_label('criticality', self.CRITICALITY_PATTERNS, hits, None)
+        if criticality:
+            return criticality
         elif purpose in ['Process Variable', 'Control Output']:
             return 'Medium'
         else:
             return 'Low'
     
-    def _estimate_update_frequency(self, tag_name: str, purpose: str) -> str:
+    def _estimate_update_frequency(self, tag_name: str, purpose: str, hits: Optional[Dict] = None) -> str:
         """Estimate how frequently tag value updates"""
-        tag_lower = tag_name.lower()
-        
         if purpose == 'Process Variable':
-            if re.search(r'temp|temperature|pressure', tag_lower):
-                return 'Slow (1-10 sec)'
-            elif re.search(r'flow|speed|current', tag_lower):
-                return 'Fast (100ms-1sec)'
-            else:
-                return 'Medium (1-5 sec)'
+            hits = self._tag_hits(tag_name, hits)
+            return self._first_label('update_frequency', self.UPDATE_FREQUENCY_PATTERNS, hits, 'Medium (1-5 sec)')
         elif purpose in ['Alarm', 'Status']:
             return 'Event-driven'
         elif purpose == 'Counter':
@@ -647,36 +1119,71 @@ class DeviceClassifier:
         return fingerprint
     
     async def _update_learning_data(self, features: Dict[str, Any], classification: DeviceClassification):
-        """Update learning data for continuous improvement"""
+        """Record a classification's feature vector and labels for continuous improvement"""
         learning_entry = {
             'timestamp': datetime.now().isoformat(),
-            'features': features,
-            'classification': classification,
-            'confidence': classification.confidence_score
+            'device_type': classification.device_type,
+            'manufacturer': classification.manufacturer,
+            'model': classification.model,
+            'confidence': classification.confidence_score,
+            'features': self._learning_feature_vector(features, classification)
         }
         
-        device_type = classification.device_type
-        self.learning_data[device_type].append(learning_entry)
-        
-        # Keep only recent learning data (last 1000 entries per type)
-        if len(self.learning_data[device_type]) > 1000:
-            self.learning_data[device_type] = self.learning_data[device_type][-1000:]
+        # deque(maxlen) drops the oldest entry, so memory stays flat however long the service runs
+        self.learning_data[classification.device_type].append(learning_entry)
+        if self.database is not None:
+            self.pending_learning_entries.append(learning_entry)
+    
+    def _learning_feature_vector(self, features: Dict[str, Any], classification: DeviceClassification) -> Dict[str, Any]:
+        """Compact retraining inputs: identity features and tag profile, not the raw scan result"""
+        detection = features.get('manufacturer_detection') or {}
+        fingerprint = classification.semantic_fingerprint
+        return {
+            'protocol': features['protocol'],
+            'port': features['port'],
+            'capabilities': list(features['capabilities']),
+            'detected_manufacturer': detection.get('manufacturer'),
+            'detected_confidence': detection.get('confidence'),
+            'vendor_ids': features.get('vendor_ids', {}),
+            'unit_id': features.get('unit_id'),
+            'function_codes': features.get('function_codes', []),
+            'ascii_data': features['ascii_data'][:self.LEARNING_TEXT_LIMIT],
+            'tag_purposes': fingerprint.get('tag_purposes', {}),
+            'data_type_distribution': fingerprint.get('data_type_distribution', {}),
+            'functional_categories': fingerprint.get('functional_categories', {})
+        }
+    
+    async def _flush_learning_log(self):
+        """Append buffered learning entries to the database learning log"""
+        if not self.pending_learning_entries:
+            return
+        entries, self.pending_learning_entries = self.pending_learning_entries, []
+        try:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, self.database.append_learning_entries, entries)
+        except Exception as e:
+            logger.error(f"Failed to write learning log: {e}")
     
     def get_classification_statistics(self) -> Dict[str, Any]:
         """Get statistics about classification performance"""
+        lookups = self.cache_stats['hits'] + self.cache_stats['misses']
         stats = {
-            'total_classifications': len(self.classification_cache),
+            'total_classifications': len(self.device_classifications),
             'device_types': {},
             'manufacturers': {},
             'average_confidence': 0.0,
-            'learning_data_size': sum(len(data) for data in self.learning_data.values())
+            'learning_data_size': sum(len(data) for data in self.learning_data.values()),
+            'cache': dict(self.cache_stats,
+                          size=len(self.classification_cache),
+                          capacity=self.cache_size,
+                          hit_rate=self.cache_stats['hits'] / lookups if lookups else 0.0)
         }
         
         confidences = []
-        for classification in self.classification_cache.values():
-            device_type = classification.device_type
-            manufacturer = classification.manufacturer
-            confidence = classification.confidence_score
+        for classification in self.device_classifications.values():
+            device_type = classification['device_type']
+            manufacturer = classification['manufacturer']
+            confidence = classification['confidence_score']
             
             stats['device_types'][device_type] = stats['device_types'].get(device_type, 0) + 1
             stats['manufacturers'][manufacturer] = stats['manufacturers'].get(manufacturer, 0) + 1
@@ -687,6 +1194,51 @@ class DeviceClassifier:
         
         return stats
 
+# Batch classification worker processes
+_worker_classifier = None
+_worker_loop = None
+
+def _init_classification_worker():
+    """Build one classifier per worker process; pattern indexes compile once here"""
+    global _worker_classifier, _worker_loop
+    _worker_classifier = DeviceClassifier()
+    _worker_loop = asyncio.new_event_loop()
+
+def classify_features_batch(features_list: List[Dict[str, Any]]) -> List[Optional[Tuple[Dict[str, Any], tuple]]]:
+    """Classify extracted feature sets in a worker process (None for failed items)"""
+    if _worker_classifier is None:
+        _init_classification_worker()
+    
+    outcomes = []
+    for features in features_list:
+        try:
+            result, classification = _worker_loop.run_until_complete(_worker_classifier._classify_features(features))
+            outcomes.append((result, pack_classification(classification)))
+        except Exception as e:
+            logger.error(f"Device classification failed: {e}")
+            outcomes.append(None)
+    return outcomes
+
+def pack_classification(classification: DeviceClassification) -> tuple:
+    """Flatten a classification to plain tuples; pickling tag dataclasses dominates IPC time"""
+    return (classification.device_type, classification.manufacturer, classification.model,
+            classification.confidence_score, classification.capabilities,
+            [tuple(vars(tag).values()) for tag in classification.tag_analysis],
+            classification.semantic_fingerprint)
+
+def unpack_classification(packed: tuple) -> DeviceClassification:
+    """Rebuild a DeviceClassification returned by a worker process"""
+    device_type, manufacturer, model, confidence_score, capabilities, tags, semantic_fingerprint = packed
+    return DeviceClassification(
+        device_type=device_type,
+        manufacturer=manufacturer,
+        model=model,
+        confidence_score=confidence_score,
+        capabilities=capabilities,
+        tag_analysis=[TagAnalysis(*fields) for fields in tags],
+        semantic_fingerprint=semantic_fingerprint
+    )
+
 # Test functionality
 if __name__ == "__main__":
     async def test_device_classifier():
@@ -9,7 +9,7 @@ import json
 import logging
 import time
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 from contextlib import contextmanager
 import threading
 
@@ -105,6 +105,43 @@ class DiscoveryDatabase:
                 )
             ''')
             
+            # Open port table from the shared pre-probe sweep
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS open_ports (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    ip_address TEXT NOT NULL,
+                    port INTEGER NOT NULL,
+                    state TEXT NOT NULL,  -- open, closed, filtered
+                    response_time REAL,
+                    last_checked TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    UNIQUE(ip_address, port)
+                )
+            ''')
+            
+            # Classification results keyed by device feature fingerprint
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS classification_cache (
+                    fingerprint TEXT PRIMARY KEY,
+                    classification TEXT NOT NULL,  -- JSON classification result
+                    hit_count INTEGER DEFAULT 0,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    last_used TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            
+            # Append-only classifier learning log: feature vectors and labels for retraining
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS classification_learning_log (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    recorded_at TIMESTAMP NOT NULL,
+                    device_type TEXT NOT NULL,
+                    manufacturer TEXT,
+                    model TEXT,
+                    confidence REAL,
+                    feature_vector TEXT NOT NULL  -- compact JSON feature vector
+                )
+            ''')
+            
             # Create indexes for better performance
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_devices_ip ON devices(ip_address)')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_devices_type ON devices(device_type)')
@@ -112,6 +149,9 @@ class DiscoveryDatabase:
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_endpoints_device ON protocol_endpoints(device_id)')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_endpoints_protocol ON protocol_endpoints(protocol)')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_scan_history_time ON scan_history(start_time)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_open_ports_checked ON open_ports(last_checked)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_classification_cache_used ON classification_cache(last_used)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_learning_log_type ON classification_learning_log(device_type, id)')
             
             conn.commit()
             logging.info("Database initialized successfully")
@@ -194,29 +234,255 @@ class DiscoveryDatabase:
                 return device_id
     
     def add_protocol_endpoint(self, device_id: int, protocol_data: Dict[str, Any]):
-        """Add protocol endpoint for a device"""
+        """Add or update protocol endpoint for a device"""
         with self.lock:
             with self.get_connection() as conn:
                 cursor = conn.cursor()
                 
                 endpoint_json = json.dumps(protocol_data.get('endpoint_data', {}))
                 
+                # One row per (device, protocol, port) so rescans update in place
                 cursor.execute('''
-                    INSERT OR REPLACE INTO protocol_endpoints 
-                    (device_id, protocol, port, endpoint_data, last_response, response_time, is_active)
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    device_id,
-                    protocol_data['protocol'],
-                    protocol_data['port'],
-                    endpoint_json,
-                    protocol_data.get('last_response'),
-                    protocol_data.get('response_time'),
-                    protocol_data.get('is_active', True)
-                ))
+                    SELECT id FROM protocol_endpoints
+                    WHERE device_id = ? AND protocol = ? AND port = ?
+                ''', (device_id, protocol_data['protocol'], protocol_data['port']))
+                existing = cursor.fetchone()
+                
+                if existing:
+                    cursor.execute('''
+                        UPDATE protocol_endpoints
+                        SET endpoint_data = ?, last_response = COALESCE(?, last_response),
+                            response_time = COALESCE(?, response_time), is_active = ?
+                        WHERE id = ?
+                    ''', (
+                        endpoint_json,
+                        protocol_data.get('last_response'),
+                        protocol_data.get('response_time'),
+                        protocol_data.get('is_active', True),
+                        existing['id']
+                    ))
+                else:
+                    cursor.execute('''
+                        INSERT INTO protocol_endpoints 
+                        (device_id, protocol, port, endpoint_data, last_response, response_time, is_active)
+                        VALUES (?, ?, ?, ?, ?, ?, ?)
+                    ''', (
+                        device_id,
+                        protocol_data['protocol'],
+                        protocol_data['port'],
+                        endpoint_json,
+                        protocol_data.get('last_response'),
+                        protocol_data.get('response_time'),
+                        protocol_data.get('is_active', True)
+                    ))
+                
+                conn.commit()
+    
+    def get_known_endpoints(self) -> List[Dict[str, Any]]:
+        """All recorded protocol endpoints joined with their device address"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute('''
+                SELECT pe.*, d.ip_address
+                FROM protocol_endpoints pe
+                JOIN devices d ON pe.device_id = d.id
+                ORDER BY d.ip_address, pe.protocol, pe.port
+            ''')
+            
+            endpoints = []
+            for row in cursor.fetchall():
+                endpoint = dict(row)
+                endpoint['endpoint_data'] = json.loads(endpoint['endpoint_data']) if endpoint['endpoint_data'] else {}
+                endpoints.append(endpoint)
+            
+            return endpoints
+    
+    def update_endpoint_liveness(self, results: List[Dict[str, Any]]):
+        """Record liveness check results ({'id', 'device_id', 'is_active', 'response_time'})"""
+        if not results:
+            return
+        
+        with self.lock:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                
+                cursor.executemany('''
+                    UPDATE protocol_endpoints SET is_active = ?, response_time = ? WHERE id = ?
+                ''', [(result['is_active'], result.get('response_time'), result['id']) for result in results])
+                
+                alive_devices = {result['device_id'] for result in results if result['is_active']}
+                cursor.executemany('''
+                    UPDATE devices SET last_seen = CURRENT_TIMESTAMP, status = 'active' WHERE id = ?
+                ''', [(device_id,) for device_id in alive_devices])
+                
+                # Devices with no responsive endpoint left become inactive
+                cursor.executemany('''
+                    UPDATE devices SET status = 'inactive'
+                    WHERE id = ? AND NOT EXISTS (
+                        SELECT 1 FROM protocol_endpoints WHERE device_id = ? AND is_active = 1
+                    )
+                ''', [(result['device_id'], result['device_id']) for result in results
+                      if result['device_id'] not in alive_devices])
+                
+                conn.commit()
+    
+    def store_open_ports(self, port_table: Dict[str, Dict[int, Dict[str, Any]]]):
+        """Upsert pre-probe results ({ip: {port: {'state', 'response_time'}}})"""
+        rows = [
+            (ip_address, port, info['state'], info.get('response_time'))
+            for ip_address, ports in port_table.items()
+            for port, info in ports.items()
+        ]
+        if not rows:
+            return
+        
+        with self.lock:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                
+                cursor.executemany('''
+                    INSERT INTO open_ports (ip_address, port, state, response_time, last_checked)
+                    VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+                    ON CONFLICT(ip_address, port) DO UPDATE SET
+                        state = excluded.state,
+                        response_time = excluded.response_time,
+                        last_checked = excluded.last_checked
+                ''', rows)
                 
                 conn.commit()
     
+    def get_open_ports(self, max_age_minutes: Optional[int] = None,
+                       include_closed: bool = False) -> Dict[str, Dict[int, Dict[str, Any]]]:
+        """Cached open-port table, optionally limited to recent probes"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            
+            query = "SELECT ip_address, port, state, response_time, last_checked FROM open_ports"
+            conditions = []
+            params = []
+            
+            if not include_closed:
+                conditions.append("state = 'open'")
+            if max_age_minutes is not None:
+                conditions.append("last_checked >= datetime('now', ?)")
+                params.append(f"-{int(max_age_minutes)} minutes")
+            if conditions:
+                query += " WHERE " + " AND ".join(conditions)
+            
+            cursor.execute(query, params)
+            
+            port_table: Dict[str, Dict[int, Dict[str, Any]]] = {}
+            for row in cursor.fetchall():
+                port_table.setdefault(row['ip_address'], {})[row['port']] = {
+                    'state': row['state'],
+                    'response_time': row['response_time'],
+                    'last_checked': row['last_checked']
+                }
+            
+            return port_table
+    
+    def store_cached_classification(self, fingerprint: str, classification: Dict[str, Any]):
+        """Insert or refresh a cached classification result"""
+        with self.lock:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                
+                cursor.execute('''
+                    INSERT INTO classification_cache (fingerprint, classification, last_used)
+                    VALUES (?, ?, CURRENT_TIMESTAMP)
+                    ON CONFLICT(fingerprint) DO UPDATE SET
+                        classification = excluded.classification,
+                        last_used = excluded.last_used
+                ''', (fingerprint, json.dumps(classification)))
+                
+                conn.commit()
+    
+    def get_cached_classification(self, fingerprint: str) -> Optional[Dict[str, Any]]:
+        """Cached classification for a fingerprint, recording the hit"""
+        with self.lock:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                
+                cursor.execute(
+                    "SELECT classification FROM classification_cache WHERE fingerprint = ?",
+                    (fingerprint,)
+                )
+                row = cursor.fetchone()
+                if row is None:
+                    return None
+                
+                cursor.execute('''
+                    UPDATE classification_cache
+                    SET hit_count = hit_count + 1, last_used = CURRENT_TIMESTAMP
+                    WHERE fingerprint = ?
+                ''', (fingerprint,))
+                conn.commit()
+                
+                return json.loads(row['classification'])
+    
+    def load_cached_classifications(self, limit: int) -> List[Tuple[str, Dict[str, Any]]]:
+        """Most recently used cached classifications as (fingerprint, result), oldest first"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute('''
+                SELECT fingerprint, classification FROM classification_cache
+                ORDER BY last_used DESC
+                LIMIT ?
+            ''', (limit,))
+            
+            return [(row['fingerprint'], json.loads(row['classification']))
+                    for row in reversed(cursor.fetchall())]
+    
+    def append_learning_entries(self, entries: List[Dict[str, Any]]):
+        """Append classifier learning entries (feature vector plus labels) in one transaction"""
+        if not entries:
+            return
+        
+        with self.lock:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                
+                cursor.executemany('''
+                    INSERT INTO classification_learning_log
+                    (recorded_at, device_type, manufacturer, model, confidence, feature_vector)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                ''', [(
+                    entry['timestamp'],
+                    entry['device_type'],
+                    entry.get('manufacturer'),
+                    entry.get('model'),
+                    entry.get('confidence'),
+                    json.dumps(entry['features'], sort_keys=True)
+                ) for entry in entries])
+                
+                conn.commit()
+    
+    def get_learning_entries(self, device_type: Optional[str] = None, limit: int = 1000) -> List[Dict[str, Any]]:
+        """Most recent learning log entries, oldest first, optionally for one device type"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            
+            query = "SELECT * FROM classification_learning_log"
+            params = []
+            if device_type is not None:
+                query += " WHERE device_type = ?"
+                params.append(device_type)
+            query += " ORDER BY id DESC LIMIT ?"
+            params.append(limit)
+            
+            cursor.execute(query, params)
+            
+            return [{
+                'timestamp': row['recorded_at'],
+                'device_type': row['device_type'],
+                'manufacturer': row['manufacturer'],
+                'model': row['model'],
+                'confidence': row['confidence'],
+                'features': json.loads(row['feature_vector'])
+            } for row in reversed(cursor.fetchall())]
+    
     def start_scan(self, scan_id: str, scan_type: str, target_range: str, config: Dict[str, Any]) -> int:
         """Record scan start"""
         with self.lock:
@@ -356,6 +622,12 @@ class DiscoveryDatabase:
                     WHERE start_time < ? AND status = 'completed'
                 ''', (cutoff_date,))
                 
+                # Drop cached classifications nobody has used recently
+                cursor.execute('''
+                    DELETE FROM classification_cache
+                    WHERE last_used < datetime('now', ?)
+                ''', (f"-{int(days_old)} days",))
+                
                 # Mark devices as inactive if not seen recently
                 cursor.execute('''
                     UPDATE devices 
@@ -405,6 +677,18 @@ class DiscoveryDatabase:
             ''')
             stats['recent_scans'] = cursor.fetchone()[0]
             
+            # Cached open ports
+            cursor.execute("SELECT COUNT(*) FROM open_ports WHERE state = 'open'")
+            stats['open_ports'] = cursor.fetchone()[0]
+            
+            # Cached classifications
+            cursor.execute("SELECT COUNT(*), COALESCE(SUM(hit_count), 0) FROM classification_cache")
+            stats['cached_classifications'], stats['classification_cache_hits'] = cursor.fetchone()
+            
+            # Classifier learning log
+            cursor.execute("SELECT COUNT(*) FROM classification_learning_log")
+            stats['learning_log_entries'] = cursor.fetchone()[0]
+            
             return stats
 
 if __name__ == "__main__":
@@ -40,6 +40,34 @@ CREATE TABLE IF NOT EXISTS protocol_endpoints (
     FOREIGN KEY (device_id) REFERENCES discovered_devices(id)
 );
 
+CREATE TABLE IF NOT EXISTS open_ports (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ip_address TEXT NOT NULL,
+    port INTEGER NOT NULL,
+    state TEXT NOT NULL, -- open, closed, filtered
+    response_time REAL,
+    last_checked TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE(ip_address, port)
+);
+
+CREATE TABLE IF NOT EXISTS classification_cache (
+    fingerprint TEXT PRIMARY KEY, -- hash of extracted device features
+    classification TEXT NOT NULL, -- JSON classification result
+    hit_count INTEGER DEFAULT 0,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    last_used TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS classification_learning_log (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    recorded_at TIMESTAMP NOT NULL,
+    device_type TEXT NOT NULL,
+    manufacturer TEXT,
+    model TEXT,
+    confidence REAL,
+    feature_vector TEXT NOT NULL -- compact JSON feature vector, append-only
+);
+
 CREATE TABLE IF NOT EXISTS scan_sessions (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     session_id TEXT UNIQUE NOT NULL,
@@ -105,6 +133,10 @@ CREATE INDEX IF NOT EXISTS idx_endpoints_device ON protocol_endpoints(device_id)
 CREATE INDEX IF NOT EXISTS idx_endpoints_protocol ON protocol_endpoints(protocol);
 CREATE INDEX IF NOT EXISTS idx_endpoints_port ON protocol_endpoints(port);
 
+CREATE INDEX IF NOT EXISTS idx_open_ports_checked ON open_ports(last_checked);
+CREATE INDEX IF NOT EXISTS idx_classification_cache_used ON classification_cache(last_used);
+CREATE INDEX IF NOT EXISTS idx_learning_log_type ON classification_learning_log(device_type, id);
+
 CREATE INDEX IF NOT EXISTS idx_sessions_status ON scan_sessions(status);
 CREATE INDEX IF NOT EXISTS idx_sessions_start_time ON scan_sessions(start_time);
 
@@ -8,21 +8,24 @@ including PLCs, MQTT brokers, Modbus devices, and OPC-UA servers with AI-powered
 """
 
 import asyncio
+import hashlib
 import json
 import logging
 import time
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Set
+from typing import Dict, Iterator, List, Optional, Set, Tuple
 from concurrent.futures import ThreadPoolExecutor
 import sqlite3
 import ipaddress
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, field
 import threading
+from collections import defaultdict
 
 from protocols.modbus_scanner import ModbusScanner
 from protocols.opcua_scanner import OPCUAScanner
 from protocols.mqtt_scanner import MQTTScanner
 from protocols.ethernet_ip_scanner import EthernetIPScanner
+from protocols.port_probe import PortProber, PORT_OPEN, PORT_CLOSED
 from ai_classification.device_classifier import DeviceClassifier
 from database.discovery_db import DiscoveryDatabase
 from api.discovery_api import DiscoveryAPI
@@ -67,6 +70,173 @@ class ScanConfiguration:
     protocols_enabled: List[str]
     security_mode: str
     emergency_stop: bool
+    max_probes_per_second: float = 0.0
+    port_probe_enabled: bool = True
+    probe_timeout: float = 1.0
+    liveness_check: bool = False
+    exclude_ranges: List[str] = field(default_factory=list)
+    scan_chunk_size: int = 1024
+    incremental_identify_minutes: int = 60
+    background_probe_rate: float = 2.0
+    background_hosts_per_cycle: int = 256
+    ethernet_ip_broadcast: bool = True
+    broadcast_window: float = 1.0
+    classification_workers: int = 2
+    modbus_max_in_flight: int = 16
+
+# Scanner fields that change between probes without the device changing
+FINGERPRINT_VOLATILE_KEYS = {'scan_timestamp', 'diagnostics', 'response_time'}
+
+def device_fingerprint(device_info: Dict) -> str:
+    """Stable hash of a scanner result, used to detect changed devices on rescans"""
+    stable = {key: value for key, value in device_info.items() if key not in FINGERPRINT_VOLATILE_KEYS}
+    return hashlib.sha256(json.dumps(stable, sort_keys=True, default=str).encode()).hexdigest()
+
+class TokenBucketRateLimiter:
+    """
+    Global token bucket shared by all protocol scans.
+    Caps probe starts per second across every concurrent host task, so
+    raising concurrency never raises the packet rate seen by the network.
+    """
+    
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+    
+    async def acquire(self):
+        """Wait until a probe token is available"""
+        if self.rate <= 0:
+            return
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+class TargetGenerator:
+    """
+    Lazy host iterator over CIDR lists, single addresses and "start-end" ranges.
+    Overlapping networks are merged and exclusions subtracted as integer
+    ranges, so memory stays flat regardless of how many hosts are covered.
+    """
+    
+    def __init__(self, networks: List[str], exclusions: Optional[List[str]] = None):
+        self.invalid: List[str] = []
+        targets = self._parse_all(networks, hosts_only=True)
+        excluded = self._parse_all(exclusions or [], hosts_only=False)
+        self.ranges = self._subtract(self._merge(targets), self._merge(excluded))
+    
+    def _parse_all(self, specs: List[str], hosts_only: bool) -> List[Tuple[int, int, int]]:
+        ranges = []
+        for spec in specs:
+            try:
+                ranges.append(self._parse(spec, hosts_only))
+            except ValueError as e:
+                logger.error(f"Invalid network range {spec}: {e}")
+                self.invalid.append(spec)
+        return ranges
+    
+    @staticmethod
+    def _parse(spec: str, hosts_only: bool) -> Tuple[int, int, int]:
+        """(ip version, first address, last address) for one range spec"""
+        spec = spec.strip()
+        if '-' in spec:
+            first, last = (ipaddress.ip_address(part.strip()) for part in spec.split('-', 1))
+            if first.version != last.version or first > last:
+                raise ValueError("range bounds must be same-family and ascending")
+            return first.version, int(first), int(last)
+        
+        net = ipaddress.ip_network(spec, strict=False)
+        first, last = int(net.network_address), int(net.broadcast_address)
+        if hosts_only and net.num_addresses > 2:
+            # Same host set as net.hosts(): skip network (and IPv4 broadcast) address
+            first += 1
+            if net.version == 4:
+                last -= 1
+        return net.version, first, last
+    
+    @staticmethod
+    def _merge(ranges: List[Tuple[int, int, int]]) -> List[Tuple[int, int, int]]:
+        merged = []
+        for version, first, last in sorted(ranges):
+            if merged and merged[-1][0] == version and first <= merged[-1][2] + 1:
+                merged[-1] = (version, merged[-1][1], max(merged[-1][2], last))
+            else:
+                merged.append((version, first, last))
+        return merged
+    
+    @staticmethod
+    def _subtract(ranges: List[Tuple[int, int, int]], excluded: List[Tuple[int, int, int]]) -> List[Tuple[int, int, int]]:
+        result = []
+        for version, first, last in ranges:
+            for ex_version, ex_first, ex_last in excluded:
+                if ex_version != version or ex_last < first or ex_first > last:
+                    continue
+                if ex_first > first:
+                    result.append((version, first, ex_first - 1))
+                first = ex_last + 1
+                if first > last:
+                    break
+            if first <= last:
+                result.append((version, first, last))
+        return result
+    
+    def __contains__(self, address: str) -> bool:
+        try:
+            ip = ipaddress.ip_address(address)
+        except ValueError:
+            return False
+        value = int(ip)
+        return any(version == ip.version and first <= value <= last for version, first, last in self.ranges)
+    
+    def __len__(self) -> int:
+        return sum(last - first + 1 for _, first, last in self.ranges)
+    
+    def __iter__(self) -> Iterator[str]:
+        return self._iter_ranges(self.ranges)
+    
+    @staticmethod
+    def _iter_ranges(ranges: List[Tuple[int, int, int]]) -> Iterator[str]:
+        for version, first, last in ranges:
+            address_type = ipaddress.IPv4Address if version == 4 else ipaddress.IPv6Address
+            for value in range(first, last + 1):
+                yield str(address_type(value))
+    
+    def iter_from(self, offset: int) -> Iterator[str]:
+        """Iterate every host once, starting at a host offset and wrapping around"""
+        total = len(self)
+        remaining = offset % total if total else 0
+        before, after = [], []
+        for version, first, last in self.ranges:
+            size = last - first + 1
+            if remaining >= size:
+                before.append((version, first, last))
+                remaining -= size
+            elif remaining > 0:
+                before.append((version, first, first + remaining - 1))
+                after.append((version, first + remaining, last))
+                remaining = 0
+            else:
+                after.append((version, first, last))
+        return self._iter_ranges(after + before)
+    
+    def chunks(self, size: int) -> Iterator[List[str]]:
+        """Yield successive host lists of at most size entries"""
+        chunk = []
+        for host in self:
+            chunk.append(host)
+            if len(chunk) >= size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
 
 class NetworkDiscoveryEngine:
     """
@@ -85,12 +255,32 @@ class NetworkDiscoveryEngine:
             'scan_start_time': None,
             'scan_duration': 0,
             'protocols_scanned': [],
-            'errors_encountered': 0
+            'errors_encountered': 0,
+            'hosts_alive': 0,
+            'open_ports': 0,
+            'hosts_total': 0,
+            'hosts_scanned': 0,
+            'progress_percent': 0.0,
+            'eta_seconds': None,
+            'scan_mode': None,
+            'known_endpoints_checked': 0,
+            'endpoints_offline': 0,
+            'endpoints_reidentified': 0,
+            'classifications_skipped': 0,
+            'background_hosts_probed': 0,
+            'cached_ports_checked': 0
         }
         
+        # Per-endpoint fingerprint and classification, mirrored in protocol_endpoints
+        self.endpoint_records: Dict[str, Dict] = {}
+        self.background_cursor = 0
+        # Last identification attempt for cached open ports no scanner recognised
+        self.port_identify_attempts: Dict[Tuple[str, int], datetime] = {}
+        
         # Initialize components
         self.database = DiscoveryDatabase()
-        self.device_classifier = DeviceClassifier()
+        self.device_classifier = DeviceClassifier(database=self.database,
+                                                  process_workers=self.config.classification_workers)
         self.api_server = DiscoveryAPI(self)
         
         # Initialize protocol scanners
@@ -104,6 +294,24 @@ class NetworkDiscoveryEngine:
         # Thread pool for concurrent scanning
         self.executor = ThreadPoolExecutor(max_workers=self.config.max_concurrent_scans)
         
+        # Scan scheduler: bounded in-flight hosts plus a global probe rate ceiling
+        self.scan_semaphore = asyncio.Semaphore(self.config.max_concurrent_scans)
+        self.rate_limiter = TokenBucketRateLimiter(
+            self._probe_rate(), burst=self.config.max_concurrent_scans
+        )
+        self.port_prober = PortProber(
+            timeout=self.config.probe_timeout,
+            semaphore=self.scan_semaphore,
+            rate_limiter=self.rate_limiter
+        )
+        
+        # Slower prober for unknown address space during incremental rescans
+        self.background_prober = PortProber(
+            timeout=self.config.probe_timeout,
+            semaphore=self.scan_semaphore,
+            rate_limiter=TokenBucketRateLimiter(self.config.background_probe_rate)
+        )
+        
         logger.info("Network Discovery Engine initialized successfully")
 
     def _load_configuration(self, config_path: str) -> ScanConfiguration:
@@ -121,7 +329,20 @@ class NetworkDiscoveryEngine:
             "rate_limit_delay": 0.1,
             "protocols_enabled": ["modbus", "opcua", "mqtt", "ethernet_ip"],
             "security_mode": "passive",
-            "emergency_stop": False
+            "emergency_stop": False,
+            "max_probes_per_second": 0.0,
+            "port_probe_enabled": True,
+            "probe_timeout": 1.0,
+            "liveness_check": False,
+            "exclude_ranges": [],
+            "scan_chunk_size": 1024,
+            "incremental_identify_minutes": 60,
+            "background_probe_rate": 2.0,
+            "background_hosts_per_cycle": 256,
+            "ethernet_ip_broadcast": True,
+            "broadcast_window": 1.0,
+            "classification_workers": 2,
+            "modbus_max_in_flight": 16
         }
         
         if config_path:
@@ -134,6 +355,15 @@ class NetworkDiscoveryEngine:
         
         return ScanConfiguration(**default_config)
 
+    def _probe_rate(self) -> float:
+        """Global probes per second for the token bucket"""
+        if self.config.max_probes_per_second > 0:
+            return self.config.max_probes_per_second
+        if self.config.rate_limit_delay <= 0:
+            return 0.0
+        # Same ceiling as one rate-limited sequential loop per enabled protocol
+        return len(self.config.protocols_enabled) / self.config.rate_limit_delay
+
     async def discover_network(self, target_networks: List[str] = None) -> Dict[str, List[DiscoveredDevice]]:
         """
         Main discovery method that orchestrates network scanning across all protocols
@@ -153,9 +383,7 @@ class NetworkDiscoveryEngine:
             return self.get_discovered_devices()
             
         self.scanning_active = True
-        self.scan_statistics['scan_start_time'] = datetime.now()
-        self.scan_statistics['devices_discovered'] = 0
-        self.scan_statistics['errors_encountered'] = 0
+        self._reset_scan_statistics('full')
         
         logger.info("Starting comprehensive network discovery...")
         
@@ -163,22 +391,26 @@ class NetworkDiscoveryEngine:
             # Use provided networks or default from config
             networks = target_networks or self.config.network_ranges
             
-            # Generate target IP addresses
+            # Lazy target iterator - hosts are materialized one chunk at a time
             target_hosts = self._generate_target_hosts(networks)
-            logger.info(f"Scanning {len(target_hosts)} potential hosts across {len(networks)} networks")
-            
-            # Scan each protocol concurrently
-            scan_tasks = []
-            for protocol in self.config.protocols_enabled:
-                if protocol in self.scanners:
-                    task = self._scan_protocol(protocol, target_hosts)
-                    scan_tasks.append(task)
+            total_hosts = len(target_hosts)
+            self.scan_statistics['hosts_total'] = total_hosts
+            self.scan_statistics['hosts_scanned'] = 0
+            logger.info(f"Scanning {total_hosts} potential hosts across {len(networks)} networks")
             
-            # Execute all scans concurrently
-            scan_results = await asyncio.gather(*scan_tasks, return_exceptions=True)
+            # EtherNet/IP subnets that answer a ListIdentity broadcast skip per-host TCP identification
+            broadcast_networks = await self._broadcast_ethernet_ip(networks, target_hosts)
             
-            # Process and classify discovered devices
-            await self._process_scan_results(scan_results)
+            sweep_start = time.monotonic()
+            for chunk in target_hosts.chunks(self.config.scan_chunk_size):
+                if self.emergency_stop:
+                    logger.warning("Discovery stopped - emergency stop activated")
+                    break
+                
+                await self._scan_chunk(chunk, broadcast_networks=broadcast_networks)
+                
+                self.scan_statistics['hosts_scanned'] += len(chunk)
+                self._report_progress(self.scan_statistics['hosts_scanned'], total_hosts, sweep_start)
             
             # Update scan statistics
             self.scan_statistics['scan_duration'] = (datetime.now() - self.scan_statistics['scan_start_time']).total_seconds()
@@ -198,63 +430,406 @@ class NetworkDiscoveryEngine:
         finally:
             self.scanning_active = False
 
-    def _generate_target_hosts(self, networks: List[str]) -> List[str]:
-        """Generate list of target IP addresses from network ranges"""
-        target_hosts = []
+    def _reset_scan_statistics(self, scan_mode: str):
+        """Reset per-scan counters"""
+        self.scan_statistics['scan_start_time'] = datetime.now()
+        self.scan_statistics['scan_mode'] = scan_mode
+        for counter in ['devices_discovered', 'errors_encountered', 'hosts_alive', 'open_ports',
+                        'known_endpoints_checked', 'endpoints_offline', 'endpoints_reidentified',
+                        'classifications_skipped', 'background_hosts_probed', 'cached_ports_checked']:
+            self.scan_statistics[counter] = 0
+
+    async def incremental_rescan(self, target_networks: List[str] = None) -> Dict[str, List[DiscoveredDevice]]:
+        """
+        Incremental rescan for continuous monitoring
         
-        for network in networks:
-            try:
-                net = ipaddress.ip_network(network, strict=False)
-                # Limit to first 254 hosts for large networks to prevent flooding
-                host_count = min(254, net.num_addresses - 2)
-                hosts = list(net.hosts())[:host_count]
-                target_hosts.extend([str(host) for host in hosts])
-                
-            except Exception as e:
-                logger.error(f"Invalid network range {network}: {e}")
-                self.scan_statistics['errors_encountered'] += 1
+        Known endpoints from the devices/protocol_endpoints tables get a cheap
+        liveness probe; only endpoints due for refresh are re-identified, and
+        the classifier only runs when a device fingerprint changed. Ports the
+        open-port cache has open but no endpoint for are re-probed and
+        identified. A slice of the remaining address space is swept at the
+        background probe rate, skipping recently closed ports.
+        """
+        if self.emergency_stop:
+            logger.error("Incremental rescan blocked - emergency stop active")
+            return {}
+            
+        if self.scanning_active:
+            logger.warning("Discovery already in progress")
+            return self.get_discovered_devices()
+            
+        self.scanning_active = True
+        self._reset_scan_statistics('incremental')
+        loop = asyncio.get_running_loop()
+        
+        try:
+            networks = target_networks or self.config.network_ranges
+            target_hosts = self._generate_target_hosts(networks)
+            known = await loop.run_in_executor(self.executor, self.database.get_known_endpoints)
+            self._restore_known_endpoints(known)
+            known_endpoints = {(endpoint['ip_address'], endpoint['port']) for endpoint in known}
+            
+            # Open ports from earlier sweeps that were never identified, and recently closed ports
+            port_cache = await loop.run_in_executor(self.executor, self.database.get_open_ports,
+                                                    self.config.incremental_identify_minutes, True)
+            enabled_ports = set(self._enabled_ports())
+            cached_open = []
+            recently_closed = set()
+            for ip_address, ports in port_cache.items():
+                if ip_address not in target_hosts:
+                    continue
+                for port, info in ports.items():
+                    if port not in enabled_ports or (ip_address, port) in known_endpoints:
+                        continue
+                    if info['state'] == PORT_OPEN:
+                        cached_open.append((ip_address, port))
+                    elif info['state'] == PORT_CLOSED:
+                        recently_closed.add((ip_address, port))
+            
+            # Stage 1: liveness of known endpoints and cached open ports
+            states = await asyncio.gather(
+                *(self.port_prober.probe_port(endpoint['ip_address'], endpoint['port']) for endpoint in known),
+                *(self.port_prober.probe_port(ip_address, port) for ip_address, port in cached_open)
+            )
+            cached_states = states[len(known):]
+            states = states[:len(known)]
+            refresh_before = datetime.now() - timedelta(minutes=self.config.incremental_identify_minutes)
+            liveness = []
+            due = []
+            for endpoint, (state, response_time) in zip(known, states):
+                alive = state == PORT_OPEN
+                liveness.append({
+                    'id': endpoint['id'],
+                    'device_id': endpoint['device_id'],
+                    'is_active': alive,
+                    'response_time': response_time
+                })
+                device = self.discovered_devices.get(f"{endpoint['ip_address']}:{endpoint['port']}")
+                if not alive:
+                    self.scan_statistics['endpoints_offline'] += 1
+                    if device:
+                        device.connection_status = 'Offline'
+                    continue
                 
+                identified_at = endpoint['endpoint_data'].get('identified_at')
+                if device is None or not identified_at or datetime.fromisoformat(identified_at) < refresh_before:
+                    due.append(endpoint)
+                else:
+                    device.last_seen = datetime.now()
+                    device.connection_status = 'Active'
+            
+            self.scan_statistics['known_endpoints_checked'] = len(known)
+            await loop.run_in_executor(self.executor, self.database.update_endpoint_liveness, liveness)
+            
+            # Open ports that no scanner recognised are retried once per refresh window
+            self.port_identify_attempts = {pair: attempted for pair, attempted in self.port_identify_attempts.items()
+                                           if attempted >= refresh_before}
+            port_updates: Dict[str, Dict[int, Dict]] = {}
+            still_open = []
+            for (ip_address, port), (state, response_time) in zip(cached_open, cached_states):
+                port_updates.setdefault(ip_address, {})[port] = {'state': state, 'response_time': response_time}
+                if state == PORT_OPEN and (ip_address, port) not in self.port_identify_attempts:
+                    still_open.append((ip_address, port))
+                    self.port_identify_attempts[(ip_address, port)] = datetime.now()
+            self.scan_statistics['cached_ports_checked'] = len(cached_open)
+            await loop.run_in_executor(self.executor, self.database.store_open_ports, port_updates)
+            
+            # Stage 2: re-identify endpoints due for refresh (classification skipped if fingerprint unchanged)
+            # and identify cached open ports for every protocol configured on that port
+            scanned = await asyncio.gather(
+                *(self._scan_host(endpoint['protocol'], endpoint['ip_address'], [endpoint['port']]) for endpoint in due),
+                *(self._scan_host(protocol, ip_address, [port])
+                  for ip_address, port in still_open
+                  for protocol in self.config.protocols_enabled
+                  if protocol in self.scanners and port in self.config.port_ranges.get(protocol, []))
+            )
+            refreshed = await self._identify_devices([info for info in scanned if info])
+            self.scan_statistics['endpoints_reidentified'] = len(due)
+            await self._process_scan_results([{'refresh': refreshed}])
+            
+            # Stage 3: unknown address space at the background rate
+            if not self.emergency_stop:
+                await self._background_sweep(target_hosts, known_endpoints | set(cached_open) | recently_closed)
+            
+            self.scan_statistics['scan_duration'] = (datetime.now() - self.scan_statistics['scan_start_time']).total_seconds()
+            logger.info(f"Incremental rescan completed: {len(known)} known endpoints checked, "
+                        f"{len(due)} re-identified, {len(cached_open)} cached open ports checked, "
+                        f"{self.scan_statistics['classifications_skipped']} classifications skipped, "
+                        f"{self.scan_statistics['background_hosts_probed']} new hosts probed "
+                        f"in {self.scan_statistics['scan_duration']:.2f} seconds")
+            
+            await self._persist_discovery_results()
+            
+            return self.get_discovered_devices()
+            
+        except Exception as e:
+            logger.error(f"Incremental rescan failed: {e}")
+            self.scan_statistics['errors_encountered'] += 1
+            raise
+        finally:
+            self.scanning_active = False
+
+    def _restore_known_endpoints(self, known: List[Dict]):
+        """Rebuild in-memory devices and fingerprints from persisted endpoints (e.g. after restart)"""
+        for endpoint in known:
+            key = f"{endpoint['ip_address']}:{endpoint['port']}"
+            data = endpoint['endpoint_data']
+            if key not in self.endpoint_records and data.get('fingerprint'):
+                self.endpoint_records[key] = {
+                    'fingerprint': data['fingerprint'],
+                    'classification': data.get('classification'),
+                    'identified_at': data.get('identified_at')
+                }
+            if key not in self.discovered_devices and data.get('device'):
+                try:
+                    device_data = dict(data['device'])
+                    device_data['last_seen'] = datetime.fromisoformat(device_data['last_seen'])
+                    self.discovered_devices[key] = DiscoveredDevice(**device_data)
+                except Exception as e:
+                    logger.debug(f"Could not restore device {key}: {e}")
+
+    async def _background_sweep(self, target_hosts: TargetGenerator, known_endpoints: Set[Tuple[str, int]]):
+        """
+        Probe the next slice of unknown address space at the background rate
+        
+        Known hosts stay in the sweep so new services on them are found; only
+        their known (host, port) endpoints, which the liveness stage or the
+        open-port cache already cover, are skipped.
+        """
+        total_hosts = len(target_hosts)
+        if not total_hosts:
+            return
+        
+        ports = self._enabled_ports()
+        hosts = []
+        consumed = 0
+        for host in target_hosts.iter_from(self.background_cursor):
+            consumed += 1
+            if any((host, port) not in known_endpoints for port in ports):
+                hosts.append(host)
+                if len(hosts) >= self.config.background_hosts_per_cycle:
+                    break
+        self.background_cursor = (self.background_cursor + consumed) % total_hosts
+        
+        if hosts:
+            await self._scan_chunk(hosts, prober=self.background_prober, skip_endpoints=known_endpoints)
+        self.scan_statistics['background_hosts_probed'] = len(hosts)
+
+    def _generate_target_hosts(self, networks: List[str]) -> TargetGenerator:
+        """Lazy, deduplicated target addresses from network ranges minus exclusions"""
+        target_hosts = TargetGenerator(networks, self.config.exclude_ranges)
+        self.scan_statistics['errors_encountered'] += len(target_hosts.invalid)
         return target_hosts
 
-    async def _scan_protocol(self, protocol: str, target_hosts: List[str]) -> Dict[str, List[DiscoveredDevice]]:
-        """Scan a specific protocol across target hosts"""
-        scanner = self.scanners[protocol]
-        logger.info(f"Starting {protocol.upper()} protocol scan across {len(target_hosts)} hosts")
+    async def _broadcast_ethernet_ip(self, networks: List[str], target_hosts: TargetGenerator) -> List:
+        """
+        Enumerate EtherNet/IP devices with one UDP ListIdentity broadcast per subnet
+        
+        Returns:
+            Networks that answered; hosts in them need no per-host EtherNet/IP scan
+        """
+        if 'ethernet_ip' not in self.config.protocols_enabled or not self.config.ethernet_ip_broadcast:
+            return []
+        
+        try:
+            replies, responsive = await self.scanners['ethernet_ip'].broadcast_list_identity(
+                networks, self.config.broadcast_window
+            )
+        except Exception as e:
+            logger.error(f"EtherNet/IP broadcast discovery failed: {e}")
+            return []
+        
+        # Replies from excluded or out-of-range addresses are dropped
+        device_infos = [info for ip_address, info in replies.items() if ip_address in target_hosts]
+        devices = await self._identify_devices(device_infos)
+        await self._process_scan_results([{'ethernet_ip': devices}])
+        
+        if responsive:
+            logger.info(f"EtherNet/IP broadcast covered {len(responsive)} networks; "
+                        f"per-host TCP discovery kept for {len(networks) - len(responsive)}")
+        return [ipaddress.ip_network(spec, strict=False) for spec in responsive]
+
+    async def _scan_chunk(self, hosts: List[str], prober: Optional[PortProber] = None,
+                          broadcast_networks: Optional[List] = None,
+                          skip_endpoints: Optional[Set[Tuple[str, int]]] = None):
+        """Pre-probe one chunk of hosts, then identify its open endpoints per protocol"""
+        # Stage 1: shared liveness/port sweep, so identification only touches open endpoints
+        port_table = await self._probe_open_ports(hosts, prober, skip_endpoints)
+        
+        # Stage 2: scan each protocol concurrently
+        scan_tasks = []
+        for protocol in self.config.protocols_enabled:
+            if protocol in self.scanners:
+                endpoints = self._protocol_endpoints(protocol, hosts, port_table, skip_endpoints)
+                if protocol == 'ethernet_ip' and broadcast_networks:
+                    endpoints = {host: ports for host, ports in endpoints.items()
+                                 if not any(ipaddress.ip_address(host) in net for net in broadcast_networks)}
+                task = self._scan_protocol(protocol, endpoints)
+                scan_tasks.append(task)
+        
+        # Execute all scans concurrently
+        scan_results = await asyncio.gather(*scan_tasks, return_exceptions=True)
+        
+        # Process and classify discovered devices
+        await self._process_scan_results(scan_results)
+
+    def _report_progress(self, scanned: int, total: int, started: float):
+        """Update sweep progress and ETA in scan statistics"""
+        elapsed = time.monotonic() - started
+        progress = scanned / total if total else 1.0
+        eta = elapsed / scanned * (total - scanned) if scanned else None
+        
+        self.scan_statistics['progress_percent'] = round(progress * 100, 1)
+        self.scan_statistics['eta_seconds'] = round(eta, 1) if eta is not None else None
+        
+        eta_text = str(timedelta(seconds=int(eta))) if eta is not None else 'unknown'
+        logger.info(f"Progress: {scanned}/{total} hosts ({progress:.1%}), "
+                    f"{len(self.discovered_devices)} devices, ETA {eta_text}")
+
+    def _enabled_ports(self) -> List[int]:
+        """Union of configured ports across enabled protocols"""
+        ports = set()
+        for protocol in self.config.protocols_enabled:
+            ports.update(self.config.port_ranges.get(protocol, []))
+        return sorted(ports)
+
+    async def _probe_open_ports(self, target_hosts: List[str], prober: Optional[PortProber] = None,
+                                skip_endpoints: Optional[Set[Tuple[str, int]]] = None) -> Optional[Dict[str, Dict[int, Dict]]]:
+        """Run the liveness pass and connect sweep, caching the open-port table"""
+        if not self.config.port_probe_enabled:
+            return None
+        
+        prober = prober or self.port_prober
+        hosts = target_hosts
+        if self.config.liveness_check:
+            hosts = await prober.live_hosts(target_hosts)
+            self.scan_statistics['hosts_alive'] += len(hosts)
+        
+        port_table = await prober.sweep(hosts, self._enabled_ports(), skip_endpoints)
+        self.scan_statistics['open_ports'] += sum(
+            1 for ports in port_table.values() for info in ports.values() if info['state'] == PORT_OPEN
+        )
+        
+        try:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(self.executor, self.database.store_open_ports, port_table)
+        except Exception as e:
+            logger.error(f"Failed to cache open ports: {e}")
+        
+        return port_table
+
+    def _protocol_endpoints(self, protocol: str, target_hosts: List[str],
+                            port_table: Optional[Dict[str, Dict[int, Dict]]],
+                            skip_endpoints: Optional[Set[Tuple[str, int]]] = None) -> Dict[str, Optional[List[int]]]:
+        """Hosts to identify for a protocol, with their confirmed-open ports"""
+        skip_endpoints = skip_endpoints or set()
+        protocol_ports = self.config.port_ranges.get(protocol, [])
         
-        discovered = []
+        if port_table is None:
+            # Pre-probe disabled: scanners probe their own configured ports, minus known endpoints
+            endpoints = {}
+            for host in target_hosts:
+                ports = [port for port in protocol_ports if (host, port) not in skip_endpoints]
+                if len(ports) == len(protocol_ports):
+                    endpoints[host] = None
+                elif ports:
+                    endpoints[host] = ports
+            return endpoints
         
-        for host in target_hosts:
+        endpoints = {}
+        for host, ports in port_table.items():
+            open_ports = [port for port in protocol_ports
+                          if ports.get(port, {}).get('state') == PORT_OPEN and (host, port) not in skip_endpoints]
+            if open_ports:
+                endpoints[host] = open_ports
+        return endpoints
+
+    async def _scan_protocol(self, protocol: str, endpoints: Dict[str, Optional[List[int]]]) -> Dict[str, List[DiscoveredDevice]]:
+        """Scan a specific protocol across target endpoints concurrently"""
+        logger.info(f"Starting {protocol.upper()} protocol scan across {len(endpoints)} hosts")
+        
+        results = await asyncio.gather(
+            *(self._scan_host(protocol, host, ports) for host, ports in endpoints.items())
+        )
+        # Classification runs in the classifier's worker processes, off the event loop
+        discovered = await self._identify_devices([info for info in results if info])
+        
+        if self.emergency_stop:
+            logger.warning(f"{protocol.upper()} scan stopped - emergency stop activated")
+        logger.info(f"{protocol.upper()} scan completed. Found {len(discovered)} devices")
+        return {protocol: discovered}
+
+    async def _scan_host(self, protocol: str, host: str, ports: Optional[List[int]] = None) -> Optional[Dict]:
+        """Scan one host for one protocol under the shared semaphore and rate limiter"""
+        async with self.scan_semaphore:
             if self.emergency_stop:
-                logger.warning(f"{protocol.upper()} scan stopped - emergency stop activated")
-                break
+                return None
                 
             try:
                 # Rate limiting to prevent network flooding
-                await asyncio.sleep(self.config.rate_limit_delay)
+                await self.rate_limiter.acquire()
+                if self.emergency_stop:
+                    return None
                 
                 # Scan this host for the current protocol
-                device_info = await scanner.scan_host(host)
-                
-                if device_info:
-                    # Apply AI classification
-                    classified_device = await self._classify_device(device_info)
-                    discovered.append(classified_device)
-                    self.scan_statistics['devices_discovered'] += 1
-                    
-                    logger.info(f"Discovered {classified_device.manufacturer} {classified_device.model} at {host}")
+                return await self.scanners[protocol].scan_host(host, ports)
                     
             except Exception as e:
                 logger.debug(f"Error scanning {host} for {protocol}: {e}")
                 
-        logger.info(f"{protocol.upper()} scan completed. Found {len(discovered)} devices")
-        return {protocol: discovered}
+        return None
 
-    async def _classify_device(self, device_info: Dict) -> DiscoveredDevice:
-        """Apply AI classification to discovered device"""
-        try:
-            classification = await self.device_classifier.classify_device(device_info)
+    async def _identify_devices(self, device_infos: List[Dict]) -> List[DiscoveredDevice]:
+        """Classify scanned devices in one batch, skipping endpoints whose fingerprint is unchanged"""
+        devices: List[Optional[DiscoveredDevice]] = [None] * len(device_infos)
+        fingerprints = {}
+        to_classify = []
+        
+        for index, device_info in enumerate(device_infos):
+            key = f"{device_info['ip_address']}:{device_info['port']}"
+            fingerprint = device_fingerprint(device_info)
+            known = self.endpoint_records.get(key)
             
-            device = DiscoveredDevice(
+            if known and known['fingerprint'] == fingerprint and known.get('classification'):
+                self.scan_statistics['classifications_skipped'] += 1
+                # Identification just confirmed the fingerprint, so the refresh clock restarts
+                known['identified_at'] = datetime.now().isoformat()
+                devices[index] = self._build_device(device_info, known['classification'])
+            else:
+                fingerprints[index] = fingerprint
+                to_classify.append(index)
+        
+        if to_classify:
+            batch = [device_infos[index] for index in to_classify]
+            async for position, classification in self.device_classifier.classify_many(batch):
+                index = to_classify[position]
+                device_info = device_infos[index]
+                devices[index] = self._build_device(device_info, classification)
+                key = f"{device_info['ip_address']}:{device_info['port']}"
+                if classification.get('error'):
+                    # No record for failed classifications, so the next scan retries them
+                    self.endpoint_records.pop(key, None)
+                    continue
+                self.endpoint_records[key] = {
+                    'fingerprint': fingerprints[index],
+                    'classification': {
+                        'device_type': classification.get('device_type', 'Unknown'),
+                        'manufacturer': classification.get('manufacturer', 'Unknown'),
+                        'model': classification.get('model', 'Unknown'),
+                        'confidence_score': classification.get('confidence_score', 0.0)
+                    },
+                    'identified_at': datetime.now().isoformat()
+                }
+        
+        discovered = [device for device in devices if device is not None]
+        for device in discovered:
+            self.scan_statistics['devices_discovered'] += 1
+            logger.info(f"Discovered {device.manufacturer} {device.model} at {device.ip_address}")
+        return discovered
+
+    def _build_device(self, device_info: Dict, classification: Dict) -> DiscoveredDevice:
+        """Combine scanner output and classification into a DiscoveredDevice"""
+        return DiscoveredDevice(
                 ip_address=device_info['ip_address'],
                 port=device_info['port'],
                 protocol=device_info['protocol'],
@@ -270,12 +845,6 @@ class NetworkDiscoveryEngine:
                 security_level=self._assess_security_level(device_info),
                 network_zone=self._determine_network_zone(device_info['ip_address'])
             )
-            
-            return device
-            
-        except Exception as e:
-            logger.error(f"Device classification failed: {e}")
-            raise
 
     def _assess_security_level(self, device_info: Dict) -> str:
         """Assess security level of discovered device"""
@@ -326,12 +895,42 @@ class NetworkDiscoveryEngine:
     async def _persist_discovery_results(self):
         """Persist discovery results to database"""
         try:
-            for device in self.discovered_devices.values():
-                await self.database.store_device(device)
-            logger.info(f"Persisted {len(self.discovered_devices)} devices to database")
+            devices = list(self.discovered_devices.values())
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(self.executor, self._store_devices, devices)
+            logger.info(f"Persisted {len(devices)} devices to database")
         except Exception as e:
             logger.error(f"Failed to persist results: {e}")
 
+    def _store_devices(self, devices: List[DiscoveredDevice]):
+        """Write devices and their protocol endpoints (with fingerprints) to the database"""
+        by_address = defaultdict(list)
+        for device in devices:
+            by_address[device.ip_address].append(device)
+        
+        for ip_address, endpoints in by_address.items():
+            best = max(endpoints, key=lambda device: device.confidence_score)
+            device_id = self.database.add_device({
+                'ip_address': ip_address,
+                'device_type': best.device_type,
+                'vendor': best.manufacturer,
+                'model': best.model,
+                'firmware_version': best.firmware_version,
+                'protocols': sorted({device.protocol for device in endpoints}),
+                'confidence_score': best.confidence_score
+            })
+            
+            for device in endpoints:
+                device_data = asdict(device)
+                device_data['last_seen'] = device.last_seen.isoformat()
+                record = self.endpoint_records.get(f"{ip_address}:{device.port}", {})
+                self.database.add_protocol_endpoint(device_id, {
+                    'protocol': device.protocol,
+                    'port': device.port,
+                    'endpoint_data': dict(record, device=device_data),
+                    'is_active': device.connection_status == 'Active'
+                })
+
     def get_discovered_devices(self) -> Dict[str, List[DiscoveredDevice]]:
         """Get discovered devices organized by protocol"""
         devices_by_protocol = {}
@@ -390,17 +989,42 @@ class NetworkDiscoveryEngine:
         else:
             raise ValueError(f"Unsupported export format: {format}")
 
-    async def start_continuous_monitoring(self, interval_minutes: int = 15):
-        """Start continuous monitoring mode with periodic rescans"""
-        logger.info(f"Starting continuous monitoring with {interval_minutes} minute intervals")
+    async def start_continuous_monitoring(self, interval_minutes: int = 15, incremental: bool = True,
+                                          full_scan_every: int = 0):
+        """
+        Start continuous monitoring mode with periodic rescans
         
-        while not self.emergency_stop:
-            try:
-                await self.discover_network()
-                await asyncio.sleep(interval_minutes * 60)
-            except Exception as e:
-                logger.error(f"Error in continuous monitoring: {e}")
-                await asyncio.sleep(60)  # Wait 1 minute before retrying
+        Args:
+            interval_minutes: Minutes between scan cycles
+            incremental: Use incremental rescans after the initial full discovery
+            full_scan_every: Force a full discovery every N cycles (0 = never)
+        """
+        logger.info(f"Starting continuous monitoring with {interval_minutes} minute intervals "
+                    f"({'incremental' if incremental else 'full'} rescans)")
+        
+        cycle = 0
+        try:
+            while not self.emergency_stop:
+                try:
+                    if not incremental or cycle == 0 or (full_scan_every and cycle % full_scan_every == 0):
+                        await self.discover_network()
+                    else:
+                        await self.incremental_rescan()
+                    cycle += 1
+                    await asyncio.sleep(interval_minutes * 60)
+                except Exception as e:
+                    logger.error(f"Error in continuous monitoring: {e}")
+                    await asyncio.sleep(60)  # Wait 1 minute before retrying
+        finally:
+            # Classifier workers are recreated on demand if scanning resumes
+            self.device_classifier.shutdown()
+
+    def shutdown(self):
+        """Stop classifier worker processes and the scan thread pool"""
+        self.scanning_active = False
+        self.device_classifier.shutdown()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        logger.info("Discovery engine shut down")
 
     def start_api_server(self, host: str = '0.0.0.0', port: int = 8085):
         """Start REST API server for external integration"""
@@ -431,5 +1055,7 @@ if __name__ == "__main__":
             logger.info("Discovery engine stopped by user")
         except Exception as e:
             logger.error(f"Discovery engine error: {e}")
+        finally:
+            engine.shutdown()
 
     asyncio.run(main())
\ No newline at end of file
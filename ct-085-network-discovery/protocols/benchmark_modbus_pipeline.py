@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+CT-085 Modbus identification benchmark
+
+Starts a local asyncio Modbus TCP stand-in server that answers read
+requests after a simulated network round trip, then times full device
+identification with ModbusScanner using serial requests (one transaction
+in flight) versus the pipelined transaction layer.
+
+Usage:
+    python3 benchmark_modbus_pipeline.py --rtt-ms 20 --unit-id 255 --runs 5
+"""
+
+import sys
+import time
+import struct
+import asyncio
+import argparse
+import logging
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from modbus_scanner import ModbusScanner
+
+DEVICE_TEXT = b'SCHNEIDER ELECTRIC MODICON M340 '
+GATEWAY_TARGET_FAILED = 0x0B
+
+class ModbusStandInServer:
+    """Minimal Modbus TCP responder for read function codes 0x01-0x04"""
+
+    def __init__(self, unit_id: int, rtt: float, silent_units: bool):
+        self.unit_id = unit_id
+        self.rtt = rtt
+        self.silent_units = silent_units
+        self.requests = 0
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                frame = await reader.readexactly(12)
+                self.requests += 1
+                # Each reply leaves after one simulated round trip, independent of other requests
+                asyncio.create_task(self._reply(writer, frame))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+
+    async def _reply(self, writer, frame: bytes):
+        trans_id, proto_id, length, unit, func, address, count = struct.unpack('>HHHBBHH', frame)
+        await asyncio.sleep(self.rtt)
+
+        if unit != self.unit_id:
+            if self.silent_units:
+                return
+            pdu = struct.pack('>BB', func | 0x80, GATEWAY_TARGET_FAILED)
+        elif func in (0x01, 0x02):
+            byte_count = (count + 7) // 8
+            pdu = struct.pack('>BB', func, byte_count) + b'\x01' * byte_count
+        else:
+            data = bytes(DEVICE_TEXT[(address * 2 + i) % len(DEVICE_TEXT)] for i in range(count * 2))
+            pdu = struct.pack('>BB', func, len(data)) + data
+
+        if not writer.is_closing():
+            writer.write(struct.pack('>HHHB', trans_id, proto_id, len(pdu) + 1, unit) + pdu)
+
+class BenchmarkConfig:
+    port_ranges = {'modbus': [15020]}
+    
+    def __init__(self, modbus_max_in_flight: int):
+        self.modbus_max_in_flight = modbus_max_in_flight
+
+async def identify(scanner: ModbusScanner, port: int, runs: int) -> float:
+    elapsed = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        device_info = await scanner.scan_host('127.0.0.1', [port])
+        elapsed.append(time.perf_counter() - start)
+        assert device_info and device_info.get('manufacturer_detection'), "Identification failed"
+    return sum(elapsed) / len(elapsed)
+
+async def run_benchmark(rtt_ms: float, unit_id: int, runs: int, port: int, silent_units: bool):
+    stand_in = ModbusStandInServer(unit_id, rtt_ms / 1000.0, silent_units)
+    server = await asyncio.start_server(stand_in.handle, '127.0.0.1', port)
+
+    results = {}
+    async with server:
+        for mode, max_in_flight in [('serial', 1), ('pipelined', ModbusScanner.MAX_IN_FLIGHT)]:
+            scanner = ModbusScanner(BenchmarkConfig(max_in_flight))
+            stand_in.requests = 0
+            results[mode] = await identify(scanner, port, runs)
+            requests_per_device = stand_in.requests / runs
+
+    print(f"Modbus identification benchmark: rtt {rtt_ms:.1f} ms, responsive unit ID {unit_id}, "
+          f"{'silent' if silent_units else 'exception'} replies from other units, {runs} runs")
+    print(f"  requests per device: {requests_per_device:.0f}")
+    for mode, elapsed in results.items():
+        print(f"  {mode:<10} {elapsed * 1000:10.1f} ms/device  {elapsed / (rtt_ms / 1000.0):8.1f} round trips")
+    print(f"  speedup    {results['serial'] / results['pipelined']:8.2f}x")
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="CT-085 Modbus pipelined identification benchmark")
+    parser.add_argument("--rtt-ms", type=float, default=20.0, help="Simulated round trip per request")
+    parser.add_argument("--unit-id", type=int, default=255, help="Unit ID the stand-in answers on")
+    parser.add_argument("--runs", type=int, default=5, help="Identifications per mode")
+    parser.add_argument("--port", type=int, default=15020)
+    parser.add_argument("--silent-units", action="store_true",
+                        help="Ignore other unit IDs instead of returning gateway exceptions (costs one request timeout)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    asyncio.run(run_benchmark(args.rtt_ms, args.unit_id, args.runs, args.port, args.silent_units))
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,7 @@ Supports Allen-Bradley, Rockwell Automation, and other CIP-compatible devices
 """
 
 import asyncio
+import ipaddress
 import logging
 import socket
 import struct
@@ -47,16 +48,27 @@ class EtherNetIPDevice:
     config_capability: Optional[int] = None
     config_control: Optional[int] = None
 
+class ListIdentityCollector(asyncio.DatagramProtocol):
+    """Collects UDP ListIdentity replies, keeping the first datagram per source address"""
+    
+    def __init__(self):
+        self.replies: Dict[str, bytes] = {}
+    
+    def datagram_received(self, data: bytes, addr: Tuple):
+        self.replies.setdefault(addr[0], data)
+
 class EthernetIPScanner:
     """
     EtherNet/IP (CIP) protocol scanner for industrial device discovery
     Implements safe discovery using List Identity and List Services commands
     """
     
-    def __init__(self):
+    def __init__(self, config=None):
+        self.config = config
         self.logger = logging.getLogger('EthernetIPScanner')
         self.default_ports = [44818, 2222]  # EtherNet/IP ports (TCP and UDP)
         self.timeout = 5.0
+        self.broadcast_window = getattr(config, 'broadcast_window', 1.0)
         
         # EtherNet/IP Encapsulation Commands
         self.EIP_CMD_NOP = 0x0000
@@ -276,7 +288,33 @@ class EthernetIPScanner:
             0x33: "Hydraulic Valve"
         }
     
-    async def scan_device(self, ip_address: str, port: int = None) -> Optional[Dict]:
+    async def scan_host(self, ip_address: str, ports: Optional[List[int]] = None) -> Optional[Dict]:
+        """
+        Scan a single host using the discovery engine scanner interface
+        
+        Args:
+            ip_address: Target IP address
+            ports: Ports already confirmed open by the pre-probe (skips the
+                   separate port check); defaults to configured or common ports
+            
+        Returns:
+            Device information dictionary including ip_address and protocol
+        """
+        port_confirmed = ports is not None
+        if ports is None:
+            port_ranges = getattr(self.config, 'port_ranges', None) or {}
+            ports = port_ranges.get('ethernet_ip', self.default_ports)
+        
+        for port in ports:
+            device_info = await self.scan_device(ip_address, port, port_confirmed=port_confirmed)
+            if device_info:
+                device_info['ip_address'] = ip_address
+                device_info['protocol'] = 'ethernet_ip'
+                return device_info
+        
+        return None
+    
+    async def scan_device(self, ip_address: str, port: int = None, port_confirmed: bool = False) -> Optional[Dict]:
         """
         Scan for EtherNet/IP device on specified IP address
         
@@ -291,44 +329,119 @@ class EthernetIPScanner:
         
         for scan_port in ports_to_scan:
             try:
-                device_info = await self._discover_ethernet_ip_device(ip_address, scan_port)
+                device_info = await self._discover_ethernet_ip_device(ip_address, scan_port, port_confirmed)
                 if device_info:
-                    return {
-                        'port': scan_port,
-                        'device_type': self._get_device_type_name(device_info.device_type),
-                        'manufacturer': self._get_vendor_name(device_info.vendor_id),
-                        'model': device_info.product_name,
-                        'firmware_version': device_info.revision,
-                        'capabilities': self._get_device_capabilities(device_info),
-                        'protocol_specific': {
-                            'vendor_id': device_info.vendor_id,
-                            'device_type_id': device_info.device_type,
-                            'product_code': device_info.product_code,
-                            'serial_number': device_info.serial_number,
-                            'state': device_info.state,
-                            'device_status': device_info.device_status,
-                            'config_capability': device_info.config_capability,
-                            'config_control': device_info.config_control,
-                            'network_info': {
-                                'ip_address': device_info.ip_address,
-                                'subnet_mask': device_info.subnet_mask,
-                                'gateway': device_info.gateway,
-                                'name_server': device_info.name_server,
-                                'domain_name': device_info.domain_name,
-                                'host_name': device_info.host_name
-                            }
-                        }
-                    }
+                    return self._device_info_dict(device_info, scan_port)
             except Exception as e:
                 self.logger.debug(f"EtherNet/IP scan failed for {ip_address}:{scan_port} - {e}")
         
         return None
     
-    async def _discover_ethernet_ip_device(self, ip_address: str, port: int) -> Optional[EtherNetIPDevice]:
+    async def broadcast_list_identity(self, networks: List[str],
+                                      window: Optional[float] = None) -> Tuple[Dict[str, Dict], List[str]]:
+        """
+        Enumerate EtherNet/IP devices with one UDP ListIdentity datagram per subnet
+        
+        Args:
+            networks: IPv4 CIDR networks; the request goes to each directed
+                      broadcast address (start-end ranges are not broadcast)
+            window: Seconds to collect replies (defaults to broadcast_window)
+            
+        Returns:
+            Tuple of (device information by responding IP, networks that
+            produced at least one reply). Networks without replies should
+            fall back to per-host TCP discovery.
+        """
+        window = window or self.broadcast_window
+        port = self.default_ports[0]
+        
+        subnets = []
+        for spec in networks:
+            try:
+                net = ipaddress.ip_network(spec.strip(), strict=False)
+            except ValueError:
+                continue
+            if net.version == 4:
+                subnets.append((spec, net))
+        
+        if not subnets:
+            return {}, []
+        
+        loop = asyncio.get_running_loop()
+        transport, collector = await loop.create_datagram_endpoint(
+            ListIdentityCollector, local_addr=('0.0.0.0', 0), allow_broadcast=True
+        )
+        
+        try:
+            # Devices spread their replies over half the window to avoid a burst
+            request = self._build_list_identity_request(max_response_delay=int(window * 500))
+            for spec, net in subnets:
+                try:
+                    transport.sendto(request, (str(net.broadcast_address), port))
+                except OSError as e:
+                    self.logger.debug(f"ListIdentity broadcast to {net} failed: {e}")
+            
+            await asyncio.sleep(window)
+        finally:
+            transport.close()
+        
+        devices = {}
+        responsive = set()
+        for ip_address, response in collector.replies.items():
+            device_info = self._parse_list_identity_response(response)
+            if not device_info:
+                continue
+            
+            address = ipaddress.ip_address(ip_address)
+            matched = [spec for spec, net in subnets if address in net]
+            if not matched:
+                continue
+            responsive.update(matched)
+            
+            result = self._device_info_dict(device_info, port)
+            result['ip_address'] = ip_address
+            result['protocol'] = 'ethernet_ip'
+            result['capabilities'].append('udp_list_identity')
+            devices[ip_address] = result
+        
+        self.logger.info(f"ListIdentity broadcast: {len(devices)} devices from "
+                         f"{len(responsive)}/{len(subnets)} subnets in {window:.1f}s")
+        return devices, [spec for spec, net in subnets if spec in responsive]
+    
+    def _device_info_dict(self, device_info: EtherNetIPDevice, port: int) -> Dict:
+        """Scanner result dictionary for a parsed identity"""
+        return {
+            'port': port,
+            'device_type': self._get_device_type_name(device_info.device_type),
+            'manufacturer': self._get_vendor_name(device_info.vendor_id),
+            'model': device_info.product_name,
+            'firmware_version': device_info.revision,
+            'capabilities': self._get_device_capabilities(device_info),
+            'protocol_specific': {
+                'vendor_id': device_info.vendor_id,
+                'device_type_id': device_info.device_type,
+                'product_code': device_info.product_code,
+                'serial_number': device_info.serial_number,
+                'state': device_info.state,
+                'device_status': device_info.device_status,
+                'config_capability': device_info.config_capability,
+                'config_control': device_info.config_control,
+                'network_info': {
+                    'ip_address': device_info.ip_address,
+                    'subnet_mask': device_info.subnet_mask,
+                    'gateway': device_info.gateway,
+                    'name_server': device_info.name_server,
+                    'domain_name': device_info.domain_name,
+                    'host_name': device_info.host_name
+                }
+            }
+        }
+    
+    async def _discover_ethernet_ip_device(self, ip_address: str, port: int, port_confirmed: bool = False) -> Optional[EtherNetIPDevice]:
         """Discover EtherNet/IP device using List Identity command"""
         try:
-            # First check if port is open
-            if not await self._check_port_open(ip_address, port):
+            # First check if port is open (unless the pre-probe already confirmed it)
+            if not port_confirmed and not await self._check_port_open(ip_address, port):
                 return None
             
             # Try List Identity command
@@ -390,8 +503,14 @@ class EthernetIPScanner:
             self.logger.debug(f"List Identity command failed: {e}")
             return None
     
-    def _build_list_identity_request(self) -> bytes:
-        """Build EtherNet/IP List Identity request"""
+    def _build_list_identity_request(self, max_response_delay: int = 0) -> bytes:
+        """
+        Build EtherNet/IP List Identity request
+        
+        Args:
+            max_response_delay: Upper bound in ms for the random reply delay
+                                targets apply to broadcast requests (0 = device default)
+        """
         # EtherNet/IP Encapsulation Header
         # Command (2 bytes) + Length (2 bytes) + Session Handle (4 bytes) + 
         # Status (4 bytes) + Sender Context (8 bytes) + Options (4 bytes)
@@ -400,7 +519,7 @@ class EthernetIPScanner:
         length = 0  # No data for List Identity
         session_handle = 0x00000000
         status = 0x00000000
-        sender_context = b'\x00\x00\x00\x00\x00\x00\x00\x00'
+        sender_context = struct.pack('<H6x', max_response_delay)
         options = 0x00000000
         
         request = struct.pack('<HHII8sI',
@@ -473,29 +592,30 @@ class EthernetIPScanner:
             if len(data) < 24:  # Minimum identity data size
                 return device_info
             
-            # Parse fixed portion of identity data
-            protocol_version, sin_family, sin_port, sin_addr, sin_zero = struct.unpack('<HHH4s8s', data[:20])
+            # Parse fixed portion of identity data (socket address fields are big-endian)
+            protocol_version = struct.unpack('<H', data[:2])[0]
+            sin_family, sin_port, sin_addr = struct.unpack('>hH4s', data[2:10])
             
             # Extract IP address
             device_info.ip_address = '.'.join(str(b) for b in sin_addr)
             
-            offset = 20
+            offset = 18
             
-            if len(data) < offset + 24:
+            if len(data) < offset + 15:
                 return device_info
             
             # Parse device identity
             vendor_id, device_type, product_code, revision_major, revision_minor, \
-            status, serial_number, product_name_length = struct.unpack('<HHHHBBIH', data[offset:offset + 16])
+            status, serial_number, product_name_length = struct.unpack('<HHHBBHIB', data[offset:offset + 15])
             
             device_info.vendor_id = vendor_id
             device_info.device_type = device_type
             device_info.product_code = product_code
             device_info.revision = f"{revision_major}.{revision_minor}"
-            device_info.state = status
+            device_info.device_status = status
             device_info.serial_number = serial_number
             
-            offset += 16
+            offset += 15
             
             # Parse product name
             if len(data) >= offset + product_name_length:
@@ -505,7 +625,7 @@ class EthernetIPScanner:
             
             # Parse state (if available)
             if len(data) >= offset + 1:
-                device_info.device_status = data[offset]
+                device_info.state = data[offset]
                 
         except Exception as e:
             self.logger.debug(f"Error parsing identity data: {e}")
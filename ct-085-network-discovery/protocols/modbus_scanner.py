@@ -8,11 +8,114 @@ import asyncio
 import socket
 import struct
 import logging
-from typing import Dict, Optional, List
+from typing import Dict, Optional, List, Tuple
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
+class ModbusPipeline:
+    """
+    Pipelined Modbus TCP request layer for one connection
+    
+    Requests are written back-to-back without waiting for earlier replies;
+    a single reader task matches responses to callers by MBAP transaction
+    ID, so N requests cost roughly one round trip instead of N.
+    """
+    
+    def __init__(self, reader, writer, timeout: float = 2.0, max_in_flight: int = 16):
+        """Initialize pipeline over an open connection"""
+        self.reader = reader
+        self.writer = writer
+        self.timeout = timeout
+        self.window = asyncio.Semaphore(max_in_flight)
+        self.transaction_id = 0
+        self.pending: Dict[int, Tuple[int, asyncio.Future]] = {}
+        self.reader_task = None
+        self.closed = False
+    
+    async def __aenter__(self):
+        self.reader_task = asyncio.create_task(self._read_responses())
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        self.closed = True
+        if self.reader_task:
+            self.reader_task.cancel()
+            try:
+                await self.reader_task
+            except asyncio.CancelledError:
+                pass
+    
+    def _next_transaction_id(self) -> int:
+        self.transaction_id = self.transaction_id % 65535 + 1
+        return self.transaction_id
+    
+    async def request(self, unit_id: int, function_code: int, address: int, count: int) -> Optional[bytes]:
+        """
+        Send one read request and wait for its matching response
+        
+        Returns:
+            Response data following the function code, or None on
+            exception response, timeout or connection loss
+        """
+        async with self.window:
+            if self.closed:
+                return None
+            
+            transaction_id = self._next_transaction_id()
+            future = asyncio.get_running_loop().create_future()
+            self.pending[transaction_id] = (function_code, future)
+            
+            # MBAP Header (7 bytes) + PDU
+            request = struct.pack(
+                '>HHHBB HH',
+                transaction_id,      # Transaction ID
+                0x0000,              # Protocol ID
+                0x0006,              # Length
+                unit_id,             # Unit ID
+                function_code,       # Function Code
+                address,             # Starting Address
+                count                # Quantity
+            )
+            
+            try:
+                self.writer.write(request)
+                await self.writer.drain()
+                return await asyncio.wait_for(future, timeout=self.timeout)
+            except Exception as e:
+                logger.debug(f"Modbus transaction {transaction_id} failed: {e}")
+                return None
+            finally:
+                self.pending.pop(transaction_id, None)
+    
+    async def _read_responses(self):
+        """Dispatch responses to waiting requests by transaction ID"""
+        try:
+            while True:
+                # MBAP header (7 bytes) + function code
+                header = await self.reader.readexactly(8)
+                trans_id, proto_id, length, unit, func = struct.unpack('>HHHBB', header)
+                data = await self.reader.readexactly(max(length - 2, 0))  # Subtract unit ID and function code
+                
+                entry = self.pending.get(trans_id)
+                if entry is None:
+                    continue  # Late reply to a timed-out request
+                
+                function_code, future = entry
+                if not future.done():
+                    # Exception responses set the high bit of the function code
+                    future.set_result(data if func == function_code else None)
+                    
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.debug(f"Modbus response reader stopped: {e}")
+        finally:
+            self.closed = True
+            for function_code, future in self.pending.values():
+                if not future.done():
+                    future.set_result(None)
+
 class ModbusScanner:
     """
     Modbus TCP/RTU scanner for discovering and identifying Modbus devices
@@ -25,6 +128,13 @@ class ModbusScanner:
     READ_HOLDING_REGISTERS = 0x03
     READ_INPUT_REGISTERS = 0x04
     
+    # Common unit IDs (slave addresses), in order of preference
+    UNIT_IDS = [1, 2, 3, 247, 255]
+    
+    # Default outstanding transactions per connection (config: modbus_max_in_flight);
+    # 1 restores strictly serial requests for devices that handle one at a time
+    MAX_IN_FLIGHT = 16
+    
     # Device identification registers (common addresses)
     DEVICE_ID_REGISTERS = [0x0000, 0x0001, 0x0002, 0x1000, 0x1001, 0x2000]
     
@@ -46,20 +156,25 @@ class ModbusScanner:
         """Initialize Modbus scanner with configuration"""
         self.config = config
         self.timeout = 3.0
-        self.transaction_id = 1
+        self.request_timeout = 2.0
+        self.max_in_flight = max(1, int(getattr(config, 'modbus_max_in_flight', self.MAX_IN_FLIGHT)))
         
-    async def scan_host(self, ip_address: str) -> Optional[Dict]:
+    async def scan_host(self, ip_address: str, ports: Optional[List[int]] = None) -> Optional[Dict]:
         """
         Scan a single host for Modbus services
         
         Args:
             ip_address: Target IP address to scan
+            ports: Ports already confirmed open by the pre-probe (defaults to configured ports)
             
         Returns:
             Device information dictionary if Modbus device found, None otherwise
         """
+        if ports is None:
+            ports = self.config.port_ranges.get('modbus', [502])
+        
         # Check standard Modbus TCP port
-        for port in self.config.port_ranges.get('modbus', [502]):
+        for port in ports:
             device_info = await self._scan_modbus_port(ip_address, port)
             if device_info:
                 return device_info
@@ -77,8 +192,9 @@ class ModbusScanner:
             
             logger.debug(f"Connected to {ip_address}:{port} for Modbus scan")
             
-            # Perform Modbus device identification
-            device_info = await self._identify_modbus_device(reader, writer, ip_address, port)
+            # Perform Modbus device identification over a pipelined connection
+            async with ModbusPipeline(reader, writer, self.request_timeout, self.max_in_flight) as pipeline:
+                device_info = await self._identify_modbus_device(pipeline, ip_address, port)
             
             writer.close()
             await writer.wait_closed()
@@ -89,7 +205,7 @@ class ModbusScanner:
             logger.debug(f"Modbus scan failed for {ip_address}:{port}: {e}")
             return None
     
-    async def _identify_modbus_device(self, reader, writer, ip_address: str, port: int) -> Dict:
+    async def _identify_modbus_device(self, pipeline: ModbusPipeline, ip_address: str, port: int) -> Dict:
         """Identify Modbus device through register reads and analysis"""
         device_info = {
             'ip_address': ip_address,
@@ -101,21 +217,16 @@ class ModbusScanner:
             'scan_timestamp': datetime.now().isoformat()
         }
         
-        # Test multiple unit IDs (slave addresses)
-        for unit_id in [1, 2, 3, 247, 255]:  # Common unit IDs
-            try:
-                # Test device responsiveness with Read Holding Registers
-                response = await self._read_holding_registers(reader, writer, unit_id, 0x0000, 1)
-                
-                if response:
-                    device_info['unit_id'] = unit_id
-                    device_info['capabilities'].append('holding_registers')
-                    logger.debug(f"Modbus device responds on unit ID {unit_id}")
-                    break
-                    
-            except Exception as e:
-                logger.debug(f"Unit ID {unit_id} failed: {e}")
-                continue
+        # Test all candidate unit IDs in one round trip with Read Holding Registers
+        responses = await asyncio.gather(
+            *(self._read_holding_registers(pipeline, unit_id, 0x0000, 1) for unit_id in self.UNIT_IDS)
+        )
+        for unit_id, response in zip(self.UNIT_IDS, responses):
+            if response:
+                device_info['unit_id'] = unit_id
+                device_info['capabilities'].append('holding_registers')
+                logger.debug(f"Modbus device responds on unit ID {unit_id}")
+                break
         
         if 'unit_id' not in device_info:
             logger.debug(f"No responsive unit ID found for {ip_address}:{port}")
@@ -123,52 +234,42 @@ class ModbusScanner:
         
         unit_id = device_info['unit_id']
         
-        # Test different function codes to determine capabilities
-        await self._test_function_codes(reader, writer, unit_id, device_info)
-        
-        # Read device identification registers
-        await self._read_device_identification(reader, writer, unit_id, device_info)
-        
-        # Perform manufacturer identification
-        await self._identify_manufacturer(reader, writer, unit_id, device_info)
-        
-        # Read device diagnostic information
-        await self._read_diagnostics(reader, writer, unit_id, device_info)
+        # Capability, identification, manufacturer and diagnostic reads share the pipeline
+        await asyncio.gather(
+            self._test_function_codes(pipeline, unit_id, device_info),
+            self._read_device_identification(pipeline, unit_id, device_info),
+            self._identify_manufacturer(pipeline, unit_id, device_info),
+            self._read_diagnostics(pipeline, unit_id, device_info)
+        )
         
         return device_info
     
-    async def _test_function_codes(self, reader, writer, unit_id: int, device_info: Dict):
+    async def _test_function_codes(self, pipeline: ModbusPipeline, unit_id: int, device_info: Dict):
         """Test supported Modbus function codes"""
         function_tests = [
-            (self.READ_COILS, 'coils'),
-            (self.READ_DISCRETE_INPUTS, 'discrete_inputs'),
-            (self.READ_HOLDING_REGISTERS, 'holding_registers'),
-            (self.READ_INPUT_REGISTERS, 'input_registers')
+            (self.READ_COILS, 'coils', self._read_coils),
+            (self.READ_DISCRETE_INPUTS, 'discrete_inputs', self._read_discrete_inputs),
+            (self.READ_HOLDING_REGISTERS, 'holding_registers', self._read_holding_registers),
+            (self.READ_INPUT_REGISTERS, 'input_registers', self._read_input_registers)
         ]
         
-        for func_code, capability in function_tests:
-            try:
-                if func_code == self.READ_COILS:
-                    response = await self._read_coils(reader, writer, unit_id, 0x0000, 1)
-                elif func_code == self.READ_DISCRETE_INPUTS:
-                    response = await self._read_discrete_inputs(reader, writer, unit_id, 0x0000, 1)
-                elif func_code == self.READ_HOLDING_REGISTERS:
-                    response = await self._read_holding_registers(reader, writer, unit_id, 0x0000, 1)
-                elif func_code == self.READ_INPUT_REGISTERS:
-                    response = await self._read_input_registers(reader, writer, unit_id, 0x0000, 1)
-                
-                if response:
-                    device_info['capabilities'].append(capability)
-                    logger.debug(f"Function code {func_code:02X} supported")
-                    
-            except Exception as e:
-                logger.debug(f"Function code {func_code:02X} not supported: {e}")
+        responses = await asyncio.gather(
+            *(read(pipeline, unit_id, 0x0000, 1) for _, _, read in function_tests)
+        )
+        
+        for (func_code, capability, _), response in zip(function_tests, responses):
+            if response:
+                device_info['capabilities'].append(capability)
+                logger.debug(f"Function code {func_code:02X} supported")
     
-    async def _read_device_identification(self, reader, writer, unit_id: int, device_info: Dict):
+    async def _read_device_identification(self, pipeline: ModbusPipeline, unit_id: int, device_info: Dict):
         """Read device identification registers"""
-        for register in self.DEVICE_ID_REGISTERS:
+        responses = await asyncio.gather(
+            *(self._read_holding_registers(pipeline, unit_id, register, 4) for register in self.DEVICE_ID_REGISTERS)
+        )
+        
+        for register, response in zip(self.DEVICE_ID_REGISTERS, responses):
             try:
-                response = await self._read_holding_registers(reader, writer, unit_id, register, 4)
                 if response and len(response) >= 8:
                     # Convert register values to string
                     device_info['registers_found'].append({
@@ -180,14 +281,18 @@ class ModbusScanner:
             except Exception as e:
                 logger.debug(f"Failed to read register {register:04X}: {e}")
     
-    async def _identify_manufacturer(self, reader, writer, unit_id: int, device_info: Dict):
+    async def _identify_manufacturer(self, pipeline: ModbusPipeline, unit_id: int, device_info: Dict):
         """Identify device manufacturer based on register content"""
         manufacturer_scores = {}
         
         # Scan common manufacturer identification registers
-        for register in range(0x0000, 0x0100, 0x10):  # Sample every 16th register
+        registers = range(0x0000, 0x0100, 0x10)  # Sample every 16th register
+        responses = await asyncio.gather(
+            *(self._read_holding_registers(pipeline, unit_id, register, 8) for register in registers)
+        )
+        
+        for response in responses:
             try:
-                response = await self._read_holding_registers(reader, writer, unit_id, register, 8)
                 if response:
                     ascii_data = self._registers_to_ascii(response).upper()
                     
@@ -219,15 +324,17 @@ class ModbusScanner:
             
             logger.debug(f"Identified manufacturer: {likely_manufacturer} (confidence: {confidence:.2f})")
     
-    async def _read_diagnostics(self, reader, writer, unit_id: int, device_info: Dict):
+    async def _read_diagnostics(self, pipeline: ModbusPipeline, unit_id: int, device_info: Dict):
         """Read device diagnostic information"""
         try:
             # Try reading some common diagnostic registers
             diagnostic_registers = [0x1000, 0x2000, 0x3000, 0x4000]
+            responses = await asyncio.gather(
+                *(self._read_holding_registers(pipeline, unit_id, reg, 2) for reg in diagnostic_registers)
+            )
             
-            for reg in diagnostic_registers:
+            for reg, response in zip(diagnostic_registers, responses):
                 try:
-                    response = await self._read_holding_registers(reader, writer, unit_id, reg, 2)
                     if response:
                         device_info['diagnostics'] = device_info.get('diagnostics', {})
                         device_info['diagnostics'][f'reg_{reg:04X}'] = response
@@ -238,17 +345,17 @@ class ModbusScanner:
         except Exception as e:
             logger.debug(f"Diagnostic read failed: {e}")
     
-    async def _read_holding_registers(self, reader, writer, unit_id: int, address: int, count: int) -> Optional[List[int]]:
+    async def _read_holding_registers(self, pipeline: ModbusPipeline, unit_id: int, address: int, count: int) -> Optional[List[int]]:
         """Read Modbus holding registers"""
-        return await self._modbus_request(reader, writer, unit_id, self.READ_HOLDING_REGISTERS, address, count)
+        return await self._modbus_request(pipeline, unit_id, self.READ_HOLDING_REGISTERS, address, count)
     
-    async def _read_input_registers(self, reader, writer, unit_id: int, address: int, count: int) -> Optional[List[int]]:
+    async def _read_input_registers(self, pipeline: ModbusPipeline, unit_id: int, address: int, count: int) -> Optional[List[int]]:
         """Read Modbus input registers"""
-        return await self._modbus_request(reader, writer, unit_id, self.READ_INPUT_REGISTERS, address, count)
+        return await self._modbus_request(pipeline, unit_id, self.READ_INPUT_REGISTERS, address, count)
     
-    async def _read_coils(self, reader, writer, unit_id: int, address: int, count: int) -> Optional[List[bool]]:
+    async def _read_coils(self, pipeline: ModbusPipeline, unit_id: int, address: int, count: int) -> Optional[List[bool]]:
         """Read Modbus coils"""
-        response = await self._modbus_request(reader, writer, unit_id, self.READ_COILS, address, count)
+        response = await self._modbus_request(pipeline, unit_id, self.READ_COILS, address, count)
         if response:
             # Convert byte response to boolean list
             coils = []
@@ -259,9 +366,9 @@ class ModbusScanner:
             return coils[:count]
         return None
     
-    async def _read_discrete_inputs(self, reader, writer, unit_id: int, address: int, count: int) -> Optional[List[bool]]:
+    async def _read_discrete_inputs(self, pipeline: ModbusPipeline, unit_id: int, address: int, count: int) -> Optional[List[bool]]:
         """Read Modbus discrete inputs"""
-        response = await self._modbus_request(reader, writer, unit_id, self.READ_DISCRETE_INPUTS, address, count)
+        response = await self._modbus_request(pipeline, unit_id, self.READ_DISCRETE_INPUTS, address, count)
         if response:
             # Convert byte response to boolean list
             inputs = []
@@ -272,46 +379,11 @@ class ModbusScanner:
             return inputs[:count]
         return None
     
-    async def _modbus_request(self, reader, writer, unit_id: int, function_code: int, address: int, count: int) -> Optional[List]:
-        """Send Modbus request and parse response"""
+    async def _modbus_request(self, pipeline: ModbusPipeline, unit_id: int, function_code: int, address: int, count: int) -> Optional[List]:
+        """Send Modbus request through the pipeline and parse response"""
         try:
-            # Build Modbus TCP request
-            self.transaction_id += 1
-            if self.transaction_id > 65535:
-                self.transaction_id = 1
-            
-            # MBAP Header (7 bytes) + PDU
-            request = struct.pack(
-                '>HHHBB HH',
-                self.transaction_id,  # Transaction ID
-                0x0000,              # Protocol ID
-                0x0006,              # Length
-                unit_id,             # Unit ID
-                function_code,       # Function Code
-                address,             # Starting Address
-                count                # Quantity
-            )
-            
-            # Send request
-            writer.write(request)
-            await writer.drain()
-            
-            # Read response header
-            header = await asyncio.wait_for(reader.read(7), timeout=2.0)
-            if len(header) != 7:
-                return None
-            
-            trans_id, proto_id, length, unit, func = struct.unpack('>HHHBB', header)
-            
-            # Validate response header
-            if trans_id != self.transaction_id or func != function_code:
-                return None
-            
-            # Read response data
-            data_length = length - 2  # Subtract unit ID and function code
-            data = await asyncio.wait_for(reader.read(data_length), timeout=2.0)
-            
-            if len(data) != data_length:
+            data = await pipeline.request(unit_id, function_code, address, count)
+            if not data:
                 return None
             
             # Parse response based on function code
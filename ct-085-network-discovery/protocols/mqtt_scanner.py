@@ -56,7 +56,8 @@ class MQTTScanner:
     Implements safe discovery using CONNECT/CONNACK handshake
     """
     
-    def __init__(self):
+    def __init__(self, config=None):
+        self.config = config
         self.logger = logging.getLogger('MQTTScanner')
         self.default_ports = [1883, 8883, 1884, 8884, 9001, 9883]  # Common MQTT ports
         self.timeout = 5.0
@@ -78,7 +79,33 @@ class MQTTScanner:
             5: "Connection Refused - Not Authorized"
         }
     
-    async def scan_device(self, ip_address: str, port: int = None) -> Optional[Dict]:
+    async def scan_host(self, ip_address: str, ports: Optional[List[int]] = None) -> Optional[Dict]:
+        """
+        Scan a single host using the discovery engine scanner interface
+        
+        Args:
+            ip_address: Target IP address
+            ports: Ports already confirmed open by the pre-probe (skips the
+                   separate port check); defaults to configured or common ports
+            
+        Returns:
+            Device information dictionary including ip_address and protocol
+        """
+        port_confirmed = ports is not None
+        if ports is None:
+            port_ranges = getattr(self.config, 'port_ranges', None) or {}
+            ports = port_ranges.get('mqtt', self.default_ports)
+        
+        for port in ports:
+            device_info = await self.scan_device(ip_address, port, port_confirmed=port_confirmed)
+            if device_info:
+                device_info['ip_address'] = ip_address
+                device_info['protocol'] = 'mqtt'
+                return device_info
+        
+        return None
+    
+    async def scan_device(self, ip_address: str, port: int = None, port_confirmed: bool = False) -> Optional[Dict]:
         """
         Scan for MQTT broker on specified IP address
         
@@ -93,7 +120,7 @@ class MQTTScanner:
         
         for scan_port in ports_to_scan:
             try:
-                broker_info = await self._discover_mqtt_broker(ip_address, scan_port)
+                broker_info = await self._discover_mqtt_broker(ip_address, scan_port, port_confirmed)
                 if broker_info:
                     return {
                         'port': scan_port,
@@ -127,11 +154,11 @@ class MQTTScanner:
         
         return None
     
-    async def _discover_mqtt_broker(self, ip_address: str, port: int) -> Optional[MQTTBrokerInfo]:
+    async def _discover_mqtt_broker(self, ip_address: str, port: int, port_confirmed: bool = False) -> Optional[MQTTBrokerInfo]:
         """Discover MQTT broker using CONNECT/CONNACK handshake"""
         try:
-            # First check if port is open
-            if not await self._check_port_open(ip_address, port):
+            # First check if port is open (unless the pre-probe already confirmed it)
+            if not port_confirmed and not await self._check_port_open(ip_address, port):
                 return None
             
             # Try different MQTT protocol versions
@@ -31,18 +31,22 @@ class OPCUAScanner:
         self.config = config
         self.timeout = 5.0
         
-    async def scan_host(self, ip_address: str) -> Optional[Dict]:
+    async def scan_host(self, ip_address: str, ports: Optional[List[int]] = None) -> Optional[Dict]:
         """
         Scan a single host for OPC-UA services
         
         Args:
             ip_address: Target IP address to scan
+            ports: Ports already confirmed open by the pre-probe (defaults to configured ports)
             
         Returns:
             Device information dictionary if OPC-UA server found, None otherwise
         """
+        if ports is None:
+            ports = self.config.port_ranges.get('opcua', self.DEFAULT_PORTS)
+        
         # Check OPC-UA ports
-        for port in self.config.port_ranges.get('opcua', self.DEFAULT_PORTS):
+        for port in ports:
             device_info = await self._scan_opcua_port(ip_address, port)
             if device_info:
                 return device_info
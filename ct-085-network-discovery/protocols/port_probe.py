@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Shared Port Pre-Probe for CT-085 Network Discovery
+Fast TCP connect sweep and optional ICMP/ARP liveness pass that run once
+before the protocol scanners, producing an open-port table
+"""
+
+import asyncio
+import logging
+import shutil
+import time
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Port states reported by the connect sweep
+PORT_OPEN = 'open'
+PORT_CLOSED = 'closed'      # RST received - host is alive, port is not listening
+PORT_FILTERED = 'filtered'  # timeout or unreachable
+
+class PortProber:
+    """
+    Single connect sweep across all (host, port) pairs for every enabled
+    protocol, so dead hosts cost one short timeout instead of one full
+    timeout per protocol scanner
+    """
+
+    ARP_TABLE_PATH = '/proc/net/arp'
+    ARP_FLAG_COMPLETE = 0x2
+
+    def __init__(self, timeout: float = 1.0, semaphore: Optional[asyncio.Semaphore] = None,
+                 rate_limiter=None):
+        """Initialize prober with connect timeout and optional shared scheduler limits"""
+        self.timeout = timeout
+        self.semaphore = semaphore or asyncio.Semaphore(64)
+        self.rate_limiter = rate_limiter
+        self.ping_path = shutil.which('ping')
+        self.ping_warning_logged = False
+
+    async def _acquire_rate(self):
+        if self.rate_limiter is not None:
+            await self.rate_limiter.acquire()
+
+    async def probe_port(self, ip_address: str, port: int) -> Tuple[str, Optional[float]]:
+        """TCP connect probe returning (state, response time in seconds)"""
+        async with self.semaphore:
+            await self._acquire_rate()
+            started = time.monotonic()
+            try:
+                reader, writer = await asyncio.wait_for(
+                    asyncio.open_connection(ip_address, port),
+                    timeout=self.timeout
+                )
+                response_time = time.monotonic() - started
+                writer.close()
+                try:
+                    await writer.wait_closed()
+                except Exception:
+                    pass
+                return PORT_OPEN, response_time
+            except ConnectionRefusedError:
+                return PORT_CLOSED, time.monotonic() - started
+            except Exception:
+                return PORT_FILTERED, None
+
+    async def sweep(self, hosts: Iterable[str], ports: List[int],
+                    skip: Optional[Set[Tuple[str, int]]] = None) -> Dict[str, Dict[int, Dict]]:
+        """
+        Connect sweep across all host/port pairs
+
+        Args:
+            hosts: Addresses to probe
+            ports: Ports probed on every host
+            skip: (host, port) pairs that are already known and need no probe
+
+        Returns:
+            Per-host table of responsive ports: {ip: {port: {'state', 'response_time'}}}
+            Hosts with only filtered ports are omitted
+        """
+        skip = skip or set()
+        pairs = [(host, port) for host in hosts for port in ports if (host, port) not in skip]
+        results = await asyncio.gather(*(self.probe_port(host, port) for host, port in pairs))
+
+        table: Dict[str, Dict[int, Dict]] = {}
+        for (host, port), (state, response_time) in zip(pairs, results):
+            if state == PORT_FILTERED:
+                continue
+            table.setdefault(host, {})[port] = {'state': state, 'response_time': response_time}
+
+        open_count = sum(1 for ports_seen in table.values() for info in ports_seen.values()
+                         if info['state'] == PORT_OPEN)
+        logger.info(f"Port pre-probe: {len(pairs)} probes, {open_count} open ports on {len(table)} responsive hosts")
+        return table
+
+    async def ping(self, ip_address: str) -> bool:
+        """Single ICMP echo via the system ping binary"""
+        async with self.semaphore:
+            await self._acquire_rate()
+            try:
+                process = await asyncio.create_subprocess_exec(
+                    self.ping_path, '-c', '1', '-W', str(max(1, int(round(self.timeout)))), ip_address,
+                    stdout=asyncio.subprocess.DEVNULL,
+                    stderr=asyncio.subprocess.DEVNULL
+                )
+                return await process.wait() == 0
+            except Exception as e:
+                logger.debug(f"Ping failed for {ip_address}: {e}")
+                return False
+
+    def read_arp_table(self) -> Set[str]:
+        """Addresses with a completed entry in the kernel ARP cache"""
+        resolved = set()
+        try:
+            with open(self.ARP_TABLE_PATH) as f:
+                next(f, None)  # header
+                for line in f:
+                    fields = line.split()
+                    if len(fields) >= 3 and int(fields[2], 16) & self.ARP_FLAG_COMPLETE:
+                        resolved.add(fields[0])
+        except (OSError, ValueError) as e:
+            logger.debug(f"ARP table unavailable: {e}")
+        return resolved
+
+    async def live_hosts(self, hosts: List[str]) -> List[str]:
+        """
+        ICMP/ARP liveness pass
+
+        A host counts as alive if it answers ping or has a resolved ARP entry
+        (ping also populates ARP for on-link hosts that drop ICMP). The ARP
+        cache alone cannot rule out off-link hosts, so without a ping binary
+        every host is returned unchanged.
+        """
+        if not self.ping_path:
+            if not self.ping_warning_logged:
+                logger.warning("No ping binary available - skipping liveness pass")
+                self.ping_warning_logged = True
+            return list(hosts)
+
+        replies = await asyncio.gather(*(self.ping(host) for host in hosts))
+        arp_hosts = self.read_arp_table()
+        alive = [host for host, reply in zip(hosts, replies) if reply or host in arp_hosts]
+        logger.info(f"Liveness pass: {len(alive)}/{len(hosts)} hosts alive")
+        return alive
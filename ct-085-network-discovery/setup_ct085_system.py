@@ -17,7 +17,6 @@ from datetime import datetime
 sys.path.append('/home/server/industrial-iot-stack/ct-085-network-discovery')
 
 from network_discovery_engine import NetworkDiscoveryEngine
-from ai_classification.device_classifier import DeviceClassifier
 from nodered_generator.flow_generator import NodeREDFlowGenerator
 from dashboard_generator.dashboard_generator import DashboardGenerator
 
@@ -30,7 +29,8 @@ class CT085SystemOrchestrator:
     def __init__(self):
         """Initialize the CT-085 system orchestrator"""
         self.discovery_engine = NetworkDiscoveryEngine()
-        self.device_classifier = DeviceClassifier()
+        # Share the engine's classifier: one worker pool and one classification cache
+        self.device_classifier = self.discovery_engine.device_classifier
         self.flow_generator = NodeREDFlowGenerator()
         self.dashboard_generator = DashboardGenerator()
         
@@ -136,12 +136,12 @@ class CT085SystemOrchestrator:
             return deployment_results
     
     async def _classify_all_devices(self, discovered_devices: Dict) -> List[Dict[str, Any]]:
-        """Classify all discovered devices using AI classifier"""
-        classified_devices = []
+        """Classify all discovered devices using AI classifier (batched in worker processes)"""
+        device_infos = []
         
         for protocol, devices in discovered_devices.items():
             for device in devices:
-                device_info = {
+                device_infos.append({
                     'ip_address': device.ip_address,
                     'port': device.port,
                     'protocol': device.protocol,
@@ -150,10 +150,11 @@ class CT085SystemOrchestrator:
                         'manufacturer': device.manufacturer,
                         'confidence': device.confidence_score
                     }
-                }
-                
-                classification = await self.device_classifier.classify_device(device_info)
-                classified_devices.append(classification)
+                })
+        
+        classified_devices = [None] * len(device_infos)
+        async for index, classification in self.device_classifier.classify_many(device_infos):
+            classified_devices[index] = classification
         
         return classified_devices
     
@@ -413,7 +414,10 @@ async def main():
     orchestrator = CT085SystemOrchestrator()
     
     # Deploy complete system
-    results = await orchestrator.deploy_complete_system()
+    try:
+        results = await orchestrator.deploy_complete_system()
+    finally:
+        orchestrator.discovery_engine.shutdown()
     
     # Export deployment report
     report_file = orchestrator.export_deployment_report(results)
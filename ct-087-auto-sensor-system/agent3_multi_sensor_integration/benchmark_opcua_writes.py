@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+CT-087 Agent 3: OPC-UA write throughput benchmark
+
+Starts a local asyncua server, creates a set of Double variables and
+measures value updates per second for per-node writes versus the
+batched single Write call used by MultiSensorIntegrator. Use the
+results to size edge hardware for a given channel count and rate.
+
+Usage:
+    python3 benchmark_opcua_writes.py --nodes 500 --cycles 200
+"""
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+import logging
+from pathlib import Path
+
+# The integrator logs to /tmp/ct-087-logs on import
+os.makedirs("/tmp/ct-087-logs", exist_ok=True)
+sys.path.insert(0, str(Path(__file__).parent))
+
+from asyncua import Server, ua
+from multi_sensor_integrator import opcua_write_batch
+
+async def run_benchmark(node_count: int, cycles: int, endpoint: str):
+    server = Server()
+    await server.init()
+    server.set_endpoint(endpoint)
+    namespace_idx = await server.register_namespace("http://ct-087.industrial-iot.local/benchmark")
+    folder = await server.nodes.objects.add_object(namespace_idx, "Benchmark")
+
+    nodes = []
+    for idx in range(node_count):
+        nodes.append(await folder.add_variable(namespace_idx, f"Channel_{idx}", 0.0, ua.VariantType.Double))
+    node_ids = [node.nodeid for node in nodes]
+
+    results = {}
+    async with server:
+        # Per-node writes: one Write service call per variable
+        start = time.perf_counter()
+        for cycle in range(cycles):
+            for node in nodes:
+                await node.write_value(ua.Variant(float(cycle), ua.VariantType.Double))
+        results["per_node"] = time.perf_counter() - start
+
+        # Batched writes: one Write service call per cycle
+        start = time.perf_counter()
+        for cycle in range(cycles):
+            updates = [(node_id, ua.Variant(float(cycle), ua.VariantType.Double)) for node_id in node_ids]
+            await opcua_write_batch(server, updates)
+        results["batched"] = time.perf_counter() - start
+
+        value = await nodes[-1].read_value()
+        assert value == float(cycles - 1), f"Unexpected final value {value}"
+
+    total_updates = node_count * cycles
+    print(f"OPC-UA write benchmark: {node_count} nodes x {cycles} cycles = {total_updates} updates")
+    for mode, elapsed in results.items():
+        print(f"  {mode:<10} {elapsed:8.3f} s  {total_updates / elapsed:12,.0f} updates/s  "
+              f"{cycles / elapsed:10,.1f} cycles/s")
+    print(f"  speedup    {results['per_node'] / results['batched']:8.2f}x")
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="CT-087 OPC-UA write throughput benchmark")
+    parser.add_argument("--nodes", type=int, default=500, help="Number of variables")
+    parser.add_argument("--cycles", type=int, default=100, help="Update cycles per mode")
+    parser.add_argument("--endpoint", default="opc.tcp://127.0.0.1:48487/ct087/benchmark/")
+    args = parser.parse_args()
+
+    logging.getLogger("asyncua").setLevel(logging.WARNING)
+    asyncio.run(run_benchmark(args.nodes, args.cycles, args.endpoint))
+
+if __name__ == "__main__":
+    main()
@@ -27,7 +27,9 @@ from dataclasses import dataclass, asdict
 from enum import Enum
 import uuid
 import math
+import heapq
 import statistics
+from collections import deque, defaultdict, OrderedDict
 
 # Scientific computing for signal processing
 import numpy as np
@@ -49,6 +51,12 @@ try:
 except ImportError:
     MQTT_AVAILABLE = False
 
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
 try:
     from pymodbus.client.sync import ModbusTcpClient
     from pymodbus.payload import BinaryPayloadDecoder, BinaryPayloadBuilder
@@ -130,6 +138,839 @@ class ProcessVariable:
     last_updated: datetime
     historical_data: List[Tuple[datetime, float]]
 
+# Compact integer codes for the columnar reading store
+QUALITY_CODES = {quality: code for code, quality in enumerate(DataQuality)}
+PROTOCOL_CODES = {protocol: code for code, protocol in enumerate(ProtocolType)}
+QUALITY_BY_CODE = list(DataQuality)
+PROTOCOL_BY_CODE = list(ProtocolType)
+
+class SensorRingBuffer:
+    """
+    Preallocated columnar ring buffer for one sensor's recent readings.
+
+    Timestamps, values, quality codes and protocol codes are kept in
+    parallel NumPy arrays. Every sample is written twice (at ``i`` and
+    ``i + capacity``) so the most recent ``n`` samples are always a
+    contiguous slice and ``window()`` can return a view without copying.
+    Non-numeric values are stored as NaN.
+    """
+
+    def __init__(self, capacity: int = 1000):
+        self.capacity = capacity
+        self.timestamps = np.zeros(2 * capacity, dtype=np.float64)
+        self.values = np.full(2 * capacity, np.nan, dtype=np.float64)
+        self.quality_codes = np.zeros(2 * capacity, dtype=np.int8)
+        self.protocol_codes = np.zeros(2 * capacity, dtype=np.int8)
+        self._head = 0  # Next write position in [0, capacity)
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def append(self, timestamp: float, value: Union[float, bool, str],
+               quality: DataQuality = DataQuality.GOOD,
+               protocol: ProtocolType = ProtocolType.REST_API):
+        """Append one sample in O(1)."""
+        numeric = float(value) if isinstance(value, (int, float)) else np.nan
+        quality_code = QUALITY_CODES[quality]
+        protocol_code = PROTOCOL_CODES[protocol]
+
+        for idx in (self._head, self._head + self.capacity):
+            self.timestamps[idx] = timestamp
+            self.values[idx] = numeric
+            self.quality_codes[idx] = quality_code
+            self.protocol_codes[idx] = protocol_code
+
+        self._head = (self._head + 1) % self.capacity
+        if self._count < self.capacity:
+            self._count += 1
+
+    def append_reading(self, reading: SensorReading):
+        """Append a SensorReading without keeping the object."""
+        self.append(reading.timestamp.timestamp(), reading.value,
+                    reading.quality, reading.source_protocol)
+
+    def _window_slice(self, n: Optional[int]) -> slice:
+        n = self._count if n is None else max(0, min(n, self._count))
+        end = self._head + self.capacity
+        return slice(end - n, end)
+
+    def window(self, n: Optional[int] = None) -> np.ndarray:
+        """Zero-copy view of the last ``n`` values (oldest first)."""
+        return self.values[self._window_slice(n)]
+
+    def timestamp_window(self, n: Optional[int] = None) -> np.ndarray:
+        """Zero-copy view of the last ``n`` timestamps (oldest first)."""
+        return self.timestamps[self._window_slice(n)]
+
+    def numeric_window(self, n: Optional[int] = None) -> np.ndarray:
+        """Last ``n`` values with non-numeric samples dropped."""
+        values = self.window(n)
+        mask = ~np.isnan(values)
+        return values if mask.all() else values[mask]
+
+    def latest_value(self) -> Optional[float]:
+        """Most recent value, or None if empty or non-numeric."""
+        if self._count == 0:
+            return None
+        value = self.values[self._head + self.capacity - 1]
+        return None if np.isnan(value) else float(value)
+
+    def latest_timestamp(self) -> Optional[float]:
+        """Most recent timestamp as epoch seconds."""
+        if self._count == 0:
+            return None
+        return float(self.timestamps[self._head + self.capacity - 1])
+
+    def latest_sample(self) -> Tuple[float, int]:
+        """Raw (value, quality code) of the most recent sample."""
+        last = self._head + self.capacity - 1
+        return self.values[last], self.quality_codes[last]
+
+    def latest_quality(self) -> Optional[DataQuality]:
+        """Quality of the most recent sample."""
+        if self._count == 0:
+            return None
+        return QUALITY_BY_CODE[self.quality_codes[self._head + self.capacity - 1]]
+
+class StreamingMedianFilter:
+    """
+    Sliding-window running median for spike removal.
+
+    Uses two heaps (max-heap for the lower half, min-heap for the upper
+    half) with lazy deletion, so each update is O(log w).
+    """
+
+    def __init__(self, window_size: int = 5):
+        self.window_size = max(1, int(window_size))
+        self.reset()
+
+    def reset(self):
+        self._window = deque()
+        self._low: List[float] = []   # Max-heap stored as negated values
+        self._high: List[float] = []  # Min-heap
+        self._delayed: Dict[float, int] = defaultdict(int)
+        self._low_size = 0
+        self._high_size = 0
+
+    def update(self, value: float) -> float:
+        self._window.append(value)
+        self._insert(value)
+        if len(self._window) > self.window_size:
+            self._erase(self._window.popleft())
+        return self.median()
+
+    def median(self) -> float:
+        if self._low_size > self._high_size:
+            return -self._low[0]
+        return (-self._low[0] + self._high[0]) / 2.0
+
+    def _insert(self, value: float):
+        if not self._low or value <= -self._low[0]:
+            heapq.heappush(self._low, -value)
+            self._low_size += 1
+        else:
+            heapq.heappush(self._high, value)
+            self._high_size += 1
+        self._rebalance()
+
+    def _erase(self, value: float):
+        self._delayed[value] += 1
+        if value <= -self._low[0]:
+            self._low_size -= 1
+            if value == -self._low[0]:
+                self._prune(self._low, negated=True)
+        else:
+            self._high_size -= 1
+            if self._high and value == self._high[0]:
+                self._prune(self._high, negated=False)
+        self._rebalance()
+
+    def _prune(self, heap: List[float], negated: bool):
+        while heap:
+            top = -heap[0] if negated else heap[0]
+            if self._delayed.get(top, 0) == 0:
+                break
+            self._delayed[top] -= 1
+            if self._delayed[top] == 0:
+                del self._delayed[top]
+            heapq.heappop(heap)
+
+    def _rebalance(self):
+        if self._low_size > self._high_size + 1:
+            heapq.heappush(self._high, -heapq.heappop(self._low))
+            self._low_size -= 1
+            self._high_size += 1
+            self._prune(self._low, negated=True)
+        elif self._low_size < self._high_size:
+            heapq.heappush(self._low, -heapq.heappop(self._high))
+            self._high_size -= 1
+            self._low_size += 1
+            self._prune(self._high, negated=False)
+
+class WelfordOutlierFilter:
+    """
+    Z-score outlier rejection over a sliding window.
+
+    Mean and variance are maintained incrementally with Welford's
+    algorithm (add and remove), so each update is O(1). Outliers are
+    replaced with the last accepted value.
+    """
+
+    def __init__(self, threshold: float = 3.0, window_size: int = 50, min_samples: int = 4):
+        self.threshold = threshold
+        self.window_size = max(2, int(window_size))
+        self.min_samples = min_samples
+        self.reset()
+
+    def reset(self):
+        self._window = deque()
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self._m2 / self.count) if self.count > 0 else 0.0
+
+    def update(self, value: float) -> float:
+        if self.count >= self.min_samples:
+            std = self.std
+            if std > 0 and abs(value - self.mean) / std > self.threshold:
+                value = self._window[-1]
+
+        self._add(value)
+        if len(self._window) > self.window_size:
+            self._remove(self._window.popleft())
+        return value
+
+    def _add(self, value: float):
+        self._window.append(value)
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+
+    def _remove(self, value: float):
+        self.count -= 1
+        if self.count == 0:
+            self.mean = 0.0
+            self._m2 = 0.0
+            return
+        delta = value - self.mean
+        self.mean -= delta / self.count
+        self._m2 = max(0.0, self._m2 - delta * (value - self.mean))
+
+class LowPassIIRFilter:
+    """
+    First-order IIR low-pass filter (exponential smoothing).
+
+    ``alpha`` is derived from the cutoff frequency and sample rate of the
+    configured ``low_pass_filter``; each update is O(1).
+    """
+
+    def __init__(self, cutoff: float = 10.0, sample_rate: float = 100.0):
+        dt = 1.0 / sample_rate
+        rc = 1.0 / (2.0 * math.pi * cutoff)
+        self.alpha = dt / (rc + dt)
+        self.reset()
+
+    def reset(self):
+        self.state: Optional[float] = None
+
+    def update(self, value: float) -> float:
+        if self.state is None:
+            self.state = value
+        else:
+            self.state += self.alpha * (value - self.state)
+        return self.state
+
+class SignalFilterChain:
+    """Ordered chain of stateful streaming filters for one sensor."""
+
+    def __init__(self, filters: List[Any]):
+        self.filters = filters
+
+    def update(self, value: float) -> float:
+        for stage in self.filters:
+            value = stage.update(value)
+        return value
+
+    def reset(self):
+        for stage in self.filters:
+            stage.reset()
+
+# Filter factories keyed by their signal_processors entry
+FILTER_FACTORIES = {
+    "outlier_detector": lambda cfg: WelfordOutlierFilter(cfg["threshold"], cfg["window_size"]),
+    "median_filter": lambda cfg: StreamingMedianFilter(cfg["window_size"]),
+    "low_pass_filter": lambda cfg: LowPassIIRFilter(cfg["cutoff"], cfg["sample_rate"]),
+}
+DEFAULT_FILTER_CHAIN = ["outlier_detector", "median_filter", "low_pass_filter"]
+
+class GroupKalmanFilter:
+    """
+    Multi-sensor Kalman filter for one sensor group.
+
+    The state vector holds one estimate per measured channel. Each sensor
+    is its own channel unless its profile sets ``measurement_channel``;
+    redundant sensors sharing a channel map onto the same state element
+    through the observation matrix ``H``, so all of a tick's measurements
+    are fused in a single matrix update. State and covariance persist across ticks
+    under a random-walk process model.
+    """
+
+    def __init__(self, sensor_ids: List[str], channel_keys: List[str], measurement_noise: List[float],
+                 process_noise: float, initial_covariance: float):
+        self.sensor_ids = list(sensor_ids)
+        self.channels = list(dict.fromkeys(channel_keys))
+        channel_index = {key: idx for idx, key in enumerate(self.channels)}
+        self.sensor_channel = np.array([channel_index[key] for key in channel_keys], dtype=np.intp)
+
+        n_sensors, n_channels = len(self.sensor_ids), len(self.channels)
+        self.H = np.zeros((n_sensors, n_channels))
+        self.H[np.arange(n_sensors), self.sensor_channel] = 1.0
+        self.R = np.asarray(measurement_noise, dtype=np.float64)
+        self.Q = np.eye(n_channels) * process_noise
+        self.initial_covariance = initial_covariance
+
+        self.x = np.zeros(n_channels)
+        self.P = np.eye(n_channels) * initial_covariance
+        self.initialized = np.zeros(n_channels, dtype=bool)
+        self.gain = np.zeros(n_sensors)
+        self.update_count = 0
+        self.last_update: Optional[datetime] = None
+
+    def update(self, measurements: np.ndarray, valid: np.ndarray):
+        """Predict one step, then fuse all valid measurements at once."""
+        self.P = self.P + self.Q
+        self.gain[:] = 0.0
+        if not valid.any():
+            return
+
+        H = self.H[valid]
+        z = measurements[valid]
+        R = np.diag(self.R[valid])
+
+        # Seed never-observed channels with the mean of their first measurements
+        counts = H.sum(axis=0)
+        seed = ~self.initialized & (counts > 0)
+        if seed.any():
+            self.x[seed] = (H.T @ z)[seed] / counts[seed]
+            self.initialized |= seed
+
+        S = H @ self.P @ H.T + R
+        K = np.linalg.solve(S, H @ self.P).T  # P H^T S^-1 (S and P symmetric)
+        self.x = self.x + K @ (z - H @ self.x)
+
+        # Joseph form keeps P symmetric positive definite
+        I_KH = np.eye(len(self.channels)) - K @ H
+        self.P = I_KH @ self.P @ I_KH.T + K @ R @ K.T
+
+        self.gain[valid] = K[self.sensor_channel[valid], np.arange(len(z))]
+        self.update_count += 1
+        self.last_update = datetime.now()
+
+    def fused_values(self, measurements: np.ndarray, valid: np.ndarray) -> Dict[str, Dict[str, float]]:
+        """Per-sensor view of the current estimate for publishing."""
+        variance = np.diag(self.P)[self.sensor_channel]
+        confidence = 1.0 - variance / (variance + self.R)
+        estimate = self.x[self.sensor_channel]
+        return {
+            self.sensor_ids[idx]: {
+                "original_value": float(measurements[idx]),
+                "filtered_value": float(estimate[idx]),
+                "confidence": float(confidence[idx]),
+                "gain": float(self.gain[idx])
+            }
+            for idx in np.flatnonzero(valid)
+        }
+
+    def get_state(self) -> Dict[str, Any]:
+        """Current state vector and covariance keyed by channel."""
+        variances = np.diag(self.P)
+        return {
+            "channels": {
+                channel: {
+                    "estimate": float(self.x[idx]),
+                    "variance": float(variances[idx]),
+                    "sensors": [sid for sid, ch in zip(self.sensor_ids, self.sensor_channel) if ch == idx]
+                }
+                for idx, channel in enumerate(self.channels)
+                if self.initialized[idx]
+            },
+            "covariance": self.P.tolist(),
+            "update_count": self.update_count,
+            "last_update": self.last_update.isoformat() if self.last_update else None
+        }
+
+class KalmanFusionEngine:
+    """Keeps one persistent GroupKalmanFilter per sensor group."""
+
+    def __init__(self, kalman_config: Dict[str, float]):
+        self.process_noise = kalman_config["process_noise"]
+        self.measurement_noise = kalman_config["measurement_noise"]
+        self.initial_covariance = kalman_config["covariance"]
+        self.filters: Dict[str, GroupKalmanFilter] = {}
+
+    def filter_for(self, group: IntegratedSensorGroup, sensor_profiles: Dict[str, Dict]) -> GroupKalmanFilter:
+        """Get the group's filter, rebuilding it if group membership changed."""
+        kf = self.filters.get(group.group_id)
+        if kf is None or kf.sensor_ids != group.sensor_ids:
+            channel_keys = []
+            noise = []
+            for sensor_id in group.sensor_ids:
+                profile = sensor_profiles.get(sensor_id, {})
+                # Only sensors explicitly marked as measuring the same quantity share a state
+                channel_keys.append(profile.get("measurement_channel", sensor_id))
+                noise.append(profile.get("measurement_noise", self.measurement_noise))
+
+            kf = GroupKalmanFilter(group.sensor_ids, channel_keys, noise,
+                                   self.process_noise, self.initial_covariance)
+            self.filters[group.group_id] = kf
+        return kf
+
+    def get_state(self, group_id: str) -> Optional[Dict[str, Any]]:
+        """State estimate for a group, or None if it has not been filtered yet."""
+        kf = self.filters.get(group_id)
+        return kf.get_state() if kf and kf.update_count > 0 else None
+
+class BatchFusionEngine:
+    """
+    Vectorized fusion of all sensor groups in one pass per tick.
+
+    Every (group, sensor) pair is a slot in flat arrays ordered by group,
+    so per-group reductions are ``np.bincount`` calls over the slot's
+    group index rather than Python loops. Sensors shared by several
+    groups are gathered once and scattered to their slots.
+    """
+
+    def __init__(self, groups: List[IntegratedSensorGroup], sensor_profiles: Dict[str, Dict],
+                 kalman_engine: KalmanFusionEngine):
+        self.groups = list(groups)
+        self.n_groups = len(self.groups)
+        self.group_index = {group.group_id: idx for idx, group in enumerate(self.groups)}
+
+        slot_sensor_ids = []
+        slot_group = []
+        for group_idx, group in enumerate(self.groups):
+            for sensor_id in group.sensor_ids:
+                slot_sensor_ids.append(sensor_id)
+                slot_group.append(group_idx)
+
+        self.slot_sensor_ids = slot_sensor_ids
+        self.slot_group = np.array(slot_group, dtype=np.intp)
+        self.n_slots = len(slot_sensor_ids)
+
+        # Unique sensors are gathered once per tick, then scattered to slots
+        self.sensor_ids = list(dict.fromkeys(slot_sensor_ids))
+        sensor_index = {sensor_id: idx for idx, sensor_id in enumerate(self.sensor_ids)}
+        self.slot_to_sensor = np.array([sensor_index[sid] for sid in slot_sensor_ids], dtype=np.intp)
+
+        sensor_types = [sensor_profiles.get(sid, {}).get("sensor_type", "") for sid in slot_sensor_ids]
+        self.slot_is_digital = np.array([t == "digital_input" for t in sensor_types], dtype=bool)
+        self.slot_is_current = np.array(["current" in t for t in sensor_types], dtype=bool)
+        self.slot_is_voltage = np.array(["voltage" in t for t in sensor_types], dtype=bool)
+        self.slot_confidence = np.array(
+            [sensor_profiles.get(sid, {}).get("ai_confidence", 1.0) for sid in slot_sensor_ids],
+            dtype=np.float64
+        )
+
+        algorithms = [group.fusion_algorithm for group in self.groups]
+        self.group_algorithm = algorithms
+        group_is = lambda name: np.array([a == name for a in algorithms], dtype=bool)
+        self.group_is_kalman = group_is("kalman_filter")
+        self.group_is_voting = group_is("voting")
+        self.group_is_power = group_is("power_calculation")
+        self.group_is_weighted = ~(self.group_is_kalman | self.group_is_voting | self.group_is_power)
+
+        # Slots are ordered by group, so each group is a contiguous segment
+        group_sizes = np.bincount(self.slot_group, minlength=self.n_groups)
+        self.segment_ends = np.cumsum(group_sizes)
+        self.segment_starts = self.segment_ends - group_sizes
+
+        # Kalman groups keep persistent state in the shared engine
+        self.kalman_filters = {
+            idx: kalman_engine.filter_for(self.groups[idx], sensor_profiles)
+            for idx in np.flatnonzero(self.group_is_kalman)
+        }
+
+    def gather(self, real_time_data: Dict[str, SensorRingBuffer]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Gather latest values into slot arrays: (values, valid, good)."""
+        values = np.full(len(self.sensor_ids), np.nan, dtype=np.float64)
+        quality = np.full(len(self.sensor_ids), QUALITY_CODES[DataQuality.BAD], dtype=np.int8)
+
+        for idx, sensor_id in enumerate(self.sensor_ids):
+            buffer = real_time_data.get(sensor_id)
+            if buffer is not None and len(buffer) > 0:
+                values[idx], quality[idx] = buffer.latest_sample()
+
+        slot_values = values[self.slot_to_sensor]
+        slot_quality = quality[self.slot_to_sensor]
+        valid = ~np.isnan(slot_values) & (slot_quality != QUALITY_CODES[DataQuality.BAD])
+        good = slot_quality == QUALITY_CODES[DataQuality.GOOD]
+        return slot_values, valid, good
+
+    def fuse(self, real_time_data: Dict[str, SensorRingBuffer],
+             group_ids: Optional[set] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Fuse groups for one tick; returns processed data per group_id.
+
+        ``group_ids`` restricts the result (and Kalman state updates) to the
+        given groups, e.g. the groups whose sensors received new data.
+        """
+        if self.n_slots == 0:
+            return {}
+
+        selected = np.ones(self.n_groups, dtype=bool)
+        if group_ids is not None:
+            selected[:] = False
+            for group_id in group_ids:
+                if group_id in self.group_index:
+                    selected[self.group_index[group_id]] = True
+
+        values, valid, good = self.gather(real_time_data)
+        if group_ids is not None:
+            # Slots of unselected groups drop out of every reduction below
+            valid &= selected[self.slot_group]
+        timestamp = datetime.now()
+        counts = np.bincount(self.slot_group, weights=valid, minlength=self.n_groups)
+
+        results: Dict[str, Dict[str, Any]] = {}
+        if (self.group_is_kalman & selected).any():
+            results.update(self._fuse_kalman(values, valid, timestamp, selected))
+        if (self.group_is_voting & selected).any():
+            results.update(self._fuse_voting(values, valid, timestamp, selected))
+        if (self.group_is_power & selected).any():
+            results.update(self._fuse_power(values, valid, timestamp, selected))
+        if (self.group_is_weighted & selected).any():
+            results.update(self._fuse_weighted(values, valid, good, timestamp, selected))
+
+        # Groups with no usable readings this tick publish nothing
+        return {
+            group.group_id: results[group.group_id]
+            for idx, group in enumerate(self.groups)
+            if selected[idx] and counts[idx] > 0 and results.get(group.group_id)
+        }
+
+    def _fuse_kalman(self, values: np.ndarray, valid: np.ndarray, timestamp: datetime,
+                     selected: np.ndarray) -> Dict[str, Dict]:
+        results = {}
+        for idx, kf in self.kalman_filters.items():
+            if not selected[idx]:
+                continue
+            segment = slice(self.segment_starts[idx], self.segment_ends[idx])
+            measurements = values[segment]
+            segment_valid = valid[segment]
+            kf.update(measurements, segment_valid)
+
+            group_id = self.groups[idx].group_id
+            results[group_id] = {
+                "fusion_method": "kalman_filter",
+                "group_id": group_id,
+                "timestamp": timestamp,
+                "fused_values": kf.fused_values(measurements, segment_valid),
+                "overall_quality": DataQuality.GOOD
+            }
+        return results
+
+    def _fuse_voting(self, values: np.ndarray, valid: np.ndarray, timestamp: datetime,
+                     selected: np.ndarray) -> Dict[str, Dict]:
+        n = self.n_groups
+        digital = valid & self.slot_is_digital
+        analog = valid & ~self.slot_is_digital
+
+        true_votes = np.bincount(self.slot_group, weights=digital & (values > 0.5), minlength=n)
+        total_votes = np.bincount(self.slot_group, weights=digital, minlength=n)
+        false_votes = total_votes - true_votes
+        with np.errstate(invalid="ignore", divide="ignore"):
+            vote_confidence = np.where(total_votes > 0, np.maximum(true_votes, false_votes) / total_votes, 0.0)
+
+        # Segmented median: sort analog values by (group, value), pick middle of each run
+        analog_groups = self.slot_group[analog]
+        analog_values = values[analog]
+        order = np.lexsort((analog_values, analog_groups))
+        sorted_values = analog_values[order]
+        analog_counts = np.bincount(analog_groups, minlength=n)
+        starts = np.cumsum(analog_counts) - analog_counts
+        has_analog = analog_counts > 0
+        lo = (starts + (analog_counts - 1) // 2)[has_analog]
+        hi = (starts + analog_counts // 2)[has_analog]
+        medians = np.full(n, np.nan)
+        medians[has_analog] = (sorted_values[lo] + sorted_values[hi]) / 2.0
+
+        sums = np.bincount(analog_groups, weights=analog_values, minlength=n)
+        squares = np.bincount(analog_groups, weights=analog_values ** 2, minlength=n)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            means = sums / analog_counts
+            spreads = np.sqrt(np.maximum(squares / analog_counts - means ** 2, 0.0))
+
+        results = {}
+        for idx in np.flatnonzero(self.group_is_voting & selected):
+            voting_result = {
+                "digital_consensus": bool(true_votes[idx] > false_votes[idx]) if total_votes[idx] > 0 else None,
+                "true_votes": int(true_votes[idx]),
+                "false_votes": int(false_votes[idx]),
+                "confidence": float(vote_confidence[idx])
+            }
+            if has_analog[idx]:
+                voting_result["analog_consensus"] = float(medians[idx])
+                voting_result["analog_spread"] = float(spreads[idx])
+
+            group_id = self.groups[idx].group_id
+            results[group_id] = {
+                "fusion_method": "voting",
+                "group_id": group_id,
+                "timestamp": timestamp,
+                "voting_result": voting_result,
+                "overall_quality": DataQuality.GOOD if voting_result["confidence"] > 0.8 else DataQuality.UNCERTAIN
+            }
+        return results
+
+    def _fuse_power(self, values: np.ndarray, valid: np.ndarray, timestamp: datetime,
+                    selected: np.ndarray) -> Dict[str, Dict]:
+        n = self.n_groups
+        current_mask = valid & self.slot_is_current
+        voltage_mask = valid & self.slot_is_voltage
+
+        # Slots are ordered by group, so np.unique's first index is the first sensor
+        current = np.full(n, np.nan)
+        groups, first = np.unique(self.slot_group[current_mask], return_index=True)
+        current[groups] = values[current_mask][first]
+        voltage = np.full(n, np.nan)
+        groups, first = np.unique(self.slot_group[voltage_mask], return_index=True)
+        voltage[groups] = values[voltage_mask][first]
+
+        # Convert 4-20mA signals from mA to A
+        current_a = np.where(current <= 25, current / 1000.0, current)
+        power_w = voltage * current_a
+
+        results = {}
+        for idx in np.flatnonzero(self.group_is_power & selected):
+            segment = slice(self.segment_starts[idx], self.segment_ends[idx])
+            power_calculations = {}
+            if not (np.isnan(current[idx]) or np.isnan(voltage[idx])):
+                power_calculations = {
+                    "current_a": float(current_a[idx]),
+                    "voltage_v": float(voltage[idx]),
+                    "power_w": float(power_w[idx]),
+                    "apparent_power_va": float(power_w[idx]),  # Simplified, assuming unity power factor
+                    "power_factor": 1.0
+                }
+
+            group_id = self.groups[idx].group_id
+            results[group_id] = {
+                "fusion_method": "power_calculation",
+                "group_id": group_id,
+                "timestamp": timestamp,
+                "power_calculations": power_calculations,
+                "input_values": {
+                    "current": values[segment][current_mask[segment]].tolist(),
+                    "voltage": values[segment][voltage_mask[segment]].tolist()
+                },
+                "overall_quality": DataQuality.GOOD if power_calculations else DataQuality.UNCERTAIN
+            }
+        return results
+
+    def _fuse_weighted(self, values: np.ndarray, valid: np.ndarray, good: np.ndarray,
+                       timestamp: datetime, selected: np.ndarray) -> Dict[str, Dict]:
+        n = self.n_groups
+        weights = np.where(good, 1.0, 0.5) * self.slot_confidence
+        weights = np.where(valid, weights, 0.0)
+        weighted = np.where(valid, values, 0.0) * weights
+
+        total_weighted = np.bincount(self.slot_group, weights=weighted, minlength=n)
+        total_weight = np.bincount(self.slot_group, weights=weights, minlength=n)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            averages = np.where(total_weight > 0, total_weighted / total_weight, 0.0)
+
+        results = {}
+        for idx in np.flatnonzero(self.group_is_weighted & selected):
+            start = self.segment_starts[idx]
+            slots = start + np.flatnonzero(valid[start:self.segment_ends[idx]])
+            group_id = self.groups[idx].group_id
+            results[group_id] = {
+                "fusion_method": "weighted_average",
+                "group_id": group_id,
+                "timestamp": timestamp,
+                "weighted_average": float(averages[idx]),
+                "total_weight": float(total_weight[idx]),
+                "individual_weights": {
+                    self.slot_sensor_ids[slot]: {
+                        "value": float(values[slot]),
+                        "weight": float(weights[slot]),
+                        "weighted_value": float(weighted[slot])
+                    }
+                    for slot in slots
+                },
+                "overall_quality": DataQuality.GOOD if total_weight[idx] > 0.8 else DataQuality.UNCERTAIN
+            }
+        return results
+
+def _encode_default(obj: Any) -> Any:
+    """Fallback encoder for datetimes, enums and NumPy values in payloads."""
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    if isinstance(obj, Enum):
+        return obj.value
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    return str(obj)
+
+class CoalescingMqttPublisher:
+    """
+    Batched MQTT publisher drained by one dedicated I/O thread.
+
+    ``publish()`` never blocks the event loop: it stores the payload in a
+    bounded per-topic pending map, so a newer update for a topic replaces
+    an unsent older one. The I/O thread wakes, lingers briefly to let
+    updates coalesce, swaps out the whole pending map, serializes it as
+    one batch (JSON or MessagePack) and hands each message to the client.
+    """
+
+    def __init__(self, client: Any, qos: int = 1, retain: bool = False, encoding: str = "json",
+                 max_pending_topics: int = 10000, linger: float = 0.05):
+        if encoding == "msgpack" and not MSGPACK_AVAILABLE:
+            logger.warning("⚠️  msgpack not installed, falling back to JSON MQTT payloads")
+            encoding = "json"
+
+        self.client = client
+        self.qos = qos
+        self.retain = retain
+        self.encoding = encoding
+        self.max_pending_topics = max_pending_topics
+        self.linger = linger
+
+        self._pending: "OrderedDict[str, Any]" = OrderedDict()
+        self._condition = threading.Condition()
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+        self.stats = {
+            "submitted": 0,
+            "coalesced": 0,
+            "dropped": 0,
+            "published": 0,
+            "batches": 0,
+            "errors": 0
+        }
+
+    def start(self):
+        """Start the dedicated I/O thread."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="ct087-mqtt-publisher", daemon=True)
+        self._thread.start()
+
+    async def stop(self, timeout: float = 5.0):
+        """Flush pending messages and stop the I/O thread."""
+        with self._condition:
+            self._running = False
+            self._condition.notify()
+        if self._thread:
+            await asyncio.to_thread(self._thread.join, timeout)
+            self._thread = None
+
+    def publish(self, topic: str, payload: Any) -> bool:
+        """Queue a payload for a topic; returns False if it was dropped."""
+        with self._condition:
+            if topic in self._pending:
+                self.stats["coalesced"] += 1
+            elif len(self._pending) >= self.max_pending_topics:
+                self.stats["dropped"] += 1
+                return False
+            self._pending[topic] = payload
+            self.stats["submitted"] += 1
+            self._condition.notify()
+        return True
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._pending)
+
+    def encode_batch(self, batch: "OrderedDict[str, Any]") -> List[Tuple[str, bytes]]:
+        """Serialize a batch of pending payloads."""
+        if self.encoding == "msgpack":
+            packer = msgpack.Packer(default=_encode_default, use_bin_type=True)
+            return [(topic, packer.pack(payload)) for topic, payload in batch.items()]
+
+        encoder = json.JSONEncoder(default=_encode_default, separators=(",", ":"))
+        return [(topic, encoder.encode(payload).encode()) for topic, payload in batch.items()]
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while self._running and not self._pending:
+                    self._condition.wait()
+                if not self._running and not self._pending:
+                    return
+
+            # Let further updates for the same topics coalesce before sending
+            if self._running and self.linger > 0:
+                time.sleep(self.linger)
+
+            with self._condition:
+                batch, self._pending = self._pending, OrderedDict()
+
+            try:
+                messages = self.encode_batch(batch)
+            except Exception as e:
+                self.stats["errors"] += len(batch)
+                logger.debug(f"MQTT batch encoding failed: {e}")
+                continue
+
+            for topic, data in messages:
+                try:
+                    self.client.publish(topic, data, qos=self.qos, retain=self.retain)
+                    self.stats["published"] += 1
+                except Exception as e:
+                    self.stats["errors"] += 1
+                    logger.debug(f"MQTT publish failed for {topic}: {e}")
+            self.stats["batches"] += 1
+
+def flatten_group_data(processed_data: Dict[str, Any]) -> Dict[str, Union[float, bool]]:
+    """Flatten a fused group payload into named scalar values for OPC-UA."""
+    values: Dict[str, Union[float, bool]] = {}
+    method = processed_data.get("fusion_method")
+
+    if method == "kalman_filter":
+        for sensor_id, fused in processed_data.get("fused_values", {}).items():
+            values[f"{sensor_id}_filtered"] = fused["filtered_value"]
+            values[f"{sensor_id}_confidence"] = fused["confidence"]
+    elif method == "voting":
+        voting_result = processed_data.get("voting_result", {})
+        if voting_result.get("digital_consensus") is not None:
+            values["digital_consensus"] = bool(voting_result["digital_consensus"])
+        values["confidence"] = voting_result.get("confidence", 0.0)
+        if "analog_consensus" in voting_result:
+            values["analog_consensus"] = voting_result["analog_consensus"]
+            values["analog_spread"] = voting_result["analog_spread"]
+    elif method == "power_calculation":
+        values.update(processed_data.get("power_calculations", {}))
+    elif method == "weighted_average":
+        values["weighted_average"] = processed_data.get("weighted_average", 0.0)
+        values["total_weight"] = processed_data.get("total_weight", 0.0)
+
+    if "overall_quality" in processed_data:
+        values["quality_good"] = processed_data["overall_quality"] == DataQuality.GOOD
+
+    return {name: value for name, value in values.items()
+            if isinstance(value, (bool, int, float)) and not (isinstance(value, float) and math.isnan(value))}
+
+async def opcua_write_batch(server: Any, updates: List[Tuple[Any, Any]]) -> List[Any]:
+    """
+    Write many (NodeId, Variant) pairs to a local asyncua server in one
+    Write service call on the server's internal session.
+    """
+    params = ua.WriteParameters()
+    params.NodesToWrite = [
+        ua.WriteValue(NodeId=node_id, AttributeId=ua.AttributeIds.Value, Value=ua.DataValue(variant))
+        for node_id, variant in updates
+    ]
+    return await server.iserver.isession.write(params)
+
 class MultiSensorIntegrator:
     """
     Advanced multi-sensor integration engine for CT-087.
@@ -149,12 +990,27 @@ class MultiSensorIntegrator:
         self.dashboard_layouts: Dict[str, Dict] = {}
         self.sensor_groups: Dict[str, IntegratedSensorGroup] = {}
         self.process_variables: Dict[str, ProcessVariable] = {}
-        self.real_time_data: Dict[str, List[SensorReading]] = {}
+        self.real_time_data: Dict[str, SensorRingBuffer] = {}
+        self.buffer_capacity = 1000
+        self.filter_chains: Dict[str, SignalFilterChain] = {}
+        self.batch_fusion: Optional[BatchFusionEngine] = None
+
+        # Event-driven ingestion: sensor -> groups index and dirty-set wakeup
+        self.sensor_group_index: Dict[str, List[str]] = {}
+        self.dirty_groups: set = set()
+        self.data_event: Optional[asyncio.Event] = None
+        self.event_loop: Optional[asyncio.AbstractEventLoop] = None
         self.integration_active = False
         
         # Protocol clients
         self.opcua_server = None
+        self.opcua_namespace_idx: Optional[int] = None
+        self.opcua_folders: Dict[str, Any] = {}
+        self.opcua_nodes: Dict[str, Tuple[Any, Any]] = {}
+        self.opcua_pending: Dict[str, Any] = {}
+        self.opcua_write_stats = {"batches": 0, "values": 0, "bad_status": 0}
         self.mqtt_client = None
+        self.mqtt_publisher: Optional[CoalescingMqttPublisher] = None
         self.modbus_clients: Dict[str, Any] = {}
         
         # ADK Coordination
@@ -169,6 +1025,7 @@ class MultiSensorIntegrator:
         
         self.load_configuration()
         self.initialize_signal_processors()
+        self.kalman_engine = KalmanFusionEngine(self.signal_processors["kalman_filter"])
         logger.info(f"🔌 CT-087 Agent 3 initialized - Multi-Sensor Integration Engine")
     
     def load_configuration(self):
@@ -203,7 +1060,12 @@ class MultiSensorIntegrator:
                     "broker_port": 1883,
                     "topic_prefix": "ct087/sensors",
                     "qos": 1,
-                    "retain": False
+                    "retain": False,
+                    "publisher": {
+                        "encoding": "json",
+                        "max_pending_topics": 10000,
+                        "linger": 0.05
+                    }
                 },
                 "modbus": {
                     "enabled": True,
@@ -233,11 +1095,11 @@ class MultiSensorIntegrator:
                 }
             },
             "signal_processing": {
+                "filter_chain": ["outlier_detector", "median_filter", "low_pass_filter"],
                 "filters": {
                     "low_pass": {
                         "enabled": True,
-                        "cutoff_frequency": 10.0,
-                        "order": 4
+                        "cutoff_frequency": 10.0
                     },
                     "median": {
                         "enabled": True,
@@ -268,6 +1130,12 @@ class MultiSensorIntegrator:
                     "quality_degradation": "weighted_average"
                 }
             },
+            "fusion_engine": {
+                "mode": "batch",
+                "ingestion": "polling",
+                "tick_interval": 0.02,
+                "simulate_sensors": True
+            },
             "process_variables": {
                 "enable_calculated_values": True,
                 "update_interval": 5000,
@@ -297,13 +1165,16 @@ class MultiSensorIntegrator:
         logger.info("🔧 Signal processors initialized")
     
     def create_low_pass_filter(self) -> Dict:
-        """Create low-pass filter for noise reduction."""
+        """
+        Create low-pass filter for noise reduction.
+
+        The filter is first order, so an ``order`` key in older configs is
+        ignored; the sample rate is set per sensor from its group interval.
+        """
         config = self.config["signal_processing"]["filters"]["low_pass"]
         return {
-            "type": "butterworth",
+            "type": "first_order_iir",
             "cutoff": config["cutoff_frequency"],
-            "order": config["order"],
-            "sample_rate": 100.0,  # Default sample rate
             "enabled": config["enabled"]
         }
     
@@ -326,13 +1197,10 @@ class MultiSensorIntegrator:
         }
     
     def create_kalman_filter(self) -> Dict:
-        """Create Kalman filter for state estimation."""
+        """Create Kalman filter parameters (state lives in KalmanFusionEngine)."""
         return {
             "process_noise": 0.01,
             "measurement_noise": 0.1,
-            "estimation_error": 1.0,
-            "gain": 0.0,
-            "state": 0.0,
             "covariance": 1.0
         }
     
@@ -516,6 +1384,7 @@ class MultiSensorIntegrator:
             
             # Create namespace
             namespace_idx = await self.opcua_server.register_namespace(opcua_config["namespace"])
+            self.opcua_namespace_idx = namespace_idx
             
             # Create object node for sensors
             sensor_object = await self.opcua_server.nodes.objects.add_object(namespace_idx, "CT087_Sensors")
@@ -536,6 +1405,14 @@ class MultiSensorIntegrator:
                 except Exception as e:
                     logger.debug(f"Failed to create OPC-UA variable for {sensor_id}: {e}")
             
+            # Group and process-variable folders; their variables are created on first publish
+            groups_object = await self.opcua_server.nodes.objects.add_object(namespace_idx, "CT087_Groups")
+            for group_id in self.sensor_groups:
+                self.opcua_folders[f"Group_{group_id}"] = await groups_object.add_object(namespace_idx, f"Group_{group_id}")
+            self.opcua_folders["ProcessVariables"] = await self.opcua_server.nodes.objects.add_object(
+                namespace_idx, "CT087_ProcessVariables"
+            )
+
             await self.opcua_server.start()
             logger.info(f"✅ OPC-UA server started: {opcua_config['server_endpoint']}")
             
@@ -562,6 +1439,18 @@ class MultiSensorIntegrator:
             
             # Start MQTT loop in background
             self.mqtt_client.loop_start()
+
+            # Outbound messages go through the coalescing publisher thread
+            publisher_config = mqtt_config.get("publisher", {})
+            self.mqtt_publisher = CoalescingMqttPublisher(
+                self.mqtt_client,
+                qos=mqtt_config["qos"],
+                retain=mqtt_config.get("retain", False),
+                encoding=publisher_config.get("encoding", "json"),
+                max_pending_topics=publisher_config.get("max_pending_topics", 10000),
+                linger=publisher_config.get("linger", 0.05)
+            )
+            self.mqtt_publisher.start()
             
             logger.info(f"✅ MQTT client connected: {mqtt_config['broker_host']}:{mqtt_config['broker_port']}")
             
@@ -591,8 +1480,12 @@ class MultiSensorIntegrator:
                 sensor_id = topic_parts[-2]
                 data = json.loads(msg.payload.decode())
                 
-                # Process incoming sensor data
-                asyncio.create_task(self.process_incoming_data(sensor_id, data, ProtocolType.MQTT))
+                # Process incoming sensor data on the integration event loop (called from paho's thread)
+                if self.event_loop and not self.event_loop.is_closed():
+                    asyncio.run_coroutine_threadsafe(
+                        self.process_incoming_data(sensor_id, data, ProtocolType.MQTT),
+                        self.event_loop
+                    )
                 
         except Exception as e:
             logger.debug(f"Failed to process MQTT message: {e}")
@@ -604,15 +1497,26 @@ class MultiSensorIntegrator:
         
         self.integration_active = True
         logger.info(f"🚀 Starting multi-sensor integration for {len(self.sensor_groups)} groups...")
+
+        self.event_loop = asyncio.get_running_loop()
+        self.data_event = asyncio.Event()
+        self.build_sensor_group_index()
         
         # Initialize protocols
         await self.initialize_protocols()
         
-        # Start integration tasks for each sensor group
+        # Start integration: one vectorized task for all groups, or one task per group
         integration_tasks = []
-        for group_id, group in self.sensor_groups.items():
-            task = asyncio.create_task(self.integrate_sensor_group(group))
-            integration_tasks.append(task)
+        fusion_config = self.config.get("fusion_engine", {})
+        if fusion_config.get("mode", "batch") == "batch":
+            if fusion_config.get("ingestion", "polling") == "event_driven":
+                integration_tasks.append(asyncio.create_task(self.run_event_driven_fusion()))
+            else:
+                integration_tasks.append(asyncio.create_task(self.run_batch_fusion()))
+        else:
+            for group_id, group in self.sensor_groups.items():
+                task = asyncio.create_task(self.integrate_sensor_group(group))
+                integration_tasks.append(task)
         
         # Start process variable calculation
         pv_task = asyncio.create_task(self.calculate_process_variables())
@@ -649,6 +1553,105 @@ class MultiSensorIntegrator:
                 logger.error(f"❌ Group integration error for {group.group_id}: {e}")
                 await asyncio.sleep(1.0)
     
+    def build_sensor_group_index(self):
+        """Index which groups each sensor belongs to."""
+        self.sensor_group_index = {}
+        for group_id, group in self.sensor_groups.items():
+            for sensor_id in group.sensor_ids:
+                self.sensor_group_index.setdefault(sensor_id, []).append(group_id)
+
+    def mark_sensor_dirty(self, sensor_id: str):
+        """Flag the groups that use a sensor for fusion and wake the scheduler."""
+        group_ids = self.sensor_group_index.get(sensor_id)
+        if group_ids:
+            self.dirty_groups.update(group_ids)
+            if self.data_event is not None:
+                self.data_event.set()
+
+    def create_batch_fusion_engine(self) -> BatchFusionEngine:
+        """Create the vectorized fusion engine for the current sensor groups."""
+        self.batch_fusion = BatchFusionEngine(
+            list(self.sensor_groups.values()),
+            self.sensor_profiles,
+            self.kalman_engine
+        )
+        logger.info(f"🔗 Starting batch fusion for {len(self.sensor_groups)} groups "
+                    f"({self.batch_fusion.n_slots} channels)")
+        return self.batch_fusion
+
+    async def run_batch_fusion(self):
+        """Fuse all sensor groups together on a single tick."""
+        fusion_config = self.config.get("fusion_engine", {})
+        tick_interval = fusion_config.get("tick_interval", 0.02)
+        simulate = fusion_config.get("simulate_sensors", True)
+
+        self.create_batch_fusion_engine()
+        next_publish = {group_id: 0.0 for group_id in self.sensor_groups}
+
+        while self.integration_active:
+            try:
+                # Only groups due at their own processing interval are sampled and fused,
+                # so Kalman and filter-chain time constants do not depend on the tick rate
+                now = time.monotonic()
+                due = {group_id for group_id, deadline in next_publish.items() if now >= deadline}
+
+                if due:
+                    if simulate:
+                        due_sensors = dict.fromkeys(
+                            sensor_id for group_id in due for sensor_id in self.sensor_groups[group_id].sensor_ids
+                        )
+                        for sensor_id in due_sensors:
+                            await self.get_sensor_reading(sensor_id)
+
+                    results = self.batch_fusion.fuse(self.real_time_data, due)
+
+                    for group_id in due:
+                        next_publish[group_id] = now + self.sensor_groups[group_id].processing_interval
+                    for group_id, processed_data in results.items():
+                        await self.publish_integrated_data(self.sensor_groups[group_id], processed_data)
+
+                    # One batched OPC-UA write for everything published this tick
+                    if self.opcua_server:
+                        await self.flush_opcua_updates()
+
+                # Sleep until the next group is due, never less than one tick
+                next_due = min(next_publish.values(), default=now + tick_interval)
+                await asyncio.sleep(max(tick_interval, next_due - time.monotonic()))
+
+            except Exception as e:
+                logger.error(f"❌ Batch fusion error: {e}")
+                await asyncio.sleep(1.0)
+
+    async def run_event_driven_fusion(self):
+        """Fuse only the groups whose sensors received new data, as it arrives."""
+        self.create_batch_fusion_engine()
+        if self.data_event is None:
+            self.data_event = asyncio.Event()
+
+        while self.integration_active:
+            try:
+                # Wake on data arrival; the timeout lets the loop notice shutdown
+                try:
+                    await asyncio.wait_for(self.data_event.wait(), timeout=1.0)
+                except asyncio.TimeoutError:
+                    continue
+
+                self.data_event.clear()
+                dirty, self.dirty_groups = self.dirty_groups, set()
+                if not dirty:
+                    continue
+
+                results = self.batch_fusion.fuse(self.real_time_data, dirty)
+                for group_id, processed_data in results.items():
+                    await self.publish_integrated_data(self.sensor_groups[group_id], processed_data)
+
+                if self.opcua_server:
+                    await self.flush_opcua_updates()
+
+            except Exception as e:
+                logger.error(f"❌ Event-driven fusion error: {e}")
+                await asyncio.sleep(1.0)
+
     async def collect_group_data(self, group: IntegratedSensorGroup) -> Dict[str, SensorReading]:
         """Collect current data from all sensors in a group."""
         group_data = {}
@@ -663,7 +1666,15 @@ class MultiSensorIntegrator:
                 logger.debug(f"Failed to collect data for {sensor_id}: {e}")
         
         return group_data
-    
+
+    def get_sensor_buffer(self, sensor_id: str) -> SensorRingBuffer:
+        """Get (or create) the real-time ring buffer for a sensor."""
+        buffer = self.real_time_data.get(sensor_id)
+        if buffer is None:
+            buffer = SensorRingBuffer(self.buffer_capacity)
+            self.real_time_data[sensor_id] = buffer
+        return buffer
+
     async def get_sensor_reading(self, sensor_id: str) -> Optional[SensorReading]:
         """Get current sensor reading (simulated for now)."""
         try:
@@ -705,52 +1716,56 @@ class MultiSensorIntegrator:
             )
             
             # Store in real-time buffer
-            if sensor_id not in self.real_time_data:
-                self.real_time_data[sensor_id] = []
-            
-            self.real_time_data[sensor_id].append(reading)
-            
-            # Keep only recent data
-            if len(self.real_time_data[sensor_id]) > 1000:
-                self.real_time_data[sensor_id] = self.real_time_data[sensor_id][-1000:]
-            
+            self.get_sensor_buffer(sensor_id).append_reading(reading)
+
             return reading
             
         except Exception as e:
             logger.debug(f"Failed to get sensor reading for {sensor_id}: {e}")
             return None
     
+    def sensor_sample_rate(self, sensor_id: str) -> float:
+        """Rate a sensor is read at in Hz: that of the fastest group it belongs to."""
+        intervals = [
+            group.processing_interval for group in self.sensor_groups.values()
+            if sensor_id in group.sensor_ids
+        ]
+        if not intervals:
+            intervals = [self.config.get("fusion_engine", {}).get("tick_interval", 0.02)]
+        return 1.0 / min(intervals)
+
+    def build_filter_chain(self, sensor_id: str) -> SignalFilterChain:
+        """Build a sensor's streaming filter chain from signal_processors config."""
+        signal_config = self.config.get("signal_processing", {})
+        chain_names = signal_config.get("sensor_filter_chains", {}).get(
+            sensor_id, signal_config.get("filter_chain", DEFAULT_FILTER_CHAIN)
+        )
+
+        sample_rate = self.sensor_sample_rate(sensor_id)
+        filters = []
+        for name in chain_names:
+            processor = self.signal_processors.get(name)
+            factory = FILTER_FACTORIES.get(name)
+            if processor is None or factory is None:
+                logger.warning(f"⚠️  Unknown signal filter '{name}' for {sensor_id}")
+                continue
+            if processor.get("enabled", True):
+                filters.append(factory(dict(processor, sample_rate=sample_rate)))
+
+        return SignalFilterChain(filters)
+
     async def apply_signal_processing(self, sensor_id: str, raw_value: Union[float, bool]) -> Union[float, bool]:
         """Apply signal processing to raw sensor value."""
         if isinstance(raw_value, bool):
             return raw_value  # No processing for digital signals
         
         try:
-            processed_value = float(raw_value)
-            
-            # Get historical data for filtering
-            if sensor_id in self.real_time_data and len(self.real_time_data[sensor_id]) > 0:
-                recent_values = [r.value for r in self.real_time_data[sensor_id][-10:] if isinstance(r.value, (int, float))]
-                
-                if len(recent_values) > 3:
-                    # Apply median filter for spike removal
-                    if self.signal_processors["median_filter"]["enabled"]:
-                        window_size = min(len(recent_values), self.signal_processors["median_filter"]["window_size"])
-                        if window_size >= 3:
-                            processed_value = float(np.median(recent_values[-window_size:] + [processed_value]))
-                    
-                    # Apply outlier detection
-                    if self.signal_processors["outlier_detector"]["enabled"]:
-                        mean_val = np.mean(recent_values)
-                        std_val = np.std(recent_values)
-                        if std_val > 0:
-                            z_score = abs(processed_value - mean_val) / std_val
-                            threshold = self.signal_processors["outlier_detector"]["threshold"]
-                            if z_score > threshold:
-                                # Use last known good value
-                                processed_value = recent_values[-1]
-            
-            return processed_value
+            chain = self.filter_chains.get(sensor_id)
+            if chain is None:
+                chain = self.build_filter_chain(sensor_id)
+                self.filter_chains[sensor_id] = chain
+
+            return chain.update(float(raw_value))
             
         except Exception as e:
             logger.debug(f"Signal processing failed for {sensor_id}: {e}")
@@ -773,42 +1788,24 @@ class MultiSensorIntegrator:
             return {}
     
     async def apply_kalman_fusion(self, group: IntegratedSensorGroup, group_data: Dict[str, SensorReading]) -> Dict[str, Any]:
-        """Apply Kalman filtering for optimal state estimation."""
+        """Apply persistent multi-sensor Kalman fusion for the group."""
         try:
-            # Simple Kalman filter implementation for demonstration
-            kf = self.signal_processors["kalman_filter"].copy()
-            
-            fused_values = {}
-            for sensor_id, reading in group_data.items():
-                if isinstance(reading.value, (int, float)):
-                    # Kalman filter update
-                    measurement = reading.value
-                    
-                    # Prediction step
-                    predicted_state = kf["state"]
-                    predicted_covariance = kf["covariance"] + kf["process_noise"]
-                    
-                    # Update step
-                    innovation = measurement - predicted_state
-                    innovation_covariance = predicted_covariance + kf["measurement_noise"]
-                    kalman_gain = predicted_covariance / innovation_covariance
-                    
-                    # State update
-                    kf["state"] = predicted_state + kalman_gain * innovation
-                    kf["covariance"] = (1 - kalman_gain) * predicted_covariance
-                    
-                    fused_values[sensor_id] = {
-                        "original_value": reading.value,
-                        "filtered_value": kf["state"],
-                        "confidence": 1.0 - (kf["covariance"] / (kf["covariance"] + kf["measurement_noise"])),
-                        "gain": kalman_gain
-                    }
-            
+            kf = self.kalman_engine.filter_for(group, self.sensor_profiles)
+
+            measurements = np.full(len(group.sensor_ids), np.nan)
+            for idx, sensor_id in enumerate(group.sensor_ids):
+                reading = group_data.get(sensor_id)
+                if reading and isinstance(reading.value, (int, float)):
+                    measurements[idx] = reading.value
+            valid = ~np.isnan(measurements)
+
+            kf.update(measurements, valid)
+
             return {
                 "fusion_method": "kalman_filter",
                 "group_id": group.group_id,
                 "timestamp": datetime.now(),
-                "fused_values": fused_values,
+                "fused_values": kf.fused_values(measurements, valid),
                 "overall_quality": DataQuality.GOOD
             }
             
@@ -954,9 +1951,19 @@ class MultiSensorIntegrator:
             logger.error(f"❌ Weighted average fusion failed: {e}")
             return {}
     
+    def get_kalman_state(self, group_id: str) -> Optional[Dict[str, Any]]:
+        """Get the current Kalman state estimate and covariance for a group."""
+        return self.kalman_engine.get_state(group_id)
+
     async def publish_integrated_data(self, group: IntegratedSensorGroup, processed_data: Dict[str, Any]):
         """Publish integrated data through industrial protocols."""
         try:
+            # Attach the persistent Kalman state estimate for this group
+            if processed_data.get("fusion_method") == "kalman_filter":
+                kalman_state = self.get_kalman_state(group.group_id)
+                if kalman_state:
+                    processed_data = {**processed_data, "kalman_state": kalman_state}
+
             # Publish to OPC-UA
             if self.opcua_server and processed_data:
                 await self.publish_to_opcua(group, processed_data)
@@ -968,36 +1975,84 @@ class MultiSensorIntegrator:
         except Exception as e:
             logger.error(f"❌ Failed to publish integrated data: {e}")
     
+    async def get_opcua_node(self, folder: str, name: str, value: Union[float, bool]) -> Optional[Any]:
+        """Get a cached (NodeId, VariantType) handle, creating the node on first use."""
+        key = f"{folder}/{name}"
+        cached = self.opcua_nodes.get(key)
+        if cached is not None:
+            return cached
+
+        parent = self.opcua_folders.get(folder)
+        if parent is None:
+            parent = await self.opcua_server.nodes.objects.add_object(self.opcua_namespace_idx, folder)
+            self.opcua_folders[folder] = parent
+
+        variant_type = ua.VariantType.Boolean if isinstance(value, bool) else ua.VariantType.Double
+        initial = bool(value) if variant_type == ua.VariantType.Boolean else float(value)
+        node = await parent.add_variable(self.opcua_namespace_idx, name, initial, variant_type)
+        self.opcua_nodes[key] = (node.nodeid, variant_type)
+        return self.opcua_nodes[key]
+
+    async def stage_opcua_values(self, folder: str, values: Dict[str, Union[float, bool]]):
+        """Stage values for the next batched OPC-UA write."""
+        for name, value in values.items():
+            node_id, variant_type = await self.get_opcua_node(folder, name, value)
+            if variant_type == ua.VariantType.Boolean:
+                self.opcua_pending[node_id] = ua.Variant(bool(value), variant_type)
+            else:
+                self.opcua_pending[node_id] = ua.Variant(float(value), variant_type)
+
+    async def flush_opcua_updates(self):
+        """Push all staged OPC-UA values in a single batched write."""
+        if not self.opcua_pending:
+            return
+
+        updates = list(self.opcua_pending.items())
+        self.opcua_pending = {}
+        try:
+            results = await opcua_write_batch(self.opcua_server, updates)
+            self.opcua_write_stats["batches"] += 1
+            self.opcua_write_stats["values"] += len(updates)
+            self.opcua_write_stats["bad_status"] += sum(1 for status in results if not status.is_good())
+        except Exception as e:
+            logger.debug(f"OPC-UA batch write failed: {e}")
+
     async def publish_to_opcua(self, group: IntegratedSensorGroup, processed_data: Dict[str, Any]):
         """Publish data to OPC-UA server."""
         try:
-            # Create group variable if not exists
-            group_var_name = f"Group_{group.group_id}"
-            
-            # For now, just log the data (full OPC-UA implementation would require more setup)
-            logger.debug(f"📡 OPC-UA: {group_var_name} = {processed_data}")
+            await self.stage_opcua_values(f"Group_{group.group_id}", flatten_group_data(processed_data))
+
+            # The batch fusion loop flushes once per tick; per-group tasks flush per cycle
+            if self.batch_fusion is None:
+                await self.flush_opcua_updates()
             
         except Exception as e:
             logger.debug(f"OPC-UA publish failed: {e}")
+
+    async def publish_process_variables_to_opcua(self):
+        """Publish current process variable values to OPC-UA in one write."""
+        try:
+            values = {
+                pv_id: float(pv.current_value)
+                for pv_id, pv in self.process_variables.items()
+                if isinstance(pv.current_value, (int, float))
+            }
+            await self.stage_opcua_values("ProcessVariables", values)
+            await self.flush_opcua_updates()
+
+        except Exception as e:
+            logger.debug(f"OPC-UA process variable publish failed: {e}")
     
     async def publish_to_mqtt(self, group: IntegratedSensorGroup, processed_data: Dict[str, Any]):
-        """Publish data to MQTT broker."""
+        """Queue data for the MQTT broker (coalesced and sent in batches)."""
         try:
-            if self.mqtt_client:
+            if self.mqtt_publisher:
                 topic_prefix = self.config["protocols"]["mqtt"]["topic_prefix"]
                 topic = f"{topic_prefix}/groups/{group.group_id}/integrated"
-                
-                payload = json.dumps(processed_data, default=str)
-                
-                await asyncio.to_thread(
-                    self.mqtt_client.publish,
-                    topic,
-                    payload,
-                    qos=self.config["protocols"]["mqtt"]["qos"]
-                )
-                
-                logger.debug(f"📡 MQTT: Published to {topic}")
-            
+
+                if not self.mqtt_publisher.publish(topic, processed_data):
+                    logger.debug(f"📡 MQTT: Publisher full, dropped update for {topic}")
+
         except Exception as e:
             logger.debug(f"MQTT publish failed: {e}")
     
@@ -1011,6 +2066,9 @@ class MultiSensorIntegrator:
                 await self.calculate_system_efficiency()
                 await self.calculate_alarm_conditions()
                 await self.calculate_trend_predictions()
+
+                if self.opcua_server:
+                    await self.publish_process_variables_to_opcua()
                 
                 # Wait for next calculation cycle
                 await asyncio.sleep(self.config["process_variables"]["update_interval"] / 1000.0)
@@ -1053,21 +2111,18 @@ class MultiSensorIntegrator:
             warning_count = 0
             
             # Check all sensors for alarm conditions
-            for sensor_id, readings in self.real_time_data.items():
-                if readings:
-                    latest_reading = readings[-1]
+            for sensor_id, buffer in self.real_time_data.items():
+                value = buffer.latest_value()
+                if value is not None:
                     profile = self.sensor_profiles.get(sensor_id, {})
                     safety_limits = profile.get("safety_limits", {})
-                    
-                    if isinstance(latest_reading.value, (int, float)):
-                        value = latest_reading.value
-                        
-                        if (value <= safety_limits.get("alarm_low", float('-inf')) or 
-                            value >= safety_limits.get("alarm_high", float('inf'))):
-                            alarm_count += 1
-                        elif (value <= safety_limits.get("warning_low", float('-inf')) or 
-                              value >= safety_limits.get("warning_high", float('inf'))):
-                            warning_count += 1
+
+                    if (value <= safety_limits.get("alarm_low", float('-inf')) or
+                        value >= safety_limits.get("alarm_high", float('inf'))):
+                        alarm_count += 1
+                    elif (value <= safety_limits.get("warning_low", float('-inf')) or
+                          value >= safety_limits.get("warning_high", float('inf'))):
+                        warning_count += 1
             
             # Create alarm summary process variable
             alarm_pv = ProcessVariable(
@@ -1097,9 +2152,9 @@ class MultiSensorIntegrator:
                           if "temperature" in profile.get("sensor_type", "")]
             
             if temp_sensors and temp_sensors[0] in self.real_time_data:
-                readings = self.real_time_data[temp_sensors[0]]
-                if len(readings) >= 10:
-                    values = [r.value for r in readings[-10:] if isinstance(r.value, (int, float))]
+                buffer = self.real_time_data[temp_sensors[0]]
+                if len(buffer) >= 10:
+                    values = buffer.numeric_window(10)
                     
                     if len(values) >= 5:
                         # Simple linear trend
@@ -1183,16 +2238,10 @@ class MultiSensorIntegrator:
                 metadata=data.get("metadata", {})
             )
             
-            # Store in real-time buffer
-            if sensor_id not in self.real_time_data:
-                self.real_time_data[sensor_id] = []
-            
-            self.real_time_data[sensor_id].append(reading)
-            
-            # Keep only recent data
-            if len(self.real_time_data[sensor_id]) > 1000:
-                self.real_time_data[sensor_id] = self.real_time_data[sensor_id][-1000:]
-            
+            # Store in real-time buffer and wake the groups that use this sensor
+            self.get_sensor_buffer(sensor_id).append_reading(reading)
+            self.mark_sensor_dirty(sensor_id)
+
         except Exception as e:
             logger.debug(f"Failed to process incoming data for {sensor_id}: {e}")
     
@@ -1203,6 +2252,10 @@ class MultiSensorIntegrator:
                 await self.opcua_server.stop()
                 logger.info("🔌 OPC-UA server stopped")
             
+            if self.mqtt_publisher:
+                await self.mqtt_publisher.stop()
+                logger.info(f"📡 MQTT publisher stopped: {self.mqtt_publisher.stats}")
+
             if self.mqtt_client:
                 self.mqtt_client.loop_stop()
                 self.mqtt_client.disconnect()
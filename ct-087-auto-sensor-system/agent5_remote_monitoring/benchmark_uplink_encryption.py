@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+CT-087 cloud uplink encryption benchmark
+
+Compares the old per-message path (json.dumps + Fernet + base64 for every
+snapshot and every connection) with batched encryption of one compressed
+columnar payload, encrypted once per distinct key and shared by connections.
+
+Usage:
+    python3 benchmark_uplink_encryption.py --snapshots 500 --sensors 100 --connections 3
+"""
+
+import sys
+import argparse
+import base64
+import json
+import random
+import time
+from datetime import datetime
+from pathlib import Path
+
+from cryptography.fernet import Fernet
+
+sys.path.insert(0, str(Path(__file__).parent))
+Path("/tmp/ct-087-logs").mkdir(parents=True, exist_ok=True)
+
+from remote_monitoring_engine import SensorSnapshot, UplinkPayloadCache, encode_columnar_batch
+
+def make_snapshots(count: int, sensor_count: int):
+    snapshots = []
+    for version in range(1, count + 1):
+        data = {
+            "timestamp": datetime.now().isoformat(),
+            "device_id": "ct-087-sensor-system",
+            "sensors": {
+                f"sensor_{i:03d}": {
+                    "value": round(50 + random.gauss(0, 5), 3),
+                    "units": "psi",
+                    "quality": "good",
+                    "timestamp": datetime.now().isoformat(),
+                    "sensor_type": "pressure_gauge"
+                }
+                for i in range(sensor_count)
+            },
+            "system_metrics": {"cpu_usage": 12.8, "memory_usage": 65.2, "sensor_count": sensor_count}
+        }
+        snapshots.append(SensorSnapshot(version=version, created_at=datetime.now(), data=data))
+    return snapshots
+
+def per_message(snapshots, ciphers):
+    """Original path: serialize, encrypt and base64 every snapshot for every connection."""
+    sent = 0
+    for snapshot in snapshots:
+        for cipher in ciphers:
+            encrypted = cipher.encrypt(json.dumps(snapshot.data).encode())
+            sent += len(base64.b64encode(encrypted))
+    return sent
+
+def per_message_cached(snapshots, ciphers):
+    """Serialize each snapshot once, still encrypt per message and connection."""
+    sent = 0
+    for snapshot in snapshots:
+        payload = snapshot.json.encode()
+        for cipher in ciphers:
+            sent += len(cipher.encrypt(payload))
+    return sent
+
+def batched(snapshots, keys, batch_size, encoding, compression):
+    """Columnar batch, compressed, encrypted once per batch and distinct key."""
+    cache = UplinkPayloadCache()
+    records = [snapshot.json for snapshot in snapshots]
+    sent = 0
+    for start in range(0, len(records), batch_size):
+        chunk = records[start:start + batch_size]
+        batch_key = f"{start}-{start + len(chunk) - 1}"
+        for key in keys:
+            body, _ = cache.encoded_batch(batch_key, lambda: encode_columnar_batch(chunk, start, encoding, compression))
+            sent += len(cache.encrypted_batch(batch_key, body, key))
+    return sent, cache.stats
+
+def run(name, func, count):
+    started = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - started
+    sent = result[0] if isinstance(result, tuple) else result
+    print(f"{name:<34} {elapsed * 1000:9.1f} ms  {count / elapsed:10.0f} snapshots/s  {sent / 1e6:8.2f} MB out")
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description="Uplink encryption benchmark")
+    parser.add_argument("--snapshots", type=int, default=500)
+    parser.add_argument("--sensors", type=int, default=100)
+    parser.add_argument("--connections", type=int, default=3, help="connections receiving each snapshot")
+    parser.add_argument("--distinct-keys", type=int, default=1, help="distinct Fernet keys among connections")
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--encoding", default="msgpack", choices=["msgpack", "json"])
+    parser.add_argument("--compression", default="zstd", choices=["zstd", "gzip"])
+    args = parser.parse_args()
+
+    snapshots = make_snapshots(args.snapshots, args.sensors)
+    distinct = [Fernet.generate_key() for _ in range(args.distinct_keys)]
+    keys = [distinct[i % len(distinct)] for i in range(args.connections)]
+    ciphers = [Fernet(key) for key in keys]
+
+    print(f"{args.snapshots} snapshots x {args.sensors} sensors, {args.connections} connections, "
+          f"{args.distinct_keys} distinct key(s), batch size {args.batch_size}")
+    run("per-message (json + fernet + b64)", lambda: per_message(snapshots, ciphers), args.snapshots)
+    # Fresh snapshots so cached JSON is not already populated
+    snapshots = make_snapshots(args.snapshots, args.sensors)
+    run("per-message, serialized once", lambda: per_message_cached(snapshots, ciphers), args.snapshots)
+    _, stats = run("batched + cached encryption",
+                   lambda: batched(snapshots, keys, args.batch_size, args.encoding, args.compression),
+                   args.snapshots)
+    print(f"payload cache: {stats}")
+
+if __name__ == "__main__":
+    main()
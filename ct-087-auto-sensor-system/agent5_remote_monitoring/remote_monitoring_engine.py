@@ -16,20 +16,32 @@ Project: CT-087 Auto Sensor Detection System
 ADK Coordination: Final integration agent - receives from all previous agents
 """
 
+import os
+import csv
+import gzip
 import json
+import re
 import time
+import random
+import heapq
+import operator
 import asyncio
 import logging
 import hashlib
 import hmac
-import base64
+import inspect
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, List, Optional, Any, Tuple, Union
+from typing import Dict, List, Optional, Any, Tuple, Union, Callable, Awaitable
 from dataclasses import dataclass, asdict
+from collections import defaultdict, OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import cached_property
 from enum import Enum
 import uuid
 import ssl
+import numpy as np
 import websockets
 
 # HTTP and REST API libraries
@@ -40,6 +52,19 @@ try:
 except ImportError:
     HTTP_AVAILABLE = False
 
+# Compact binary encoding and compression for the cloud uplink
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
 # MQTT for cloud connectivity
 try:
     import paho.mqtt.client as mqtt
@@ -131,6 +156,14 @@ class AlertRule:
     created_at: datetime
     last_triggered: Optional[datetime]
 
+@dataclass
+class AlertEvent:
+    """Triggered alert queued for delivery."""
+    rule: AlertRule
+    sensor_data: Dict[str, Any]
+    triggered_at: datetime
+    enqueued_at: float
+
 @dataclass
 class RemoteSession:
     """Remote access session."""
@@ -157,6 +190,1648 @@ class DataAnalytics:
     schedule: str
     enabled: bool
     last_run: Optional[datetime]
+    next_run: Optional[datetime] = None
+
+@dataclass(frozen=True)
+class SensorSnapshot:
+    """
+    Immutable sensor data snapshot shared by all consumers of one tick.
+
+    ``data`` must be treated as read-only; ``json`` is serialized once on
+    first access and reused by every consumer of this version.
+    """
+    version: int
+    created_at: datetime
+    data: Dict[str, Any]
+
+    @cached_property
+    def json(self) -> str:
+        return json.dumps(self.data, default=str)
+
+class _HubClient:
+    """Per-connection state for the WebSocket broadcast hub."""
+
+    def __init__(self, websocket, delta_frames: bool):
+        self.websocket = websocket
+        self.subscription: Optional[frozenset] = None  # None = all sensors
+        self.delta_frames = delta_frames
+        self.last_version = 0
+        self.frames_sent = 0
+        self.frames_dropped = 0
+        self.wakeup = asyncio.Event()
+        try:
+            # Newer websockets can send pre-encoded bytes as a text frame
+            self.send_text = "text" in inspect.signature(websocket.send).parameters
+        except (TypeError, ValueError):
+            self.send_text = False
+
+    async def send(self, frame: bytes):
+        if self.send_text:
+            await self.websocket.send(frame, text=True)
+        else:
+            await self.websocket.send(frame.decode())
+
+class WebSocketBroadcastHub:
+    """
+    Fan-out of sensor snapshots to WebSocket subscribers.
+
+    Each frame is serialized once per snapshot and subscription and the same
+    bytes are sent to every matching client. Clients may subscribe to a subset
+    of sensors and receive delta frames (changed sensors only). Every client
+    has a single pending-frame slot: a slow client skips stale snapshots and
+    resyncs with a full frame instead of queueing them.
+    """
+
+    def __init__(self, max_clients: int = 10, delta_frames: bool = True):
+        self.max_clients = max_clients
+        self.delta_frames = delta_frames
+        self.clients: Dict[int, _HubClient] = {}
+        self.current: Optional[SensorSnapshot] = None
+        self._changed: Optional[List[str]] = None
+        self._frames: Dict[Tuple[Optional[frozenset], bool], Optional[bytes]] = {}
+        self._fragments: Dict[str, bytes] = {}
+        self._header = b""
+        self.stats = {
+            "snapshots": 0,
+            "frames_built": 0,
+            "frames_sent": 0,
+            "frames_dropped": 0,
+            "bytes_sent": 0,
+            "clients_rejected": 0
+        }
+
+    def broadcast(self, snapshot: SensorSnapshot):
+        """Make snapshot the current frame source and wake every client."""
+        previous = self.current
+        sensors = snapshot.data.get("sensors", {})
+        if previous is not None and previous.version == snapshot.version - 1:
+            old = previous.data.get("sensors", {})
+            self._changed = [
+                sensor_id for sensor_id, reading in sensors.items()
+                if sensor_id not in old
+                or old[sensor_id].get("value") != reading.get("value")
+                or old[sensor_id].get("quality") != reading.get("quality")
+            ]
+        else:
+            self._changed = None
+
+        self.current = snapshot
+        self._frames = {}
+        self._fragments = {}
+        self._header = json.dumps({
+            "timestamp": snapshot.data.get("timestamp"),
+            "device_id": snapshot.data.get("device_id")
+        }, default=str)[:-1].encode()
+        self.stats["snapshots"] += 1
+
+        for client in self.clients.values():
+            if client.wakeup.is_set():
+                # Previous frame never went out; it is superseded by this one
+                client.frames_dropped += 1
+                self.stats["frames_dropped"] += 1
+            client.wakeup.set()
+
+    def frame_for(self, client: _HubClient) -> Optional[bytes]:
+        """Return the shared frame for this client's view of the current snapshot."""
+        snapshot = self.current
+        delta = (client.delta_frames and self._changed is not None
+                 and client.last_version == snapshot.version - 1)
+        key = (client.subscription, delta)
+        if key in self._frames:
+            return self._frames[key]
+
+        if client.subscription is None and not delta:
+            frame = (b'{"type": "sensor_data", "version": %d, "data": ' % snapshot.version
+                     + snapshot.json.encode() + b'}')
+        else:
+            sensors = snapshot.data.get("sensors", {})
+            sensor_ids = self._changed if delta else sensors.keys()
+            if client.subscription is not None:
+                sensor_ids = [sensor_id for sensor_id in sensor_ids if sensor_id in client.subscription]
+            if delta and not sensor_ids:
+                frame = None
+            else:
+                frame_type = b"sensor_delta" if delta else b"sensor_data"
+                body = b", ".join(self._fragment(sensor_id, sensors[sensor_id]) for sensor_id in sensor_ids)
+                frame = (b'{"type": "' + frame_type + b'", "version": %d, "data": ' % snapshot.version
+                         + self._header + b', "sensors": {' + body + b'}}}')
+
+        self._frames[key] = frame
+        if frame is not None:
+            self.stats["frames_built"] += 1
+        return frame
+
+    def _fragment(self, sensor_id: str, reading: Dict[str, Any]) -> bytes:
+        fragment = self._fragments.get(sensor_id)
+        if fragment is None:
+            fragment = (json.dumps(sensor_id) + ": " + json.dumps(reading, default=str)).encode()
+            self._fragments[sensor_id] = fragment
+        return fragment
+
+    async def handle_client(self, websocket, path=None):
+        """Serve one WebSocket connection until it disconnects."""
+        if len(self.clients) >= self.max_clients:
+            self.stats["clients_rejected"] += 1
+            await websocket.close(1013, "Too many clients")
+            return
+
+        client = _HubClient(websocket, self.delta_frames)
+        self.clients[id(client)] = client
+        sender = asyncio.create_task(self._send_frames(client))
+        try:
+            await websocket.send(json.dumps({"type": "welcome", "message": "CT-087 Remote Monitoring"}))
+            if self.current is not None:
+                client.wakeup.set()
+
+            async for message in websocket:
+                self._handle_message(client, message)
+
+        except Exception as e:
+            logger.debug(f"WebSocket client error: {e}")
+        finally:
+            self.clients.pop(id(client), None)
+            sender.cancel()
+
+    def _handle_message(self, client: _HubClient, message):
+        """Apply a client control message, e.g. {"type": "subscribe", "sensors": [...], "delta": true}."""
+        try:
+            request = json.loads(message)
+        except (TypeError, ValueError):
+            return
+
+        if request.get("type") == "subscribe":
+            sensors = request.get("sensors")
+            client.subscription = frozenset(sensors) if sensors else None
+            client.delta_frames = bool(request.get("delta", self.delta_frames))
+            client.last_version = 0  # Resync with a full frame
+            if self.current is not None:
+                client.wakeup.set()
+
+    async def _send_frames(self, client: _HubClient):
+        try:
+            while True:
+                await client.wakeup.wait()
+                client.wakeup.clear()
+
+                snapshot = self.current
+                if snapshot is None or snapshot.version == client.last_version:
+                    continue
+
+                frame = self.frame_for(client)
+                client.last_version = snapshot.version
+                if frame is not None:
+                    await client.send(frame)
+                    client.frames_sent += 1
+                    self.stats["frames_sent"] += 1
+                    self.stats["bytes_sent"] += len(frame)
+
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.debug(f"WebSocket send failed: {e}")
+
+class AlertExpressionError(ValueError):
+    """Raised when an alert rule condition cannot be compiled."""
+
+ALERT_TOKEN_PATTERN = re.compile(r"""
+    \s*(?:
+        (?P<number>-?\d+(?:\.\d+)?)
+      | (?P<string>'[^']*'|"[^"]*")
+      | (?P<op>==|!=|<=|>=|<|>)
+      | (?P<paren>[()])
+      | (?P<word>[A-Za-z_][A-Za-z0-9_]*)
+    )""", re.VERBOSE)
+
+ALERT_COMPARISONS = {
+    "<": operator.lt, "<=": operator.le, ">": operator.gt,
+    ">=": operator.ge, "==": operator.eq, "!=": operator.ne
+}
+ALERT_OP_CODES = {"<": 0, "<=": 1, ">": 2, ">=": 3, "==": 4, "!=": 5}
+ALERT_OP_MIRROR = {"<": ">", "<=": ">=", ">": "<", ">=": "<=", "==": "==", "!=": "!="}
+ALERT_TIME_UNITS = {
+    "s": 1, "sec": 1, "second": 1, "seconds": 1,
+    "min": 60, "minute": 60, "minutes": 60,
+    "h": 3600, "hour": 3600, "hours": 3600
+}
+ALERT_LIMIT_NAMES = {"alarm_low", "alarm_high", "warning_low", "warning_high"}
+
+# Per-sensor variables kept in the engine's arrays; "value" and "rate" thresholds are vectorized
+ALERT_SENSOR_VARIABLES = {"value": 0, "rate": 1}
+
+class AlertRuleEngine:
+    """
+    Compiled alert-rule evaluation.
+
+    Rule conditions are parsed once into closures, with safety limits folded
+    in as constants per sensor. Plain "value/rate <op> constant" comparisons
+    are collected into threshold arrays and evaluated with one vectorized
+    comparison for the sensors that changed; only rule instances touching a
+    changed sensor (or depending on elapsed time) are re-evaluated.
+
+    Condition grammar:
+        expr       := and_expr (OR and_expr)*
+        and_expr   := unary (AND unary)*
+        unary      := NOT unary | primary (FOR <n> <unit>)?
+        primary    := '(' expr ')' | operand (<op> operand (DEADBAND <n>)?)?
+        operand    := number [unit] [ago] | 'string' | identifier
+
+    Identifiers: value, quality, rate (units/s between changes), last_update
+    (seconds since the sensor's last timestamp), safety limits such as
+    alarm_high, and system variables (offline_sensors, sensor_count or any
+    snapshot system_metrics key). "x FOR 30 seconds" holds only after x has
+    been true continuously for 30 s; "value > alarm_high DEADBAND 2" stays
+    active until value drops below alarm_high - 2.
+    """
+
+    def __init__(self, sensor_profiles: Dict[str, Dict]):
+        self.sensor_profiles = sensor_profiles
+        self._reset()
+
+    def _reset(self):
+        self.rules: Dict[str, AlertRule] = {}
+        self.rule_ids: set = set()
+
+        # Sensor arrays (index per sensor referenced by any rule)
+        self.sensor_index: Dict[str, int] = {}
+        self.variables = np.zeros((len(ALERT_SENSOR_VARIABLES), 0))
+        self.qualities: List[Optional[str]] = []
+        self.timestamps: List[Optional[str]] = []
+        self.last_update = np.zeros(0)
+        self.last_change = np.zeros(0)
+        self.system_values: Dict[str, Any] = {}
+
+        # Vectorized threshold terms
+        self.term_variable = np.zeros(0, dtype=np.int64)
+        self.term_sensor = np.zeros(0, dtype=np.int64)
+        self.term_op = np.zeros(0, dtype=np.int64)
+        self.term_threshold = np.zeros(0)
+        self.term_results = np.zeros(0, dtype=bool)
+        self.sensor_terms: List[List[int]] = []
+
+        # Compiled rule instances (one per rule and sensor)
+        self.instance_rule: List[str] = []
+        self.instance_predicates: List[Callable[[float], Any]] = []
+        self.instance_results = np.zeros(0, dtype=bool)
+        self.sensor_instances: List[List[int]] = []
+        self.always_instances: List[int] = []
+
+        self._last_data = None
+        self.stats = {"evaluations": 0, "sensors_changed": 0, "instances_evaluated": 0, "compile_errors": 0}
+
+    def compile(self, rules: Dict[str, AlertRule]):
+        """Compile all rules into the sensor-indexed structure (enabled is checked at dispatch)."""
+        self._reset()
+        self.rules = dict(rules)
+        self.rule_ids = set(rules)
+
+        self._terms: List[Tuple[int, int, int, float]] = []
+        for rule_id, rule in rules.items():
+            try:
+                tokens = self._tokenize(rule.condition)
+                sensor_ids = rule.sensor_ids if self._uses_sensor(tokens) else [None]
+                for sensor_id in sensor_ids:
+                    self._compile_instance(rule_id, tokens, sensor_id)
+            except AlertExpressionError as e:
+                self.stats["compile_errors"] += 1
+                logger.warning(f"⚠️  Alert rule {rule_id} not compiled: {e}")
+
+        terms = np.array(self._terms, dtype=float).reshape(-1, 4)
+        self.term_variable = terms[:, 0].astype(np.int64)
+        self.term_sensor = terms[:, 1].astype(np.int64)
+        self.term_op = terms[:, 2].astype(np.int64)
+        self.term_threshold = terms[:, 3]
+        self.term_results = np.zeros(len(terms), dtype=bool)
+        self.instance_results = np.zeros(len(self.instance_predicates), dtype=bool)
+        del self._terms
+
+        sensor_count = len(self.sensor_index)
+        self.variables = np.full((len(ALERT_SENSOR_VARIABLES), sensor_count), np.nan)
+        self.variables[ALERT_SENSOR_VARIABLES["rate"]] = 0.0
+        self.qualities = [None] * sensor_count
+        self.timestamps = [None] * sensor_count
+        # Communication-loss timers start from compile time, not the epoch
+        self.last_update = np.full(sensor_count, time.time())
+        self.last_change = self.last_update.copy()
+
+        logger.info(f"✅ Compiled {len(self.instance_predicates)} alert rule instances "
+                    f"({len(self.term_threshold)} vectorized thresholds, {len(self.sensor_index)} sensors)")
+
+    def evaluate(self, sensor_data: Optional[Dict[str, Any]], now: Optional[float] = None) -> List[str]:
+        """Ingest a snapshot and return the ids of rules whose condition holds."""
+        now = time.time() if now is None else now
+        dirty = set(self.always_instances)
+
+        if sensor_data is not None and sensor_data is not self._last_data:
+            self._last_data = sensor_data
+            changed = self._ingest(sensor_data, now)
+            if len(changed):
+                # Vectorized threshold comparison for terms on changed sensors
+                terms = np.fromiter(
+                    (term for index in changed for term in self.sensor_terms[index]), dtype=np.int64
+                )
+                if len(terms):
+                    values = self.variables[self.term_variable[terms], self.term_sensor[terms]]
+                    thresholds = self.term_threshold[terms]
+                    ops = self.term_op[terms]
+                    with np.errstate(invalid="ignore"):
+                        self.term_results[terms] = (
+                            ((ops == 0) & (values < thresholds)) | ((ops == 1) & (values <= thresholds)) |
+                            ((ops == 2) & (values > thresholds)) | ((ops == 3) & (values >= thresholds)) |
+                            ((ops == 4) & (values == thresholds)) | ((ops == 5) & (values != thresholds))
+                        )
+                for index in changed:
+                    dirty.update(self.sensor_instances[index])
+
+        for instance in dirty:
+            try:
+                self.instance_results[instance] = bool(self.instance_predicates[instance](now))
+            except Exception:
+                self.instance_results[instance] = False
+
+        self.stats["evaluations"] += 1
+        self.stats["instances_evaluated"] += len(dirty)
+        return list(dict.fromkeys(self.instance_rule[i] for i in np.flatnonzero(self.instance_results)))
+
+    def _ingest(self, sensor_data: Dict[str, Any], now: float) -> np.ndarray:
+        sensors = sensor_data.get("sensors", {})
+        changed = []
+        offline = 0
+        for sensor_id, reading in sensors.items():
+            if reading.get("quality") in ("bad", "offline"):
+                offline += 1
+            index = self.sensor_index.get(sensor_id)
+            if index is None:
+                continue
+
+            timestamp = reading.get("timestamp")
+            if timestamp != self.timestamps[index]:
+                self.timestamps[index] = timestamp
+                try:
+                    self.last_update[index] = datetime.fromisoformat(timestamp).timestamp()
+                except (TypeError, ValueError):
+                    self.last_update[index] = now
+
+            value = reading.get("value")
+            value = float(value) if isinstance(value, (int, float)) else np.nan
+            quality = reading.get("quality")
+            previous = self.variables[0, index]
+            same_value = value == previous or (np.isnan(value) and np.isnan(previous))
+            if quality != self.qualities[index] or not same_value:
+                if not np.isnan(value) and not np.isnan(previous):
+                    elapsed = now - self.last_change[index]
+                    self.variables[1, index] = (value - previous) / elapsed if elapsed > 0 else 0.0
+                self.variables[0, index] = value
+                self.qualities[index] = quality
+                self.last_change[index] = now
+                changed.append(index)
+            elif self.variables[1, index] != 0.0:
+                # Value held since the last snapshot, so the rate of change is now zero
+                self.variables[1, index] = 0.0
+                changed.append(index)
+
+        self.system_values = dict(sensor_data.get("system_metrics", {}))
+        self.system_values.update({"offline_sensors": offline, "sensor_count": len(sensors)})
+        self.stats["sensors_changed"] += len(changed)
+        return np.array(changed, dtype=np.int64)
+
+    @staticmethod
+    def _tokenize(condition: str) -> List[Tuple[str, Any]]:
+        tokens = []
+        position = 0
+        condition = condition.strip()
+        while position < len(condition):
+            match = ALERT_TOKEN_PATTERN.match(condition, position)
+            if not match or match.end() == position:
+                raise AlertExpressionError(f"unexpected input at {condition[position:]!r}")
+            kind = match.lastgroup
+            text = match.group(kind)
+            if kind == "number":
+                tokens.append(("number", float(text)))
+            elif kind == "string":
+                tokens.append(("string", text[1:-1]))
+            elif kind == "word" and text.upper() in ("AND", "OR", "NOT", "FOR", "DEADBAND", "AGO"):
+                tokens.append(("keyword", text.upper()))
+            else:
+                tokens.append((kind, text))
+            position = match.end()
+        return tokens
+
+    @staticmethod
+    def _uses_sensor(tokens: List[Tuple[str, Any]]) -> bool:
+        sensor_words = set(ALERT_SENSOR_VARIABLES) | ALERT_LIMIT_NAMES | {"quality", "last_update"}
+        return any(kind == "word" and text in sensor_words for kind, text in tokens)
+
+    def _sensor_slot(self, sensor_id: str) -> int:
+        index = self.sensor_index.get(sensor_id)
+        if index is None:
+            index = len(self.sensor_index)
+            self.sensor_index[sensor_id] = index
+            self.sensor_instances.append([])
+            self.sensor_terms.append([])
+        return index
+
+    def _compile_instance(self, rule_id: str, tokens: List[Tuple[str, Any]], sensor_id: Optional[str]):
+        index = self._sensor_slot(sensor_id) if sensor_id is not None else None
+        limits = self.sensor_profiles.get(sensor_id, {}).get("safety_limits", {}) if sensor_id else {}
+        compiler = _AlertConditionCompiler(self, tokens, index, limits)
+        predicate = compiler.compile()
+
+        instance = len(self.instance_predicates)
+        self.instance_rule.append(rule_id)
+        self.instance_predicates.append(predicate)
+        if index is None or compiler.time_dependent:
+            self.always_instances.append(instance)
+        else:
+            self.sensor_instances[index].append(instance)
+
+    def _add_term(self, variable: int, index: int, op: str, threshold: float) -> int:
+        self._terms.append((variable, index, ALERT_OP_CODES[op], threshold))
+        self.sensor_terms[index].append(len(self._terms) - 1)
+        return len(self._terms) - 1
+
+class _AlertConditionCompiler:
+    """Recursive-descent compiler from a condition token list to a closure."""
+
+    def __init__(self, engine: AlertRuleEngine, tokens: List[Tuple[str, Any]],
+                 index: Optional[int], limits: Dict[str, Any]):
+        self.engine = engine
+        self.tokens = tokens
+        self.position = 0
+        self.index = index
+        self.limits = limits
+        self.time_dependent = False
+
+    def compile(self) -> Callable[[float], Any]:
+        predicate = self._or()
+        if self.position != len(self.tokens):
+            raise AlertExpressionError(f"unexpected token {self.tokens[self.position][1]!r}")
+        return predicate
+
+    def _peek(self, kind: str, text: Any = None) -> bool:
+        if self.position >= len(self.tokens):
+            return False
+        token_kind, token_text = self.tokens[self.position]
+        return token_kind == kind and (text is None or token_text == text)
+
+    def _take(self, kind: str, text: Any = None) -> Any:
+        if not self._peek(kind, text):
+            found = self.tokens[self.position][1] if self.position < len(self.tokens) else "end of condition"
+            raise AlertExpressionError(f"expected {text or kind}, found {found!r}")
+        self.position += 1
+        return self.tokens[self.position - 1][1]
+
+    def _or(self):
+        terms = [self._and()]
+        while self._peek("keyword", "OR"):
+            self._take("keyword")
+            terms.append(self._and())
+        if len(terms) == 1:
+            return terms[0]
+        return lambda now: any(term(now) for term in terms)
+
+    def _and(self):
+        terms = [self._unary()]
+        while self._peek("keyword", "AND"):
+            self._take("keyword")
+            terms.append(self._unary())
+        if len(terms) == 1:
+            return terms[0]
+        return lambda now: all(term(now) for term in terms)
+
+    def _unary(self):
+        if self._peek("keyword", "NOT"):
+            self._take("keyword")
+            inner = self._unary()
+            return lambda now: not inner(now)
+
+        inner = self._primary()
+        if self._peek("keyword", "FOR"):
+            self._take("keyword")
+            hold = self._duration()
+            self.time_dependent = True
+            since = [None]
+
+            def held_for(now):
+                if not inner(now):
+                    since[0] = None
+                    return False
+                if since[0] is None:
+                    since[0] = now
+                return now - since[0] >= hold
+            return held_for
+        return inner
+
+    def _duration(self) -> float:
+        amount = self._take("number")
+        if self._peek("word") and self.tokens[self.position][1].lower() in ALERT_TIME_UNITS:
+            amount *= ALERT_TIME_UNITS[self._take("word").lower()]
+        return amount
+
+    def _primary(self):
+        if self._peek("paren", "("):
+            self._take("paren")
+            inner = self._or()
+            self._take("paren", ")")
+            return inner
+
+        left = self._operand()
+        if not self._peek("op"):
+            getter = left[1]
+            return lambda now: bool(getter(now))
+
+        op = self._take("op")
+        right = self._operand()
+        deadband = None
+        if self._peek("keyword", "DEADBAND"):
+            self._take("keyword")
+            deadband = self._take("number")
+
+        # "<variable> <op> <constant>" becomes a vectorized threshold term
+        if left[0] == "constant" and right[0] == "variable":
+            left, right, op = right, left, ALERT_OP_MIRROR[op]
+        if (deadband is None and left[0] == "variable" and right[0] == "constant"
+                and isinstance(right[2], (int, float)) and op in ALERT_OP_CODES):
+            engine = self.engine
+            term = engine._add_term(left[2], self.index, op, float(right[2]))
+            return lambda now: engine.term_results[term]
+
+        compare = ALERT_COMPARISONS[op]
+        left_value, right_value = left[1], right[1]
+        if deadband is None:
+            def comparison(now):
+                a, b = left_value(now), right_value(now)
+                return a is not None and b is not None and compare(a, b)
+            return comparison
+
+        # Hysteresis: once active, the threshold moves by the deadband in the releasing direction
+        if op not in ("<", "<=", ">", ">="):
+            raise AlertExpressionError("DEADBAND needs an ordering comparison")
+        release = -deadband if op in (">", ">=") else deadband
+        active = [False]
+
+        def hysteresis(now):
+            a, b = left_value(now), right_value(now)
+            if a is None or b is None or a != a:
+                active[0] = False
+            else:
+                active[0] = compare(a, b + release) if active[0] else compare(a, b)
+            return active[0]
+        return hysteresis
+
+    def _operand(self) -> Tuple[str, Callable[[float], Any], Any]:
+        """Return (kind, getter, payload); payload is the variable row or the constant."""
+        if self._peek("number"):
+            amount = self._take("number")
+            if self._peek("word") and self.tokens[self.position][1].lower() in ALERT_TIME_UNITS:
+                amount *= ALERT_TIME_UNITS[self._take("word").lower()]
+            if self._peek("keyword", "AGO"):
+                self._take("keyword")
+            return ("constant", lambda now: amount, amount)
+
+        if self._peek("string"):
+            text = self._take("string")
+            return ("constant", lambda now: text, text)
+
+        name = self._take("word")
+        engine, index = self.engine, self.index
+        if name in ALERT_SENSOR_VARIABLES or name in ("quality", "last_update"):
+            if index is None:
+                raise AlertExpressionError(f"{name} needs a sensor")
+            if name in ALERT_SENSOR_VARIABLES:
+                row = ALERT_SENSOR_VARIABLES[name]
+                return ("variable", lambda now: engine.variables[row, index], row)
+            if name == "quality":
+                return ("sensor", lambda now: engine.qualities[index], None)
+            self.time_dependent = True
+            return ("sensor", lambda now: now - engine.last_update[index], None)
+
+        if name in self.limits or name in ALERT_LIMIT_NAMES:
+            # Safety limits are folded in as constants; a missing limit never trips
+            limit = self.limits.get(name)
+            return ("constant", lambda now: limit, limit)
+
+        # Anything else is a system-wide variable looked up per evaluation
+        return ("system", lambda now: engine.system_values.get(name), None)
+
+class SmtpConnectionPool:
+    """Persistent SMTP sessions reused across alert emails (smtplib runs in worker threads)."""
+
+    def __init__(self, email_config: Dict[str, Any], size: int = 2):
+        self.config = email_config
+        self.idle: List[Any] = []
+        self.semaphore = asyncio.Semaphore(size)
+
+    def _connect(self):
+        smtp = smtplib.SMTP(self.config["smtp_server"], self.config["smtp_port"], timeout=30)
+        smtp.starttls()
+        smtp.login(self.config["username"], self.config["password"])
+        return smtp
+
+    async def send(self, message):
+        async with self.semaphore:
+            smtp = self.idle.pop() if self.idle else await asyncio.to_thread(self._connect)
+            try:
+                await asyncio.to_thread(smtp.send_message, message)
+            except smtplib.SMTPServerDisconnected:
+                # Idle session was closed by the server; drop it and reconnect once
+                await asyncio.to_thread(smtp.close)
+                smtp = await asyncio.to_thread(self._connect)
+                try:
+                    await asyncio.to_thread(smtp.send_message, message)
+                except Exception:
+                    await asyncio.to_thread(smtp.close)
+                    raise
+            except Exception:
+                await asyncio.to_thread(smtp.close)
+                raise
+            self.idle.append(smtp)
+
+    async def close(self):
+        while self.idle:
+            smtp = self.idle.pop()
+            try:
+                await asyncio.to_thread(smtp.quit)
+            except Exception:
+                pass
+
+class AlertDispatcher:
+    """
+    Queued alert delivery decoupled from rule evaluation.
+
+    Each channel has a bounded queue served by its own worker pool. A worker
+    collects alerts arriving within the digest window into one batch, so the
+    channel sender can deliver a burst as a single digest message. Critical
+    alerts skip the digest wait. When a queue is full the alert is dropped and
+    counted rather than blocking the evaluator.
+    """
+
+    def __init__(self, senders: Dict[AlertChannel, Callable[[List[AlertEvent]], Awaitable[None]]],
+                 dispatch_config: Dict[str, Any]):
+        self.senders = senders
+        self.queue_size = dispatch_config.get("queue_size", 1000)
+        self.workers_per_channel = dispatch_config.get("workers_per_channel", 2)
+        self.digest_window = dispatch_config.get("digest_window", 2.0)
+        self.digest_max = dispatch_config.get("digest_max", 50)
+        self.queues: Dict[AlertChannel, asyncio.Queue] = {}
+        self.workers: List[asyncio.Task] = []
+        self.stats = {
+            channel.value: {
+                "enqueued": 0, "dequeued": 0, "sent": 0, "batches": 0, "dropped": 0, "errors": 0,
+                "send_time_total": 0.0, "send_time_max": 0.0, "queue_time_total": 0.0
+            }
+            for channel in senders
+        }
+
+    def start(self):
+        for channel in self.senders:
+            self.queues[channel] = asyncio.Queue(maxsize=self.queue_size)
+            for _ in range(self.workers_per_channel):
+                self.workers.append(asyncio.create_task(self._worker(channel)))
+        logger.info(f"✅ Alert dispatcher started ({len(self.senders)} channels, "
+                    f"{self.workers_per_channel} workers each)")
+
+    async def stop(self, timeout: float = 5.0):
+        """Drain queued alerts (up to timeout) and stop the workers."""
+        try:
+            await asyncio.wait_for(asyncio.gather(*(queue.join() for queue in self.queues.values())), timeout)
+        except asyncio.TimeoutError:
+            logger.warning("⚠️  Alert dispatcher stopped with alerts still queued")
+        for worker in self.workers:
+            worker.cancel()
+        await asyncio.gather(*self.workers, return_exceptions=True)
+        self.workers = []
+
+    def enqueue(self, rule: AlertRule, sensor_data: Dict[str, Any]) -> int:
+        """Queue an alert on each of its channels; returns the number of channels accepted."""
+        event = AlertEvent(rule=rule, sensor_data=sensor_data,
+                           triggered_at=datetime.now(), enqueued_at=time.perf_counter())
+        accepted = 0
+        for channel in rule.channels:
+            queue = self.queues.get(channel)
+            if queue is None:
+                continue
+            stats = self.stats[channel.value]
+            try:
+                queue.put_nowait(event)
+                stats["enqueued"] += 1
+                accepted += 1
+            except asyncio.QueueFull:
+                stats["dropped"] += 1
+        return accepted
+
+    async def _worker(self, channel: AlertChannel):
+        queue = self.queues[channel]
+        stats = self.stats[channel.value]
+        loop = asyncio.get_running_loop()
+
+        while True:
+            batch = [await queue.get()]
+            if batch[0].rule.priority != "critical":
+                deadline = loop.time() + self.digest_window
+                while len(batch) < self.digest_max:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(queue.get(), remaining))
+                    except asyncio.TimeoutError:
+                        break
+            while len(batch) < self.digest_max and not queue.empty():
+                batch.append(queue.get_nowait())
+
+            started = time.perf_counter()
+            stats["dequeued"] += len(batch)
+            stats["queue_time_total"] += sum(started - event.enqueued_at for event in batch)
+            try:
+                await self.senders[channel](batch)
+                stats["sent"] += len(batch)
+            except Exception as e:
+                stats["errors"] += 1
+                logger.warning(f"⚠️  {channel.value} alert delivery failed ({len(batch)} alerts): {e}")
+            finally:
+                elapsed = time.perf_counter() - started
+                stats["batches"] += 1
+                stats["send_time_total"] += elapsed
+                stats["send_time_max"] = max(stats["send_time_max"], elapsed)
+                for _ in batch:
+                    queue.task_done()
+
+    def metrics(self) -> Dict[str, Dict[str, Any]]:
+        """Queue depth and delivery latency per channel."""
+        metrics = {}
+        for channel, queue in self.queues.items():
+            stats = self.stats[channel.value]
+            metrics[channel.value] = {
+                "queue_depth": queue.qsize(),
+                "enqueued": stats["enqueued"],
+                "sent": stats["sent"],
+                "batches": stats["batches"],
+                "dropped": stats["dropped"],
+                "errors": stats["errors"],
+                "avg_send_ms": stats["send_time_total"] / stats["batches"] * 1000 if stats["batches"] else 0.0,
+                "max_send_ms": stats["send_time_max"] * 1000,
+                "avg_queue_ms": stats["queue_time_total"] / max(1, stats["dequeued"]) * 1000
+            }
+        return metrics
+
+class UplinkSpool:
+    """
+    Durable store-and-forward queue for the cloud uplink.
+
+    Records are appended as JSON lines to segment files named after their
+    first sequence number. Each consumer (cloud connection) has a persisted
+    cursor, and a segment is deleted only once every cursor has moved past
+    it, so an outage simply grows the backlog that is replayed afterwards.
+    """
+
+    def __init__(self, spool_dir: str, segment_bytes: int = 4 * 1024 * 1024,
+                 max_bytes: int = 512 * 1024 * 1024, fsync: bool = False):
+        self.spool_dir = Path(spool_dir)
+        self.spool_dir.mkdir(parents=True, exist_ok=True)
+        self.segment_bytes = segment_bytes
+        self.max_bytes = max_bytes
+        self.fsync = fsync
+        self.cursors: Dict[str, Dict[str, int]] = {}
+        self.segments: List[int] = sorted(int(path.stem) for path in self.spool_dir.glob("*.seg"))
+        self.next_seq = 0
+        self.writer = None
+        self.stats = {"appended": 0, "appended_bytes": 0, "segments_deleted": 0, "records_discarded": 0}
+        self._recover()
+
+    def _segment_path(self, base: int) -> Path:
+        return self.spool_dir / f"{base:012d}.seg"
+
+    def _cursor_path(self, consumer_id: str) -> Path:
+        return self.spool_dir / f"cursor-{consumer_id}.json"
+
+    def _recover(self):
+        """Reload persisted cursors and find the next sequence number, dropping a torn record left by a crash."""
+        for path in self.spool_dir.glob("cursor-*.json"):
+            consumer_id = path.stem[len("cursor-"):]
+            try:
+                with open(path, "r") as f:
+                    self.cursors[consumer_id] = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning(f"⚠️  Unreadable uplink cursor for {consumer_id}: {e}")
+        if not self.segments:
+            return
+        base = self.segments[-1]
+        path = self._segment_path(base)
+        with open(path, "rb") as f:
+            data = f.read()
+        complete = data.rfind(b"\n") + 1
+        if complete < len(data):
+            with open(path, "r+b") as f:
+                f.truncate(complete)
+            logger.warning(f"⚠️  Dropped partial uplink record in {path.name}")
+        self.next_seq = base + data.count(b"\n", 0, complete)
+
+    def append(self, record: str) -> int:
+        """Append one record and return its sequence number."""
+        if self.writer is None or self.writer.tell() >= self.segment_bytes:
+            self._roll()
+        line = record.encode() + b"\n"
+        self.writer.write(line)
+        self.writer.flush()
+        if self.fsync:
+            os.fsync(self.writer.fileno())
+        seq = self.next_seq
+        self.next_seq += 1
+        self.stats["appended"] += 1
+        self.stats["appended_bytes"] += len(line)
+        return seq
+
+    def _roll(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+        if not self.segments or self._segment_path(self.segments[-1]).stat().st_size >= self.segment_bytes:
+            self.segments.append(self.next_seq)
+        self.writer = open(self._segment_path(self.segments[-1]), "ab")
+        self._cleanup()
+
+    def register(self, consumer_id: str):
+        """Add a consumer; cursors persisted by earlier runs are kept, new consumers start at the current head."""
+        if consumer_id in self.cursors:
+            return
+        base = self.segments[-1] if self.segments else self.next_seq
+        offset = self._segment_path(base).stat().st_size if self.segments else 0
+        self.cursors[consumer_id] = {"seq": self.next_seq, "segment": base, "offset": offset}
+        self._save_cursor(consumer_id)
+
+    def backlog(self, consumer_id: str) -> int:
+        """Number of records the consumer has not yet committed."""
+        return self.next_seq - self.cursors[consumer_id]["seq"]
+
+    def read(self, consumer_id: str, max_records: int, max_bytes: int) -> Tuple[List[str], Dict[str, int]]:
+        """Read the next batch for a consumer without advancing its cursor."""
+        cursor = dict(self.cursors[consumer_id])
+        if cursor["segment"] not in self.segments and self.segments:
+            if cursor["seq"] < self.segments[0]:
+                # Segment was discarded by the size cap; resume at the oldest retained record
+                lost = self.segments[0] - cursor["seq"]
+                logger.warning(f"⚠️  Uplink {consumer_id} skipped {lost} discarded records")
+                cursor = {"seq": self.segments[0], "segment": self.segments[0], "offset": 0}
+            elif cursor["seq"] in self.segments:
+                # Cursor sat at the end of a consumed segment; continue at the next one
+                cursor = {"seq": cursor["seq"], "segment": cursor["seq"], "offset": 0}
+
+        records: List[str] = []
+        size = 0
+        while len(records) < max_records and size < max_bytes and cursor["seq"] < self.next_seq:
+            path = self._segment_path(cursor["segment"])
+            with open(path, "rb") as f:
+                f.seek(cursor["offset"])
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break
+                    records.append(line[:-1].decode())
+                    size += len(line)
+                    cursor["offset"] += len(line)
+                    cursor["seq"] += 1
+                    if len(records) >= max_records or size >= max_bytes:
+                        break
+
+            index = self.segments.index(cursor["segment"])
+            if len(records) < max_records and size < max_bytes and index + 1 < len(self.segments):
+                cursor["segment"] = self.segments[index + 1]
+                cursor["offset"] = 0
+            else:
+                break
+        return records, cursor
+
+    def commit(self, consumer_id: str, position: Dict[str, int]):
+        """Advance a consumer's cursor after a successful send."""
+        self.cursors[consumer_id] = position
+        self._save_cursor(consumer_id)
+        self._cleanup()
+
+    def _save_cursor(self, consumer_id: str):
+        path = self._cursor_path(consumer_id)
+        temp_path = path.with_suffix(".tmp")
+        with open(temp_path, "w") as f:
+            json.dump(self.cursors[consumer_id], f)
+        os.replace(temp_path, path)
+
+    def _cleanup(self):
+        """Delete fully consumed segments, then enforce the disk cap."""
+        # Without any consumer nothing has been consumed yet
+        oldest_needed = min((cursor["seq"] for cursor in self.cursors.values()), default=-1)
+        while len(self.segments) > 1 and self.segments[1] <= oldest_needed:
+            self._delete_segment(self.segments[0])
+
+        total = sum(self._segment_path(base).stat().st_size for base in self.segments)
+        while len(self.segments) > 1 and total > self.max_bytes:
+            base = self.segments[0]
+            total -= self._segment_path(base).stat().st_size
+            self.stats["records_discarded"] += self.segments[1] - base
+            logger.warning(f"⚠️  Uplink spool over {self.max_bytes} bytes, discarding segment {base}")
+            self._delete_segment(base)
+
+    def _delete_segment(self, base: int):
+        self._segment_path(base).unlink(missing_ok=True)
+        self.segments.remove(base)
+        self.stats["segments_deleted"] += 1
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+def build_columnar_batch(snapshots: List[Dict[str, Any]], first_seq: int) -> Dict[str, Any]:
+    """Pivot snapshots into per-sensor columns, which compress far better than repeated rows."""
+    count = len(snapshots)
+    sensors: Dict[str, Dict[str, Any]] = {}
+    metrics: Dict[str, List[Any]] = {}
+
+    for row, snapshot in enumerate(snapshots):
+        for sensor_id, reading in snapshot.get("sensors", {}).items():
+            column = sensors.get(sensor_id)
+            if column is None:
+                column = sensors[sensor_id] = {
+                    "units": reading.get("units", ""),
+                    "sensor_type": reading.get("sensor_type", "unknown"),
+                    "value": [None] * count,
+                    "quality": [None] * count,
+                    "timestamp": [None] * count
+                }
+            column["value"][row] = reading.get("value")
+            column["quality"][row] = reading.get("quality")
+            column["timestamp"][row] = reading.get("timestamp")
+
+        for name, value in snapshot.get("system_metrics", {}).items():
+            metrics.setdefault(name, [None] * count)[row] = value
+
+    return {
+        "format": "ct087-columnar-v1",
+        "device_id": snapshots[0].get("device_id") if snapshots else None,
+        "first_seq": first_seq,
+        "count": count,
+        "timestamps": [snapshot.get("timestamp") for snapshot in snapshots],
+        "sensors": sensors,
+        "system_metrics": metrics
+    }
+
+def encode_columnar_batch(records: List[str], first_seq: int, encoding: str = "msgpack",
+                          compression: str = "zstd") -> Tuple[bytes, Dict[str, str]]:
+    """Encode serialized snapshots as one compressed columnar batch with its HTTP headers."""
+    batch = build_columnar_batch([json.loads(record) for record in records], first_seq)
+
+    if encoding == "msgpack" and MSGPACK_AVAILABLE:
+        body = msgpack.packb(batch, use_bin_type=True)
+        content_type = "application/msgpack"
+    else:
+        body = json.dumps(batch, separators=(",", ":"), default=str).encode()
+        content_type = "application/json"
+
+    if compression == "zstd" and ZSTD_AVAILABLE:
+        body = zstandard.ZstdCompressor(level=10).compress(body)
+        content_encoding = "zstd"
+    else:
+        # Fixed mtime keeps the output deterministic for identical batches
+        body = gzip.compress(body, compresslevel=6, mtime=0)
+        content_encoding = "gzip"
+
+    headers = {
+        "Content-Type": content_type,
+        "Content-Encoding": content_encoding,
+        "X-Batch-Sequence": f"{first_seq}-{first_seq + len(records) - 1}"
+    }
+    return body, headers
+
+class UplinkPayloadCache:
+    """
+    Encoded and encrypted uplink batches shared across cloud connections.
+
+    Batches are keyed by their spool sequence range, so connections reading
+    the same range (or retrying it) reuse one encoded body, and each distinct
+    encryption key encrypts that body once.
+    """
+
+    def __init__(self, max_entries: int = 32):
+        self.max_entries = max_entries
+        self.encoded: "OrderedDict[str, Tuple[bytes, Dict[str, str]]]" = OrderedDict()
+        self.encrypted: "OrderedDict[Tuple[str, str], bytes]" = OrderedDict()
+        self.ciphers: Dict[str, Any] = {}
+        self.stats = {"encode_hits": 0, "encode_misses": 0, "encrypt_hits": 0, "encrypt_misses": 0}
+
+    def encoded_batch(self, batch_key: str,
+                      build: Callable[[], Tuple[bytes, Dict[str, str]]]) -> Tuple[bytes, Dict[str, str]]:
+        cached = self.encoded.get(batch_key)
+        if cached is not None:
+            self.encoded.move_to_end(batch_key)
+            self.stats["encode_hits"] += 1
+            return cached
+        self.stats["encode_misses"] += 1
+        cached = build()
+        self._remember(self.encoded, batch_key, cached)
+        return cached
+
+    def encrypted_batch(self, batch_key: str, body: bytes, encryption_key: bytes) -> bytes:
+        key_id = hashlib.sha256(encryption_key).hexdigest()[:16]
+        cache_key = (batch_key, key_id)
+        token = self.encrypted.get(cache_key)
+        if token is not None:
+            self.encrypted.move_to_end(cache_key)
+            self.stats["encrypt_hits"] += 1
+            return token
+        self.stats["encrypt_misses"] += 1
+        cipher = self.ciphers.get(key_id)
+        if cipher is None:
+            cipher = self.ciphers[key_id] = Fernet(encryption_key)
+        token = cipher.encrypt(body)
+        self._remember(self.encrypted, cache_key, token)
+        return token
+
+    def _remember(self, cache: OrderedDict, key, value):
+        cache[key] = value
+        while len(cache) > self.max_entries:
+            cache.popitem(last=False)
+
+# Mergeable quantile sketch (log-spaced bins, ~1% relative accuracy) used by the rollups
+SKETCH_RELATIVE_ACCURACY = 0.01
+SKETCH_GAMMA = (1 + SKETCH_RELATIVE_ACCURACY) / (1 - SKETCH_RELATIVE_ACCURACY)
+SKETCH_LOG_GAMMA = np.log(SKETCH_GAMMA)
+SKETCH_MAX_INDEX = 2047
+SKETCH_ZERO = 2 * SKETCH_MAX_INDEX + 1
+SKETCH_SPAN = 8192
+SKETCH_MIN_MAGNITUDE = 1e-9
+
+TIME_WINDOW_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+
+def parse_time_window(window: str) -> float:
+    """Convert a window such as "15m", "24h" or "7d" to seconds."""
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([smhdw])\s*", window)
+    if not match:
+        raise ValueError(f"Invalid time window: {window}")
+    return float(match.group(1)) * TIME_WINDOW_UNITS[match.group(2)]
+
+def sketch_codes(values: np.ndarray) -> np.ndarray:
+    """Map values to ordered sketch bin codes in [0, SKETCH_SPAN)."""
+    magnitude = np.abs(values)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        index = np.ceil(np.log(np.maximum(magnitude, SKETCH_MIN_MAGNITUDE)) / SKETCH_LOG_GAMMA)
+    index = np.clip(index, -SKETCH_MAX_INDEX, SKETCH_MAX_INDEX).astype(np.int64) + SKETCH_MAX_INDEX
+    codes = np.where(values > 0, SKETCH_ZERO + 1 + index, SKETCH_ZERO - 1 - index)
+    return np.where(magnitude < SKETCH_MIN_MAGNITUDE, SKETCH_ZERO, codes)
+
+def sketch_values(codes: np.ndarray) -> np.ndarray:
+    """Representative value of each sketch bin code."""
+    positive = codes > SKETCH_ZERO
+    index = np.where(positive, codes - SKETCH_ZERO - 1, SKETCH_ZERO - 1 - codes) - SKETCH_MAX_INDEX
+    magnitude = 2 * np.power(SKETCH_GAMMA, index.astype(float)) / (SKETCH_GAMMA + 1)
+    return np.where(codes == SKETCH_ZERO, 0.0, np.where(positive, magnitude, -magnitude))
+
+@dataclass
+class RollupBucket:
+    """Pre-aggregated statistics for every sensor over one time bucket."""
+    start: float
+    width: float
+    sensor_ids: List[str]
+    count: np.ndarray
+    mean: np.ndarray
+    m2: np.ndarray
+    minimum: np.ndarray
+    maximum: np.ndarray
+    sketch_keys: np.ndarray  # sensor position * SKETCH_SPAN + sketch code
+    sketch_counts: np.ndarray
+
+def merge_rollup_buckets(buckets: List[RollupBucket], sensor_count: int, width: float = 0.0) -> RollupBucket:
+    """Merge buckets (Chan's parallel mean/variance update and summed sketches)."""
+    count = np.zeros(sensor_count)
+    mean = np.zeros(sensor_count)
+    m2 = np.zeros(sensor_count)
+    minimum = np.full(sensor_count, np.inf)
+    maximum = np.full(sensor_count, -np.inf)
+
+    for bucket in buckets:
+        n = len(bucket.count)
+        total = count[:n] + bucket.count
+        delta = bucket.mean - mean[:n]
+        weight = np.divide(bucket.count, total, out=np.zeros(n), where=total > 0)
+        mean[:n] += delta * weight
+        m2[:n] += bucket.m2 + delta * delta * count[:n] * weight
+        count[:n] = total
+        minimum[:n] = np.fmin(minimum[:n], bucket.minimum)
+        maximum[:n] = np.fmax(maximum[:n], bucket.maximum)
+
+    if buckets:
+        keys, inverse = np.unique(np.concatenate([bucket.sketch_keys for bucket in buckets]), return_inverse=True)
+        counts = np.bincount(inverse, weights=np.concatenate([bucket.sketch_counts for bucket in buckets]))
+    else:
+        keys, counts = np.zeros(0, dtype=np.int64), np.zeros(0)
+
+    return RollupBucket(
+        start=min((bucket.start for bucket in buckets), default=0.0), width=width, sensor_ids=[],
+        count=count, mean=mean, m2=m2, minimum=minimum, maximum=maximum,
+        sketch_keys=keys.astype(np.int64), sketch_counts=counts
+    )
+
+def rollup_percentiles(bucket: RollupBucket, sensor_count: int, percentiles: List[float]) -> np.ndarray:
+    """Percentiles per sensor from a merged sketch; shape (len(percentiles), sensor_count)."""
+    result = np.full((len(percentiles), sensor_count), np.nan)
+    if len(bucket.sketch_keys) == 0:
+        return result
+
+    sensors = bucket.sketch_keys // SKETCH_SPAN
+    codes = bucket.sketch_keys % SKETCH_SPAN
+    cumulative = np.cumsum(bucket.sketch_counts)
+    totals = np.bincount(sensors, weights=bucket.sketch_counts, minlength=sensor_count)[:sensor_count]
+    first = np.searchsorted(sensors, np.arange(sensor_count), side="left")
+    before = np.where(first > 0, cumulative[np.maximum(first - 1, 0)], 0.0)
+
+    has_data = totals > 0
+    for row, percentile in enumerate(percentiles):
+        rank = before + np.floor(percentile / 100.0 * (totals - 1))
+        position = np.minimum(np.searchsorted(cumulative, rank, side="right"), len(codes) - 1)
+        result[row, has_data] = sketch_values(codes[position[has_data]])
+    return result
+
+def load_rollup_bucket(path: Path, sensor_index: Dict[str, int], sensor_ids: List[str]) -> RollupBucket:
+    """Load a persisted hour bucket, remapping its sensors onto (and extending) the given index."""
+    with np.load(path, allow_pickle=False) as data:
+        positions = []
+        for sensor_id in data["sensor_ids"]:
+            sensor_id = str(sensor_id)
+            if sensor_id not in sensor_index:
+                sensor_index[sensor_id] = len(sensor_ids)
+                sensor_ids.append(sensor_id)
+            positions.append(sensor_index[sensor_id])
+        mapping = np.array(positions, dtype=np.int64)
+        size = len(sensor_ids)
+
+        def spread(values, fill):
+            out = np.full(size, fill)
+            out[mapping] = values
+            return out
+
+        keys = data["sketch_keys"].astype(np.int64)
+        return RollupBucket(
+            start=float(data["start"]), width=float(data["width"]), sensor_ids=list(sensor_ids),
+            count=spread(data["count"], 0.0), mean=spread(data["mean"], 0.0), m2=spread(data["m2"], 0.0),
+            minimum=spread(data["minimum"], np.inf), maximum=spread(data["maximum"], -np.inf),
+            sketch_keys=mapping[keys // SKETCH_SPAN] * SKETCH_SPAN + keys % SKETCH_SPAN,
+            sketch_counts=data["sketch_counts"]
+        )
+
+class SensorRollupStore:
+    """
+    Incremental per-sensor rollups for analytics.
+
+    Snapshots are folded into one-minute buckets (count, mean, M2, min, max
+    and a quantile sketch) as they arrive; each completed hour is merged into
+    an hour bucket and persisted, so analytics windows are answered by
+    merging buckets instead of rescanning raw samples.
+    """
+
+    MINUTE = 60.0
+    HOUR = 3600.0
+
+    def __init__(self, rollup_dir: str, retention_days: float = 90, minute_retention_hours: float = 2):
+        self.rollup_dir = Path(rollup_dir)
+        self.rollup_dir.mkdir(parents=True, exist_ok=True)
+        self.retention_seconds = retention_days * 86400
+        self.minute_retention = minute_retention_hours * self.HOUR
+        self.sensor_index: Dict[str, int] = {}
+        self.sensor_ids: List[str] = []
+        self.minute_buckets: List[RollupBucket] = []
+        self.hour_buckets: Dict[float, RollupBucket] = {}
+        self._open_start: Optional[float] = None
+        self._minutes_from = float("inf")  # minute buckets are complete from here on
+        self._reset_open(0)
+        self._load_hours()
+
+    def _reset_open(self, sensor_count: int):
+        self._count = np.zeros(sensor_count)
+        self._mean = np.zeros(sensor_count)
+        self._m2 = np.zeros(sensor_count)
+        self._min = np.full(sensor_count, np.inf)
+        self._max = np.full(sensor_count, -np.inf)
+        self._keys: List[np.ndarray] = []
+
+    def _hour_path(self, start: float) -> Path:
+        return self.rollup_dir / f"hour-{int(start)}.npz"
+
+    def _load_hours(self):
+        cutoff = time.time() - self.retention_seconds
+        for path in sorted(self.rollup_dir.glob("hour-*.npz")):
+            start = float(path.stem.split("-")[1])
+            if start < cutoff:
+                path.unlink(missing_ok=True)
+                continue
+            try:
+                self.hour_buckets[start] = self._load_bucket(path)
+            except Exception as e:
+                logger.warning(f"⚠️  Skipping unreadable rollup {path.name}: {e}")
+
+    def _load_bucket(self, path: Path) -> RollupBucket:
+        return load_rollup_bucket(path, self.sensor_index, self.sensor_ids)
+
+    def _save_bucket(self, bucket: RollupBucket):
+        path = self._hour_path(bucket.start)
+        temp_path = path.with_suffix(".tmp.npz")
+        np.savez_compressed(
+            temp_path, start=bucket.start, width=bucket.width, sensor_ids=np.array(bucket.sensor_ids),
+            count=bucket.count, mean=bucket.mean, m2=bucket.m2, minimum=bucket.minimum, maximum=bucket.maximum,
+            sketch_keys=bucket.sketch_keys.astype(np.int32), sketch_counts=bucket.sketch_counts.astype(np.uint32)
+        )
+        os.replace(temp_path, path)
+
+    def _sensor_position(self, sensor_id: str) -> int:
+        position = self.sensor_index.get(sensor_id)
+        if position is None:
+            position = len(self.sensor_ids)
+            self.sensor_index[sensor_id] = position
+            self.sensor_ids.append(sensor_id)
+        return position
+
+    def ingest(self, sensor_data: Dict[str, Any], timestamp: Optional[float] = None):
+        """Fold one snapshot into the open minute bucket."""
+        timestamp = time.time() if timestamp is None else timestamp
+        minute = timestamp - timestamp % self.MINUTE
+        if self._open_start is None:
+            self._open_start = minute
+            self._minutes_from = minute
+        elif minute != self._open_start:
+            self._close_minute()
+            self._open_start = minute
+
+        sensors = sensor_data.get("sensors", {})
+        positions = [self._sensor_position(sensor_id) for sensor_id in sensors]
+        if len(self.sensor_ids) > len(self._count):
+            grow = len(self.sensor_ids) - len(self._count)
+            self._count = np.concatenate([self._count, np.zeros(grow)])
+            self._mean = np.concatenate([self._mean, np.zeros(grow)])
+            self._m2 = np.concatenate([self._m2, np.zeros(grow)])
+            self._min = np.concatenate([self._min, np.full(grow, np.inf)])
+            self._max = np.concatenate([self._max, np.full(grow, -np.inf)])
+
+        values = np.array([
+            float(reading.get("value")) if isinstance(reading.get("value"), (int, float)) else np.nan
+            for reading in sensors.values()
+        ])
+        valid = ~np.isnan(values)
+        index = np.array(positions, dtype=np.int64)[valid]
+        values = values[valid]
+        if not len(index):
+            return
+
+        # Vectorized Welford update for the sensors present in this snapshot
+        self._count[index] += 1
+        delta = values - self._mean[index]
+        self._mean[index] += delta / self._count[index]
+        self._m2[index] += delta * (values - self._mean[index])
+        self._min[index] = np.minimum(self._min[index], values)
+        self._max[index] = np.maximum(self._max[index], values)
+        self._keys.append(index * SKETCH_SPAN + sketch_codes(values))
+
+    def _open_bucket(self) -> Optional[RollupBucket]:
+        if self._open_start is None or not self._keys:
+            return None
+        keys, counts = np.unique(np.concatenate(self._keys), return_counts=True)
+        return RollupBucket(
+            start=self._open_start, width=self.MINUTE, sensor_ids=list(self.sensor_ids),
+            count=self._count.copy(), mean=self._mean.copy(), m2=self._m2.copy(),
+            minimum=self._min.copy(), maximum=self._max.copy(),
+            sketch_keys=keys, sketch_counts=counts.astype(float)
+        )
+
+    def _close_minute(self):
+        bucket = self._open_bucket()
+        if bucket is not None:
+            # Compact the previous hour once a minute from a new hour closes
+            if self.minute_buckets and bucket.start - bucket.start % self.HOUR > self.minute_buckets[-1].start:
+                self._compact_hours(bucket.start - bucket.start % self.HOUR)
+            self.minute_buckets.append(bucket)
+        self._reset_open(len(self.sensor_ids))
+
+        cutoff = (self._open_start or 0) - self.minute_retention
+        while self.minute_buckets and self.minute_buckets[0].start < cutoff:
+            self.minute_buckets.pop(0)
+        self._minutes_from = max(self._minutes_from, cutoff)
+
+    def _compact_hours(self, before: float):
+        """Merge minute buckets of completed hours into persisted hour buckets."""
+        hours: Dict[float, List[RollupBucket]] = defaultdict(list)
+        for bucket in self.minute_buckets:
+            hour = bucket.start - bucket.start % self.HOUR
+            if hour < before and hour not in self.hour_buckets:
+                hours[hour].append(bucket)
+
+        for hour, buckets in hours.items():
+            merged = merge_rollup_buckets(buckets, len(self.sensor_ids), width=self.HOUR)
+            merged.start = hour
+            merged.sensor_ids = list(self.sensor_ids)
+            self.hour_buckets[hour] = merged
+            self._save_bucket(merged)
+
+        cutoff = before - self.retention_seconds
+        for hour in [hour for hour in self.hour_buckets if hour < cutoff]:
+            del self.hour_buckets[hour]
+            self._hour_path(hour).unlink(missing_ok=True)
+
+    def window_plan(self, start: float, end: float) -> Tuple[List[float], List[RollupBucket], Tuple[float, float]]:
+        """
+        Persisted hour buckets plus in-memory minute buckets covering [start, end).
+
+        An hour that only partly overlaps the window is answered from its
+        minute buckets while they are retained; once they have expired the
+        whole hour bucket is used instead. The span actually covered is
+        returned alongside, widened to that hour's boundaries, or with the
+        start clamped to the oldest retained minute when no hour bucket
+        exists either.
+        """
+        covered = {hour for hour in self.hour_buckets if hour >= start and hour + self.HOUR <= end}
+        covered_start, covered_end = start, end
+        for hour in {start - start % self.HOUR, end - end % self.HOUR}:
+            if hour in covered or hour >= end or max(start, hour) >= self._minutes_from:
+                continue
+            if hour in self.hour_buckets:
+                covered.add(hour)
+                covered_start = min(covered_start, hour)
+                covered_end = max(covered_end, hour + self.HOUR)
+            elif hour <= start:
+                covered_start = min(self._minutes_from, end)
+        if (covered_start, covered_end) != (start, end):
+            logger.info(f"📊 Rollup window adjusted to {datetime.fromtimestamp(covered_start).isoformat()} - "
+                        f"{datetime.fromtimestamp(covered_end).isoformat()}: minute buckets expired")
+        hours = sorted(covered)
+        minutes = list(self.minute_buckets)
+        open_bucket = self._open_bucket()
+        if open_bucket is not None:
+            minutes.append(open_bucket)
+        minutes = [
+            bucket for bucket in minutes
+            if start <= bucket.start < end and bucket.start - bucket.start % self.HOUR not in covered
+        ]
+        return hours, minutes, (covered_start, covered_end)
+
+    def buckets_for_window(self, start: float, end: float) -> List[RollupBucket]:
+        """Buckets covering [start, end): whole hours where possible, minutes elsewhere."""
+        hours, minutes, _ = self.window_plan(start, end)
+        return [self.hour_buckets[hour] for hour in hours] + minutes
+
+def compute_analytics_rollup(buckets: List[RollupBucket], sensor_ids: List[str],
+                             selected_ids: List[str], percentiles: List[float],
+                             window_start: float, window_end: float,
+                             include_trend: bool = False) -> List[Dict[str, Any]]:
+    """Merge window buckets into one row of statistics per sensor."""
+    sensor_count = len(sensor_ids)
+    merged = merge_rollup_buckets(buckets, sensor_count)
+    quantiles = rollup_percentiles(merged, sensor_count, percentiles)
+    std = np.sqrt(np.divide(merged.m2, merged.count - 1, out=np.zeros(sensor_count), where=merged.count > 1))
+
+    slopes = None
+    if include_trend and buckets:
+        # Count-weighted least-squares slope of bucket means, per hour
+        times = np.array([(bucket.start + bucket.width / 2 - window_start) / 3600.0 for bucket in buckets])
+        weights = np.zeros((len(buckets), sensor_count))
+        means = np.zeros((len(buckets), sensor_count))
+        for row, bucket in enumerate(buckets):
+            n = len(bucket.count)
+            weights[row, :n] = bucket.count
+            means[row, :n] = bucket.mean
+        total = weights.sum(axis=0)
+        safe_total = np.where(total > 0, total, 1)
+        t_mean = (weights * times[:, None]).sum(axis=0) / safe_total
+        m_mean = (weights * means).sum(axis=0) / safe_total
+        dt = times[:, None] - t_mean
+        denominator = (weights * dt * dt).sum(axis=0)
+        slopes = np.divide((weights * dt * (means - m_mean)).sum(axis=0), denominator,
+                           out=np.full(sensor_count, np.nan), where=denominator > 0)
+
+    position = {sensor_id: i for i, sensor_id in enumerate(sensor_ids)}
+    rows = []
+    start_text = datetime.fromtimestamp(window_start).isoformat()
+    end_text = datetime.fromtimestamp(window_end).isoformat()
+    for sensor_id in (selected_ids or sensor_ids):
+        i = position.get(sensor_id)
+        if i is None or merged.count[i] == 0:
+            continue
+        row = {
+            "sensor_id": sensor_id,
+            "window_start": start_text,
+            "window_end": end_text,
+            "count": int(merged.count[i]),
+            "min": float(merged.minimum[i]),
+            "max": float(merged.maximum[i]),
+            "mean": float(merged.mean[i]),
+            "std": float(std[i])
+        }
+        for p, percentile in enumerate(percentiles):
+            row[f"p{percentile:g}"] = float(quantiles[p, i])
+        if slopes is not None:
+            row["slope_per_hour"] = float(slopes[i])
+        rows.append(row)
+    return rows
+
+def write_analytics_output(rows: List[Dict[str, Any]], summary: Dict[str, Any], path: str, output_format: str) -> str:
+    """Write rollup rows as json, csv, parquet or xlsx; returns the path written."""
+    if output_format == "json":
+        with open(path, 'w') as f:
+            json.dump(dict(summary, rows=rows), f, indent=2)
+        return path
+
+    if output_format in ("parquet", "xlsx"):
+        try:
+            import pandas as pd
+            frame = pd.DataFrame(rows)
+            if output_format == "parquet":
+                frame.to_parquet(path, index=False)
+            else:
+                frame.to_excel(path, index=False)
+            return path
+        except ImportError as e:
+            logger.warning(f"⚠️  {output_format} export unavailable ({e}), writing CSV instead")
+            path = str(Path(path).with_suffix(".csv"))
+
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()) if rows else ["sensor_id"])
+        writer.writeheader()
+        writer.writerows(rows)
+    return path
+
+CRON_FIELD_RANGES = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 6)]
+CRON_NAMES = {
+    "jan": 1, "feb": 2, "mar": 3, "apr": 4, "may": 5, "jun": 6,
+    "jul": 7, "aug": 8, "sep": 9, "oct": 10, "nov": 11, "dec": 12,
+    "sun": 0, "sunday": 0, "mon": 1, "monday": 1, "tue": 2, "tuesday": 2, "wed": 3, "wednesday": 3,
+    "thu": 4, "thursday": 4, "fri": 5, "friday": 5, "sat": 6, "saturday": 6
+}
+CRON_SHORTCUTS = {"hourly": "0 * * * *", "daily": "0 0 * * *", "weekly": "0 0 * * 1", "monthly": "0 0 1 * *"}
+
+class CronSchedule:
+    """
+    Five-field cron expression (minute hour day-of-month month day-of-week).
+
+    Supports *, lists, ranges, steps and month/day names, plus the legacy
+    DataAnalytics schedules "hourly", "daily_HH:MM" and "weekly_<day>_HH:MM".
+    """
+
+    def __init__(self, schedule: str):
+        self.expression = self.normalize(schedule)
+        fields = self.expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"Invalid cron expression: {schedule}")
+        self.minutes, self.hours, self.days, self.months, self.weekdays = (
+            self._parse_field(field, low, high) for field, (low, high) in zip(fields, CRON_FIELD_RANGES)
+        )
+        self.day_restricted = fields[2] != "*"
+        self.weekday_restricted = fields[4] != "*"
+
+    @staticmethod
+    def normalize(schedule: str) -> str:
+        text = schedule.strip().lower()
+        if text in CRON_SHORTCUTS:
+            return CRON_SHORTCUTS[text]
+        match = re.fullmatch(r"daily_(\d{1,2}):(\d{2})", text)
+        if match:
+            return f"{int(match.group(2))} {int(match.group(1))} * * *"
+        match = re.fullmatch(r"weekly_([a-z]+)_(\d{1,2}):(\d{2})", text)
+        if match and match.group(1) in CRON_NAMES:
+            return f"{int(match.group(3))} {int(match.group(2))} * * {CRON_NAMES[match.group(1)]}"
+        return text
+
+    @staticmethod
+    def _parse_field(field: str, low: int, high: int) -> set:
+        values = set()
+        for part in field.split(","):
+            step = 1
+            if "/" in part:
+                part, step_text = part.split("/", 1)
+                step = int(step_text)
+            if part == "*":
+                start, end = low, high
+            elif "-" in part:
+                start_text, end_text = part.split("-", 1)
+                start, end = CRON_NAMES.get(start_text, None), CRON_NAMES.get(end_text, None)
+                start = int(start_text) if start is None else start
+                end = int(end_text) if end is None else end
+            else:
+                start = CRON_NAMES[part] if part in CRON_NAMES else int(part)
+                end = high if step > 1 else start
+            # Day of week accepts 7 as Sunday
+            limit = 7 if high == 6 else high
+            if not (low <= start <= limit and low <= end <= limit) or step < 1:
+                raise ValueError(f"Cron field out of range: {field}")
+            values.update(value % 7 if high == 6 else value for value in range(start, end + 1, step))
+        return values
+
+    def _day_matches(self, moment: datetime) -> bool:
+        day_match = moment.day in self.days
+        weekday_match = (moment.weekday() + 1) % 7 in self.weekdays
+        if self.day_restricted and self.weekday_restricted:
+            return day_match or weekday_match
+        return day_match and weekday_match
+
+    def next_fire(self, after: datetime) -> datetime:
+        """First matching minute strictly after the given time."""
+        moment = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = moment + timedelta(days=366 * 5)
+        while moment < limit:
+            if moment.month not in self.months:
+                moment = (moment.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+            elif not self._day_matches(moment):
+                moment = moment.replace(hour=0, minute=0) + timedelta(days=1)
+            elif moment.hour not in self.hours:
+                moment = moment.replace(minute=0) + timedelta(hours=1)
+            elif moment.minute not in self.minutes:
+                moment += timedelta(minutes=1)
+            else:
+                return moment
+        raise ValueError(f"Cron expression never fires: {self.expression}")
+
+class CronScheduler:
+    """
+    Heap of cron jobs ordered by next fire time.
+
+    The loop sleeps exactly until the earliest job is due (or a job is added),
+    fires it as a task and reschedules it from the current time, so missed
+    fire times after a stall are not replayed in a burst. A job that is still
+    running when it comes due again is skipped for that slot.
+    """
+
+    def __init__(self, max_sleep: float = 3600.0):
+        self.max_sleep = max_sleep
+        self.schedules: Dict[str, CronSchedule] = {}
+        self.next_fire: Dict[str, datetime] = {}
+        self.heap: List[Tuple[float, int, str]] = []
+        self.running: Dict[str, asyncio.Task] = {}
+        self.wakeup = asyncio.Event()
+        self._counter = 0
+        self.stats = {"fired": 0, "skipped_overlap": 0, "wakeups": 0}
+
+    def add(self, job_id: str, schedule: str, now: Optional[datetime] = None) -> datetime:
+        cron = CronSchedule(schedule)
+        self.schedules[job_id] = cron
+        fire_at = cron.next_fire(now or datetime.now())
+        self._push(job_id, fire_at)
+        self.wakeup.set()
+        return fire_at
+
+    def remove(self, job_id: str):
+        # Heap entries of removed jobs are discarded lazily
+        self.schedules.pop(job_id, None)
+        self.next_fire.pop(job_id, None)
+
+    def _push(self, job_id: str, fire_at: datetime):
+        self.next_fire[job_id] = fire_at
+        self._counter += 1
+        heapq.heappush(self.heap, (fire_at.timestamp(), self._counter, job_id))
+
+    def _discard_stale(self):
+        while self.heap:
+            fire_ts, _, job_id = self.heap[0]
+            fire_at = self.next_fire.get(job_id)
+            if fire_at is not None and fire_at.timestamp() == fire_ts:
+                return
+            heapq.heappop(self.heap)
+
+    async def run(self, callback: Callable[[str], Awaitable[None]], should_continue: Callable[[], bool]):
+        """Fire callback(job_id) for each job when due, until should_continue() is false."""
+        while should_continue():
+            self._discard_stale()
+            delay = self.heap[0][0] - time.time() if self.heap else self.max_sleep
+            if delay > 0:
+                self.wakeup.clear()
+                try:
+                    await asyncio.wait_for(self.wakeup.wait(), min(delay, self.max_sleep))
+                except asyncio.TimeoutError:
+                    pass
+                self.stats["wakeups"] += 1
+                continue
+
+            _, _, job_id = heapq.heappop(self.heap)
+            self._push(job_id, self.schedules[job_id].next_fire(datetime.now()))
+
+            running = self.running.get(job_id)
+            if running is not None and not running.done():
+                self.stats["skipped_overlap"] += 1
+                logger.warning(f"⚠️  Skipping {job_id}: previous run still in progress")
+                continue
+            self.stats["fired"] += 1
+            self.running[job_id] = asyncio.create_task(callback(job_id))
+
+def run_analytics_rollup_job(rollup_dir: str, hour_starts: List[float], minute_buckets: List[RollupBucket],
+                             sensor_ids: List[str], selected_ids: List[str], percentiles: List[float],
+                             window_start: float, window_end: float, include_trend: bool,
+                             summary: Dict[str, Any], path: str, output_format: str) -> Tuple[str, int, int]:
+    """Process-pool entry point: load hour buckets from disk, merge, and write the report."""
+    sensor_ids = list(sensor_ids)
+    sensor_index = {sensor_id: i for i, sensor_id in enumerate(sensor_ids)}
+    buckets = [
+        load_rollup_bucket(Path(rollup_dir) / f"hour-{int(hour)}.npz", sensor_index, sensor_ids)
+        for hour in hour_starts
+    ] + minute_buckets
+
+    rows = compute_analytics_rollup(buckets, sensor_ids, selected_ids, percentiles,
+                                    window_start, window_end, include_trend)
+    summary = dict(summary, sensor_count=len(rows))
+    summary["results"] = {
+        "buckets_merged": len(buckets),
+        "data_points_processed": sum(row["count"] for row in rows)
+    }
+    return write_analytics_output(rows, summary, path, output_format), len(rows), len(buckets)
 
 class RemoteMonitoringEngine:
     """
@@ -187,7 +1862,22 @@ class RemoteMonitoringEngine:
         # Runtime state
         self.monitoring_active = False
         self.websocket_server = None
+        self.websocket_hub: Optional[WebSocketBroadcastHub] = None
+        self.alert_engine: Optional[AlertRuleEngine] = None
+        self.alert_dispatcher: Optional[AlertDispatcher] = None
+        self.smtp_pool: Optional[SmtpConnectionPool] = None
+        self.http_session = None
+        self.uplink_spool: Optional[UplinkSpool] = None
+        self.uplink_event = asyncio.Event()
+        self.uplink_payloads = UplinkPayloadCache()
+        self.rollup_store: Optional[SensorRollupStore] = None
+        self.analytics_scheduler: Optional[CronScheduler] = None
+        self.analytics_executor: Optional[ProcessPoolExecutor] = None
         self.encryption_key = None
+
+        # Shared snapshot produced once per tick for all consumers
+        self.latest_snapshot: Optional[SensorSnapshot] = None
+        self.snapshot_condition = asyncio.Condition()
         
         # ADK Coordination
         self.agent_id = "ct-087-agent-5"
@@ -201,6 +1891,7 @@ class RemoteMonitoringEngine:
         
         self.load_configuration()
         self.initialize_security()
+        self.uplink_payloads.max_entries = self.config.get("cloud_uplink", {}).get("payload_cache_entries", 32)
         logger.info(f"🌐 CT-087 Agent 5 initialized - Remote Monitoring Engine")
     
     def load_configuration(self):
@@ -241,7 +1932,31 @@ class RemoteMonitoringEngine:
                     "timeout": 30
                 }
             },
+            "cloud_uplink": {
+                "spool_dir": "/tmp/ct-087-uplink",
+                "sample_interval": 5.0,
+                "batch_interval": 30.0,
+                "max_batch_records": 500,
+                "max_batch_bytes": 4194304,
+                "encoding": "msgpack",
+                "compression": "zstd",
+                "segment_bytes": 4194304,
+                "max_spool_bytes": 536870912,
+                "fsync": False,
+                "backoff_initial": 1.0,
+                "backoff_max": 300.0,
+                "payload_cache_entries": 32,
+                "simulate_delivery": True
+            },
             "alerting": {
+                "evaluation_interval": 1.0,
+                "simulate_delivery": True,
+                "dispatch": {
+                    "queue_size": 1000,
+                    "workers_per_channel": 2,
+                    "digest_window": 2.0,
+                    "digest_max": 50
+                },
                 "email": {
                     "enabled": True,
                     "smtp_server": "smtp.gmail.com",
@@ -262,11 +1977,16 @@ class RemoteMonitoringEngine:
                     "account_sid": "your-twilio-sid",
                     "auth_token": "your-twilio-token",
                     "from_number": "+1234567890"
+                },
+                "slack": {
+                    "webhook_url": ""
                 }
             },
             "remote_access": {
                 "enabled": True,
+                "websocket_host": "0.0.0.0",
                 "websocket_port": 8765,
+                "websocket_delta_frames": True,
                 "api_port": 8080,
                 "ssl_enabled": True,
                 "ssl_cert_path": "/etc/ssl/ct087/",
@@ -288,6 +2008,10 @@ class RemoteMonitoringEngine:
             "analytics": {
                 "enabled": True,
                 "data_retention_days": 90,
+                "rollup_dir": "/tmp/ct-087-rollups",
+                "minute_retention_hours": 2,
+                "percentiles": [50, 90, 95, 99],
+                "process_workers": 2,
                 "aggregation_intervals": ["1m", "5m", "15m", "1h", "1d"],
                 "export_formats": ["csv", "json", "xlsx"],
                 "scheduled_reports": {
@@ -298,6 +2022,9 @@ class RemoteMonitoringEngine:
                     }
                 }
             },
+            "snapshots": {
+                "interval_seconds": 1.0
+            },
             "mobile_api": {
                 "enabled": True,
                 "version": "v1",
@@ -719,8 +2446,15 @@ class RemoteMonitoringEngine:
         
         self.monitoring_active = True
         
+        # Alert delivery runs in its own workers so slow channels never delay evaluation
+        await self.start_alert_dispatcher()
+        
         # Start all monitoring components
         monitoring_tasks = []
+
+        # Single snapshot producer shared by cloud, alert and WebSocket consumers
+        snapshot_task = asyncio.create_task(self.produce_snapshots())
+        monitoring_tasks.append(snapshot_task)
         
         # Cloud data streaming
         cloud_task = asyncio.create_task(self.stream_to_cloud())
@@ -737,6 +2471,8 @@ class RemoteMonitoringEngine:
         
         # Data analytics
         if self.config["analytics"]["enabled"]:
+            rollup_task = asyncio.create_task(self.collect_analytics_rollups())
+            monitoring_tasks.append(rollup_task)
             analytics_task = asyncio.create_task(self.run_analytics())
             monitoring_tasks.append(analytics_task)
         
@@ -746,28 +2482,179 @@ class RemoteMonitoringEngine:
             logger.error(f"❌ Remote monitoring failed: {e}")
         finally:
             self.monitoring_active = False
+            await self.stop_alert_dispatcher()
     
     async def stream_to_cloud(self):
-        """Stream sensor data to cloud platforms."""
+        """Spool sensor snapshots for the cloud and run one uplink per connection."""
         logger.info("☁️  Starting cloud data streaming...")
         
+        uplink_config = self.config.get("cloud_uplink", {})
+        spool = self.get_uplink_spool()
+        uplink_tasks: Dict[str, asyncio.Task] = {}
+        version = 0
+        
+        # Register every platform before the first append, so data spooled while
+        # a platform is still disconnected is kept for it
+        for connection_id in self.cloud_connections:
+            spool.register(connection_id)
+        
+        try:
+            while self.monitoring_active:
+                try:
+                    # Latest shared snapshot (produced once for all consumers), stored durably first
+                    snapshot = await self.wait_for_snapshot(after_version=version, timeout=10.0)
+                    if snapshot:
+                        version = snapshot.version
+                        spool.append(snapshot.json)
+                        self.uplink_event.set()
+                    
+                    # One store-and-forward uplink per connected platform
+                    for connection_id, connection in self.cloud_connections.items():
+                        if connection.connection_status == "connected" and connection_id not in uplink_tasks:
+                            uplink_tasks[connection_id] = asyncio.create_task(self.run_cloud_uplink(connection))
+                    
+                    # Wait before next data collection
+                    await asyncio.sleep(uplink_config.get("sample_interval", 5.0))
+                    
+                except Exception as e:
+                    logger.error(f"❌ Cloud streaming error: {e}")
+                    await asyncio.sleep(10.0)
+        finally:
+            for task in uplink_tasks.values():
+                task.cancel()
+            await asyncio.gather(*uplink_tasks.values(), return_exceptions=True)
+            spool.close()
+    
+    def get_uplink_spool(self) -> UplinkSpool:
+        """Open the on-disk uplink spool."""
+        if self.uplink_spool is None:
+            uplink_config = self.config.get("cloud_uplink", {})
+            self.uplink_spool = UplinkSpool(
+                uplink_config.get("spool_dir", "/tmp/ct-087-uplink"),
+                segment_bytes=uplink_config.get("segment_bytes", 4 * 1024 * 1024),
+                max_bytes=uplink_config.get("max_spool_bytes", 512 * 1024 * 1024),
+                fsync=uplink_config.get("fsync", False)
+            )
+        return self.uplink_spool
+    
+    async def run_cloud_uplink(self, connection: CloudConnection):
+        """Send spooled snapshots to one connection in batches, replaying the backlog after failures."""
+        uplink_config = self.config.get("cloud_uplink", {})
+        batch_interval = uplink_config.get("batch_interval", 30.0)
+        max_records = uplink_config.get("max_batch_records", 500)
+        max_bytes = uplink_config.get("max_batch_bytes", 4 * 1024 * 1024)
+        backoff_initial = uplink_config.get("backoff_initial", 1.0)
+        backoff_max = uplink_config.get("backoff_max", 300.0)
+        
+        spool = self.get_uplink_spool()
+        spool.register(connection.connection_id)
+        backoff = backoff_initial
+        last_flush = time.monotonic()
+        logger.info(f"📡 Cloud uplink started for {connection.connection_id} "
+                    f"({spool.backlog(connection.connection_id)} records backlog)")
+        
         while self.monitoring_active:
             try:
-                # Simulate getting real-time sensor data
-                sensor_data = await self.collect_current_sensor_data()
+                # Wait until a full batch is pending or the batch interval elapsed
+                pending = spool.backlog(connection.connection_id)
+                remaining = batch_interval - (time.monotonic() - last_flush)
+                if pending == 0 or (pending < max_records and remaining > 0):
+                    self.uplink_event.clear()
+                    try:
+                        await asyncio.wait_for(self.uplink_event.wait(), max(remaining, 1.0) if pending else None)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
                 
-                # Send to each cloud connection
-                for connection_id, connection in self.cloud_connections.items():
-                    if connection.connection_status == "connected":
-                        await self.send_to_cloud(connection, sensor_data)
-                
-                # Wait before next data collection
-                await asyncio.sleep(5.0)  # Send data every 5 seconds
+                records, position = spool.read(connection.connection_id, max_records, max_bytes)
+                first_seq = position["seq"] - len(records)
+                # Encoded once per sequence range, shared by all connections and retries
+                body, headers = self.uplink_payloads.encoded_batch(
+                    f"{first_seq}-{first_seq + len(records) - 1}",
+                    lambda: self.encode_uplink_batch(records, first_seq)
+                )
                 
+                if await self.send_to_cloud(connection, body, headers, len(records)):
+                    spool.commit(connection.connection_id, position)
+                    backoff = backoff_initial
+                    last_flush = time.monotonic()
+                else:
+                    # Keep the cursor; the same batch is retried after an exponential backoff
+                    delay = backoff * random.uniform(0.5, 1.0)
+                    logger.warning(f"⚠️  Uplink {connection.connection_id} failed, "
+                                   f"{pending} records queued, retrying in {delay:.1f}s")
+                    await asyncio.sleep(delay)
+                    backoff = min(backoff * 2, backoff_max)
+                    
+            except asyncio.CancelledError:
+                raise
             except Exception as e:
-                logger.error(f"❌ Cloud streaming error: {e}")
-                await asyncio.sleep(10.0)
+                logger.error(f"❌ Cloud uplink error for {connection.connection_id}: {e}")
+                await asyncio.sleep(backoff)
     
+    def encode_uplink_batch(self, records: List[str], first_seq: int) -> Tuple[bytes, Dict[str, str]]:
+        """Encode spooled snapshots as one compressed columnar batch."""
+        uplink_config = self.config.get("cloud_uplink", {})
+        return encode_columnar_batch(
+            records, first_seq,
+            encoding=uplink_config.get("encoding", "msgpack"),
+            compression=uplink_config.get("compression", "zstd")
+        )
+    
+    def get_uplink_status(self) -> Dict[str, Any]:
+        """Backlog and spool counters per cloud connection."""
+        if self.uplink_spool is None:
+            return {}
+        return {
+            "spool": dict(self.uplink_spool.stats, segments=len(self.uplink_spool.segments)),
+            "payload_cache": dict(self.uplink_payloads.stats),
+            "backlog": {
+                connection_id: self.uplink_spool.backlog(connection_id)
+                for connection_id in self.uplink_spool.cursors
+            }
+        }
+    
+    async def produce_snapshots(self):
+        """Build one shared sensor snapshot per tick and wake waiting consumers."""
+        interval = self.config.get("snapshots", {}).get("interval_seconds", 1.0)
+        logger.info(f"📸 Starting sensor snapshot producer ({interval}s interval)...")
+
+        while self.monitoring_active:
+            try:
+                await self.publish_snapshot(await self.collect_current_sensor_data())
+                await asyncio.sleep(interval)
+
+            except Exception as e:
+                logger.error(f"❌ Snapshot producer error: {e}")
+                await asyncio.sleep(interval)
+
+    async def publish_snapshot(self, sensor_data: Dict[str, Any]) -> SensorSnapshot:
+        """Publish sensor data as the next snapshot version."""
+        async with self.snapshot_condition:
+            version = self.latest_snapshot.version + 1 if self.latest_snapshot else 1
+            self.latest_snapshot = SensorSnapshot(version=version, created_at=datetime.now(), data=sensor_data)
+            self.snapshot_condition.notify_all()
+        return self.latest_snapshot
+
+    async def wait_for_snapshot(self, after_version: int = 0,
+                                timeout: Optional[float] = None) -> Optional[SensorSnapshot]:
+        """Return the latest snapshot newer than after_version, waiting if needed."""
+        snapshot = self.latest_snapshot
+        if snapshot and snapshot.version > after_version:
+            return snapshot
+
+        try:
+            async with self.snapshot_condition:
+                await asyncio.wait_for(
+                    self.snapshot_condition.wait_for(
+                        lambda: self.latest_snapshot is not None and self.latest_snapshot.version > after_version
+                    ),
+                    timeout
+                )
+        except asyncio.TimeoutError:
+            return None
+        return self.latest_snapshot
+
     async def collect_current_sensor_data(self) -> Dict[str, Any]:
         """Collect current sensor data for cloud streaming."""
         try:
@@ -817,66 +2704,69 @@ class RemoteMonitoringEngine:
             logger.error(f"❌ Failed to collect sensor data: {e}")
             return {}
     
-    async def send_to_cloud(self, connection: CloudConnection, data: Dict[str, Any]):
-        """Send data to a specific cloud connection."""
+    async def send_to_cloud(self, connection: CloudConnection, body: bytes,
+                            headers: Dict[str, str], record_count: int) -> bool:
+        """Send one encoded batch to a specific cloud connection."""
         try:
             if connection.platform == CloudPlatform.CUSTOM_API:
-                await self.send_to_custom_api(connection, data)
+                await self.send_to_custom_api(connection, body, headers)
             elif connection.platform == CloudPlatform.AWS_IOT:
-                await self.send_to_aws_iot(connection, data)
+                await self.send_to_aws_iot(connection, body, headers)
             elif connection.platform == CloudPlatform.AZURE_IOT:
-                await self.send_to_azure_iot(connection, data)
+                await self.send_to_azure_iot(connection, body, headers)
             
             # Update connection metrics
-            connection.data_points_sent += 1
+            connection.data_points_sent += record_count
             connection.last_connected = datetime.now()
+            return True
             
         except Exception as e:
             logger.debug(f"Failed to send data to {connection.connection_id}: {e}")
             connection.errors_count += 1
+            return False
     
-    async def send_to_custom_api(self, connection: CloudConnection, data: Dict[str, Any]):
-        """Send data to custom API endpoint."""
-        try:
-            if not HTTP_AVAILABLE:
-                logger.debug("HTTP not available - simulating API send")
-                return
-            
-            headers = {
-                "Authorization": f"Bearer {connection.credentials['api_key']}",
-                "Content-Type": "application/json"
-            }
-            
-            # Encrypt data if encryption is enabled
-            if self.config["security"]["encryption_enabled"] and hasattr(self, 'cipher_suite'):
-                encrypted_data = self.cipher_suite.encrypt(json.dumps(data).encode())
-                payload = {"encrypted_data": base64.b64encode(encrypted_data).decode()}
-            else:
-                payload = data
-            
-            # In production, would make actual HTTP request
-            logger.debug(f"📡 Sent {len(data.get('sensors', {}))} sensor readings to custom API")
-            
-        except Exception as e:
-            logger.debug(f"Custom API send failed: {e}")
+    async def send_to_custom_api(self, connection: CloudConnection, body: bytes, headers: Dict[str, str]):
+        """Send a batch to the custom API endpoint (raises on failure)."""
+        if not HTTP_AVAILABLE:
+            logger.debug("HTTP not available - simulating API send")
+            return
+        
+        headers = dict(headers, Authorization=f"Bearer {connection.credentials['api_key']}")
+        
+        # Encrypt data if encryption is enabled (once per batch and distinct key)
+        encryption_key = self.get_connection_encryption_key(connection)
+        if encryption_key:
+            body = self.uplink_payloads.encrypted_batch(headers["X-Batch-Sequence"], body, encryption_key)
+            headers["X-Payload-Encryption"] = "fernet"
+        
+        if self.config.get("cloud_uplink", {}).get("simulate_delivery", True):
+            logger.debug(f"📡 Sent {headers['X-Batch-Sequence']} ({len(body)} bytes) to custom API (simulated)")
+            return
+        
+        session = await self.ensure_http_session()
+        timeout = aiohttp.ClientTimeout(total=float(connection.credentials.get("timeout", 30)))
+        async with session.post(connection.endpoint, data=body, headers=headers, timeout=timeout) as response:
+            response.raise_for_status()
+        logger.debug(f"📡 Sent {headers['X-Batch-Sequence']} ({len(body)} bytes) to custom API")
     
-    async def send_to_aws_iot(self, connection: CloudConnection, data: Dict[str, Any]):
-        """Send data to AWS IoT Core."""
-        try:
-            # In production, would use AWS IoT SDK
-            logger.debug(f"📡 Sent data to AWS IoT (simulated)")
-            
-        except Exception as e:
-            logger.debug(f"AWS IoT send failed: {e}")
+    def get_connection_encryption_key(self, connection: CloudConnection) -> Optional[bytes]:
+        """Fernet key for a connection: its own key if configured, else the system key."""
+        if not CRYPTO_AVAILABLE or not self.config["security"]["encryption_enabled"]:
+            return None
+        connection_key = connection.credentials.get("encryption_key")
+        if connection_key:
+            return connection_key.encode() if isinstance(connection_key, str) else connection_key
+        return self.encryption_key
     
-    async def send_to_azure_iot(self, connection: CloudConnection, data: Dict[str, Any]):
-        """Send data to Azure IoT Hub."""
-        try:
-            # In production, would use Azure IoT SDK
-            logger.debug(f"📡 Sent data to Azure IoT (simulated)")
-            
-        except Exception as e:
-            logger.debug(f"Azure IoT send failed: {e}")
+    async def send_to_aws_iot(self, connection: CloudConnection, body: bytes, headers: Dict[str, str]):
+        """Send a batch to AWS IoT Core."""
+        # In production, would use AWS IoT SDK
+        logger.debug(f"📡 Sent {len(body)} bytes to AWS IoT (simulated)")
+    
+    async def send_to_azure_iot(self, connection: CloudConnection, body: bytes, headers: Dict[str, str]):
+        """Send a batch to Azure IoT Hub."""
+        # In production, would use Azure IoT SDK
+        logger.debug(f"📡 Sent {len(body)} bytes to Azure IoT (simulated)")
     
     async def monitor_alerts(self):
         """Monitor for alert conditions and send notifications."""
@@ -884,308 +2774,398 @@ class RemoteMonitoringEngine:
         
         while self.monitoring_active:
             try:
-                # Get current sensor data
-                sensor_data = await self.collect_current_sensor_data()
+                # Latest shared snapshot (produced once for all consumers)
+                snapshot = await self.wait_for_snapshot()
+                sensor_data = snapshot.data if snapshot else {}
                 
-                # Check each alert rule
-                for rule_id, rule in self.alert_rules.items():
-                    if rule.enabled:
-                        triggered = await self.evaluate_alert_rule(rule, sensor_data)
-                        if triggered:
-                            await self.send_alert(rule, sensor_data)
+                # Evaluate all compiled rules against the snapshot at once
+                for rule_id in self.get_alert_engine().evaluate(sensor_data):
+                    rule = self.alert_rules.get(rule_id)
+                    if rule and rule.enabled and not self.alert_in_cooldown(rule):
+                        await self.send_alert(rule, sensor_data)
                 
                 # Wait before next check
-                await asyncio.sleep(10.0)  # Check alerts every 10 seconds
+                await asyncio.sleep(self.config["alerting"].get("evaluation_interval", 1.0))
                 
             except Exception as e:
                 logger.error(f"❌ Alert monitoring error: {e}")
                 await asyncio.sleep(30.0)
     
+    def get_alert_engine(self) -> AlertRuleEngine:
+        """Return the compiled alert engine, recompiling when the rule set changed."""
+        if self.alert_engine is None or self.alert_engine.rule_ids != set(self.alert_rules):
+            self.alert_engine = AlertRuleEngine(self.sensor_profiles)
+            self.alert_engine.compile(self.alert_rules)
+        return self.alert_engine
+
+    def alert_in_cooldown(self, rule: AlertRule) -> bool:
+        """Check whether a rule fired within its cooldown period."""
+        if rule.last_triggered:
+            cooldown_elapsed = datetime.now() - rule.last_triggered
+            return cooldown_elapsed.total_seconds() < rule.cooldown_minutes * 60
+        return False
+    
     async def evaluate_alert_rule(self, rule: AlertRule, sensor_data: Dict[str, Any]) -> bool:
         """Evaluate if an alert rule should trigger."""
         try:
-            # Check cooldown period
-            if rule.last_triggered:
-                cooldown_elapsed = datetime.now() - rule.last_triggered
-                if cooldown_elapsed.total_seconds() < rule.cooldown_minutes * 60:
-                    return False
-            
-            # Simple condition evaluation (in production, would use a proper expression parser)
-            for sensor_id in rule.sensor_ids:
-                if sensor_id in sensor_data.get("sensors", {}):
-                    sensor_reading = sensor_data["sensors"][sensor_id]
-                    value = sensor_reading.get("value", 0)
-                    quality = sensor_reading.get("quality", "good")
-                    
-                    # Evaluate conditions based on rule priority
-                    if rule.priority == "critical":
-                        profile = self.sensor_profiles.get(sensor_id, {})
-                        safety_limits = profile.get("safety_limits", {})
-                        
-                        if (quality == "bad" or 
-                            value < safety_limits.get("alarm_low", float('-inf')) or
-                            value > safety_limits.get("alarm_high", float('inf'))):
-                            return True
-                    
-                    elif rule.priority == "warning":
-                        profile = self.sensor_profiles.get(sensor_id, {})
-                        safety_limits = profile.get("safety_limits", {})
-                        
-                        if (quality == "uncertain" or 
-                            value < safety_limits.get("warning_low", float('-inf')) or
-                            value > safety_limits.get("warning_high", float('inf'))):
-                            return True
+            if not rule.enabled or self.alert_in_cooldown(rule):
+                return False
             
-            return False
+            return rule.rule_id in self.get_alert_engine().evaluate(sensor_data)
             
         except Exception as e:
             logger.debug(f"Alert rule evaluation failed: {e}")
             return False
     
     async def send_alert(self, rule: AlertRule, sensor_data: Dict[str, Any]):
-        """Send alert notifications through configured channels."""
+        """Queue alert notifications on the rule's channels (delivery runs in the dispatcher)."""
         try:
             logger.warning(f"🚨 Alert triggered: {rule.name}")
             
             # Update last triggered time
             rule.last_triggered = datetime.now()
             
-            # Send through each configured channel
-            for channel in rule.channels:
-                if channel == AlertChannel.EMAIL:
-                    await self.send_email_alert(rule, sensor_data)
-                elif channel == AlertChannel.WEBHOOK:
-                    await self.send_webhook_alert(rule, sensor_data)
-                elif channel == AlertChannel.SMS:
-                    await self.send_sms_alert(rule, sensor_data)
-                elif channel == AlertChannel.SLACK:
-                    await self.send_slack_alert(rule, sensor_data)
+            if self.alert_dispatcher is None:
+                await self.start_alert_dispatcher()
+            self.alert_dispatcher.enqueue(rule, sensor_data)
             
         except Exception as e:
             logger.error(f"❌ Failed to send alert: {e}")
     
-    async def send_email_alert(self, rule: AlertRule, sensor_data: Dict[str, Any]):
-        """Send email alert notification."""
-        try:
-            if not EMAIL_AVAILABLE or not self.config["alerting"]["email"]["enabled"]:
-                logger.debug("📧 Email alert (simulated)")
-                return
-            
-            email_config = self.config["alerting"]["email"]
-            
-            # Create email message
+    async def start_alert_dispatcher(self):
+        """Create shared delivery sessions and start the per-channel alert workers."""
+        alerting = self.config["alerting"]
+        dispatch_config = alerting.get("dispatch", {})
+        
+        await self.ensure_http_session()
+        if EMAIL_AVAILABLE and self.smtp_pool is None:
+            self.smtp_pool = SmtpConnectionPool(alerting["email"], size=dispatch_config.get("workers_per_channel", 2))
+        
+        self.alert_dispatcher = AlertDispatcher({
+            AlertChannel.EMAIL: self.send_email_alert,
+            AlertChannel.WEBHOOK: self.send_webhook_alert,
+            AlertChannel.SMS: self.send_sms_alert,
+            AlertChannel.SLACK: self.send_slack_alert
+        }, dispatch_config)
+        self.alert_dispatcher.start()
+    
+    async def stop_alert_dispatcher(self):
+        """Drain queued alerts and close shared delivery sessions."""
+        if self.alert_dispatcher is not None:
+            await self.alert_dispatcher.stop()
+        if self.smtp_pool is not None:
+            await self.smtp_pool.close()
+            self.smtp_pool = None
+        if self.http_session is not None:
+            await self.http_session.close()
+            self.http_session = None
+    
+    async def ensure_http_session(self):
+        """Create the HTTP session shared by alert channels and the cloud uplink."""
+        if HTTP_AVAILABLE and self.http_session is None:
+            self.http_session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=self.config["alerting"]["webhook"].get("timeout", 10))
+            )
+        return self.http_session
+    
+    def get_alert_metrics(self) -> Dict[str, Any]:
+        """Alert dispatch queue depth and per-channel send latency."""
+        return self.alert_dispatcher.metrics() if self.alert_dispatcher else {}
+    
+    def alert_sensor_readings(self, event: AlertEvent) -> Dict[str, Any]:
+        """Readings of the sensors covered by the alert's rule."""
+        sensors = event.sensor_data.get("sensors", {})
+        return {sensor_id: sensors[sensor_id] for sensor_id in event.rule.sensor_ids if sensor_id in sensors}
+    
+    async def post_json(self, url: str, payload: Dict[str, Any], retry_attempts: int = 3):
+        """POST a JSON payload on the shared HTTP session, retrying with backoff."""
+        for attempt in range(retry_attempts):
+            try:
+                async with self.http_session.post(url, json=payload) as response:
+                    response.raise_for_status()
+                    return
+            except Exception:
+                if attempt == retry_attempts - 1:
+                    raise
+                await asyncio.sleep(2 ** attempt)
+    
+    async def send_email_alert(self, events: List[AlertEvent]):
+        """Send email alert notifications, one digest per recipient list."""
+        if not EMAIL_AVAILABLE or not self.config["alerting"]["email"]["enabled"]:
+            logger.debug("📧 Email alert (simulated)")
+            return
+        
+        email_config = self.config["alerting"]["email"]
+        
+        # Group the batch by recipients so each mailbox gets one message
+        digests: Dict[Tuple[str, ...], List[AlertEvent]] = defaultdict(list)
+        for event in events:
+            recipients = tuple(recipient for recipient in event.rule.recipients if "@" in recipient)
+            if recipients:
+                digests[recipients].append(event)
+        
+        for recipients, group in digests.items():
             msg = MIMEMultipart()
             msg['From'] = email_config["from_address"]
-            msg['Subject'] = f"CT-087 Alert: {rule.name}"
+            msg['To'] = ", ".join(recipients)
+            if len(group) == 1:
+                msg['Subject'] = f"CT-087 Alert: {group[0].rule.name}"
+            else:
+                msg['Subject'] = f"CT-087 Alert Digest: {len(group)} alerts"
             
             # Create email body
-            body = f"""
-            Alert: {rule.name}
-            
-            Description: {rule.description}
-            Priority: {rule.priority.upper()}
-            Triggered: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-            
-            Sensor Data:
-            {json.dumps(sensor_data.get('sensors', {}), indent=2)}
-            
-            System: CT-087 Auto Sensor Detection System
-            """
-            
+            sections = []
+            for event in group:
+                sections.append(
+                    f"Alert: {event.rule.name}\n"
+                    f"Description: {event.rule.description}\n"
+                    f"Priority: {event.rule.priority.upper()}\n"
+                    f"Triggered: {event.triggered_at.strftime('%Y-%m-%d %H:%M:%S')}\n"
+                    f"Sensor Data:\n{json.dumps(self.alert_sensor_readings(event), indent=2, default=str)}"
+                )
+            body = "\n\n".join(sections) + "\n\nSystem: CT-087 Auto Sensor Detection System\n"
             msg.attach(MIMEText(body, 'plain'))
             
-            # Send to each recipient
-            for recipient in rule.recipients:
-                if "@" in recipient:  # Email address
-                    msg['To'] = recipient
-                    
-                    # In production, would send actual email
-                    logger.info(f"📧 Email alert sent to {recipient}")
-            
-        except Exception as e:
-            logger.debug(f"Email alert failed: {e}")
+            if self.config["alerting"].get("simulate_delivery", True):
+                logger.info(f"📧 Email alert sent to {msg['To']} ({len(group)} alerts, simulated)")
+            else:
+                await self.smtp_pool.send(msg)
+                logger.info(f"📧 Email alert sent to {msg['To']} ({len(group)} alerts)")
     
-    async def send_webhook_alert(self, rule: AlertRule, sensor_data: Dict[str, Any]):
-        """Send webhook alert notification."""
-        try:
-            if not HTTP_AVAILABLE or not self.config["alerting"]["webhook"]["enabled"]:
-                logger.debug("🔗 Webhook alert (simulated)")
-                return
-            
-            webhook_config = self.config["alerting"]["webhook"]
-            
-            # Create webhook payload
-            payload = {
-                "alert_id": str(uuid.uuid4()),
-                "rule_name": rule.name,
-                "description": rule.description,
-                "priority": rule.priority,
-                "timestamp": datetime.now().isoformat(),
-                "sensor_data": sensor_data.get("sensors", {}),
-                "system": "CT-087"
-            }
-            
-            # In production, would make actual webhook request
-            logger.info(f"🔗 Webhook alert sent")
-            
-        except Exception as e:
-            logger.debug(f"Webhook alert failed: {e}")
+    async def send_webhook_alert(self, events: List[AlertEvent]):
+        """Send webhook alert notification (a digest payload for bursts)."""
+        if not HTTP_AVAILABLE or not self.config["alerting"]["webhook"]["enabled"]:
+            logger.debug("🔗 Webhook alert (simulated)")
+            return
+        
+        webhook_config = self.config["alerting"]["webhook"]
+        
+        # Create webhook payload
+        alerts = [{
+            "alert_id": str(uuid.uuid4()),
+            "rule_name": event.rule.name,
+            "description": event.rule.description,
+            "priority": event.rule.priority,
+            "timestamp": event.triggered_at.isoformat(),
+            "sensor_data": self.alert_sensor_readings(event),
+            "system": "CT-087"
+        } for event in events]
+        payload = alerts[0] if len(alerts) == 1 else {"digest": True, "count": len(alerts), "alerts": alerts, "system": "CT-087"}
+        
+        if self.config["alerting"].get("simulate_delivery", True):
+            logger.info(f"🔗 Webhook alert sent ({len(alerts)} alerts, simulated)")
+            return
+        
+        await self.post_json(webhook_config["default_url"], payload, webhook_config.get("retry_attempts", 3))
+        logger.info(f"🔗 Webhook alert sent ({len(alerts)} alerts)")
     
-    async def send_sms_alert(self, rule: AlertRule, sensor_data: Dict[str, Any]):
-        """Send SMS alert notification."""
-        try:
-            if not self.config["alerting"]["sms"]["enabled"]:
-                logger.debug("📱 SMS alert (simulated)")
-                return
-            
-            # Create SMS message
-            message = f"CT-087 Alert: {rule.name} - {rule.priority.upper()} - {datetime.now().strftime('%H:%M:%S')}"
-            
-            # Send to phone numbers in recipients
-            for recipient in rule.recipients:
-                if recipient.startswith("+"):  # Phone number
-                    # In production, would use Twilio or similar SMS service
-                    logger.info(f"📱 SMS alert sent to {recipient}")
-            
-        except Exception as e:
-            logger.debug(f"SMS alert failed: {e}")
+    async def send_sms_alert(self, events: List[AlertEvent]):
+        """Send SMS alert notification, one summary text per phone number."""
+        sms_config = self.config["alerting"]["sms"]
+        if not sms_config["enabled"]:
+            logger.debug("📱 SMS alert (simulated)")
+            return
+        
+        # Create SMS message
+        if len(events) == 1:
+            event = events[0]
+            message = f"CT-087 Alert: {event.rule.name} - {event.rule.priority.upper()} - {event.triggered_at.strftime('%H:%M:%S')}"
+        else:
+            critical = sum(1 for event in events if event.rule.priority == "critical")
+            names = ", ".join(dict.fromkeys(event.rule.name for event in events))
+            message = f"CT-087: {len(events)} alerts ({critical} critical) - {names}"
+        message = message[:160]
+        
+        # Send to phone numbers in recipients
+        recipients = dict.fromkeys(
+            recipient for event in events for recipient in event.rule.recipients if recipient.startswith("+")
+        )
+        for recipient in recipients:
+            if self.config["alerting"].get("simulate_delivery", True) or not HTTP_AVAILABLE:
+                logger.info(f"📱 SMS alert sent to {recipient} (simulated)")
+                continue
+            
+            url = f"https://api.twilio.com/2010-04-01/Accounts/{sms_config['account_sid']}/Messages.json"
+            async with self.http_session.post(
+                url,
+                data={"From": sms_config["from_number"], "To": recipient, "Body": message},
+                auth=aiohttp.BasicAuth(sms_config["account_sid"], sms_config["auth_token"])
+            ) as response:
+                response.raise_for_status()
+            logger.info(f"📱 SMS alert sent to {recipient}")
     
-    async def send_slack_alert(self, rule: AlertRule, sensor_data: Dict[str, Any]):
-        """Send Slack alert notification."""
-        try:
-            # Create Slack message payload
-            payload = {
-                "text": f"🚨 CT-087 Alert: {rule.name}",
-                "attachments": [
-                    {
-                        "color": "danger" if rule.priority == "critical" else "warning",
-                        "fields": [
-                            {"title": "Priority", "value": rule.priority.upper(), "short": True},
-                            {"title": "Time", "value": datetime.now().strftime('%H:%M:%S'), "short": True},
-                            {"title": "Description", "value": rule.description, "short": False}
-                        ]
-                    }
-                ]
-            }
-            
-            # In production, would send to Slack webhook
-            logger.info(f"💬 Slack alert sent")
-            
-        except Exception as e:
-            logger.debug(f"Slack alert failed: {e}")
+    async def send_slack_alert(self, events: List[AlertEvent]):
+        """Send Slack alert notification, one message with an attachment per alert."""
+        # Create Slack message payload
+        payload = {
+            "text": f"🚨 CT-087 Alert: {events[0].rule.name}" if len(events) == 1 else f"🚨 CT-087 Alert Digest: {len(events)} alerts",
+            "attachments": [
+                {
+                    "color": "danger" if event.rule.priority == "critical" else "warning",
+                    "fields": [
+                        {"title": "Alert", "value": event.rule.name, "short": False},
+                        {"title": "Priority", "value": event.rule.priority.upper(), "short": True},
+                        {"title": "Time", "value": event.triggered_at.strftime('%H:%M:%S'), "short": True},
+                        {"title": "Description", "value": event.rule.description, "short": False}
+                    ]
+                }
+                for event in events
+            ]
+        }
+        
+        slack_url = self.config["alerting"].get("slack", {}).get("webhook_url")
+        if self.config["alerting"].get("simulate_delivery", True) or not slack_url or not HTTP_AVAILABLE:
+            logger.info(f"💬 Slack alert sent ({len(events)} alerts, simulated)")
+            return
+        
+        await self.post_json(slack_url, payload, self.config["alerting"]["webhook"].get("retry_attempts", 3))
+        logger.info(f"💬 Slack alert sent ({len(events)} alerts)")
     
     async def start_websocket_server(self):
         """Start WebSocket server for real-time data streaming."""
         try:
-            port = self.config["remote_access"]["websocket_port"]
-            
-            async def handle_client(websocket, path):
-                try:
-                    # Authenticate client (simplified)
-                    await websocket.send(json.dumps({"type": "welcome", "message": "CT-087 Remote Monitoring"}))
-                    
-                    # Stream real-time data
-                    while self.monitoring_active:
-                        sensor_data = await self.collect_current_sensor_data()
-                        await websocket.send(json.dumps({
-                            "type": "sensor_data",
-                            "data": sensor_data
-                        }))
-                        await asyncio.sleep(2.0)  # Send updates every 2 seconds
-                        
-                except Exception as e:
-                    logger.debug(f"WebSocket client error: {e}")
-            
-            # In production, would start actual WebSocket server
-            logger.info(f"🌐 WebSocket server configured for port {port}")
-            
-            # Simulate WebSocket server running
-            while self.monitoring_active:
-                await asyncio.sleep(5.0)
+            remote_access = self.config["remote_access"]
+            host = remote_access.get("websocket_host", "0.0.0.0")
+            port = remote_access["websocket_port"]
+
+            ssl_context = None
+            if remote_access.get("ssl_enabled"):
+                cert_dir = Path(remote_access.get("ssl_cert_path", "/etc/ssl/ct087/"))
+                if (cert_dir / "server.crt").exists():
+                    ssl_context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+                    ssl_context.load_cert_chain(cert_dir / "server.crt", cert_dir / "server.key")
+                else:
+                    logger.warning(f"⚠️  No certificate in {cert_dir}, WebSocket server running without TLS")
+
+            self.websocket_hub = WebSocketBroadcastHub(
+                max_clients=remote_access.get("max_concurrent_sessions", 10),
+                delta_frames=remote_access.get("websocket_delta_frames", True)
+            )
+
+            async with websockets.serve(self.websocket_hub.handle_client, host, port, ssl=ssl_context) as server:
+                self.websocket_server = server
+                logger.info(f"🌐 WebSocket server listening on {host}:{port}")
+
+                # Fan out each new snapshot once to all subscribers
+                version = 0
+                while self.monitoring_active:
+                    snapshot = await self.wait_for_snapshot(after_version=version, timeout=5.0)
+                    if snapshot:
+                        version = snapshot.version
+                        self.websocket_hub.broadcast(snapshot)
+
+            self.websocket_server = None
             
         except Exception as e:
             logger.error(f"❌ WebSocket server failed: {e}")
     
     async def run_analytics(self):
-        """Run data analytics and generate reports."""
-        logger.info("📊 Starting data analytics...")
+        """Run data analytics jobs on their cron schedules."""
+        logger.info("📊 Starting data analytics scheduler...")
+        
+        self.analytics_scheduler = CronScheduler()
+        for analytics_id, analytics in self.data_analytics.items():
+            if analytics.enabled:
+                try:
+                    analytics.next_run = self.analytics_scheduler.add(analytics_id, analytics.schedule)
+                    logger.info(f"📅 {analytics.name} scheduled ({analytics.schedule}), next run {analytics.next_run}")
+                except ValueError as e:
+                    logger.error(f"❌ Invalid schedule for {analytics.name}: {e}")
+        
+        try:
+            await self.analytics_scheduler.run(self.run_scheduled_analytics, lambda: self.monitoring_active)
+        except Exception as e:
+            logger.error(f"❌ Analytics error: {e}")
+        finally:
+            if self.analytics_executor is not None:
+                self.analytics_executor.shutdown(wait=False, cancel_futures=True)
+                self.analytics_executor = None
+    
+    async def run_scheduled_analytics(self, analytics_id: str):
+        """Scheduler callback for one analytics job."""
+        analytics = self.data_analytics.get(analytics_id)
+        if analytics is None:
+            self.analytics_scheduler.remove(analytics_id)
+            return
+        analytics.next_run = self.analytics_scheduler.next_fire.get(analytics_id)
+        await self.run_analytics_job(analytics)
+    
+    def get_analytics_executor(self) -> ProcessPoolExecutor:
+        """Process pool that keeps heavy analytics off the monitoring event loop."""
+        if self.analytics_executor is None:
+            self.analytics_executor = ProcessPoolExecutor(
+                max_workers=self.config["analytics"].get("process_workers", 2)
+            )
+        return self.analytics_executor
+    
+    def get_rollup_store(self) -> SensorRollupStore:
+        """Open the incremental analytics rollup store."""
+        if self.rollup_store is None:
+            analytics_config = self.config["analytics"]
+            self.rollup_store = SensorRollupStore(
+                analytics_config.get("rollup_dir", "/tmp/ct-087-rollups"),
+                retention_days=analytics_config.get("data_retention_days", 90),
+                minute_retention_hours=analytics_config.get("minute_retention_hours", 2)
+            )
+        return self.rollup_store
+    
+    async def collect_analytics_rollups(self):
+        """Fold every shared snapshot into the analytics rollup buckets."""
+        logger.info("📊 Starting analytics rollup collection...")
+        store = self.get_rollup_store()
+        version = 0
         
         while self.monitoring_active:
             try:
-                current_time = datetime.now()
-                
-                # Check each analytics configuration
-                for analytics_id, analytics in self.data_analytics.items():
-                    if analytics.enabled:
-                        should_run = await self.should_run_analytics(analytics, current_time)
-                        if should_run:
-                            await self.run_analytics_job(analytics)
-                
-                # Wait before next check
-                await asyncio.sleep(300.0)  # Check every 5 minutes
-                
+                snapshot = await self.wait_for_snapshot(after_version=version, timeout=5.0)
+                if snapshot:
+                    version = snapshot.version
+                    store.ingest(snapshot.data, snapshot.created_at.timestamp())
+                    
             except Exception as e:
-                logger.error(f"❌ Analytics error: {e}")
-                await asyncio.sleep(600.0)  # Wait 10 minutes on error
-    
-    async def should_run_analytics(self, analytics: DataAnalytics, current_time: datetime) -> bool:
-        """Determine if analytics job should run now."""
-        try:
-            # Check if enough time has passed since last run
-            if analytics.last_run:
-                if analytics.schedule == "hourly":
-                    return (current_time - analytics.last_run).total_seconds() >= 3600
-                elif analytics.schedule.startswith("daily"):
-                    return (current_time - analytics.last_run).total_seconds() >= 86400
-                elif analytics.schedule.startswith("weekly"):
-                    return (current_time - analytics.last_run).total_seconds() >= 604800
-            
-            # For first run, check if it's the right time
-            if analytics.schedule.startswith("daily_"):
-                target_time = analytics.schedule.split("_")[1]
-                return current_time.strftime("%H:%M") == target_time
-            
-            return analytics.last_run is None  # Run if never run before
-            
-        except Exception as e:
-            logger.debug(f"Analytics schedule check failed: {e}")
-            return False
+                logger.error(f"❌ Analytics rollup error: {e}")
+                await asyncio.sleep(5.0)
     
     async def run_analytics_job(self, analytics: DataAnalytics):
         """Run a specific analytics job."""
         try:
             logger.info(f"📊 Running analytics: {analytics.name}")
             
-            # Simulate analytics processing
-            results = {
+            # Merge pre-aggregated buckets for the window instead of rescanning raw samples
+            store = self.get_rollup_store()
+            window_end = time.time()
+            window_start = window_end - parse_time_window(analytics.time_window)
+            hour_starts, minute_buckets, (window_start, window_end) = store.window_plan(window_start, window_end)
+            percentiles = self.config["analytics"].get("percentiles", [50, 90, 95, 99])
+            
+            summary = {
                 "analytics_id": analytics.analytics_id,
                 "name": analytics.name,
                 "run_time": datetime.now().isoformat(),
-                "sensor_count": len(analytics.sensor_ids),
                 "aggregation_method": analytics.aggregation_method,
-                "time_window": analytics.time_window,
-                "results": {
-                    "summary": "Analytics completed successfully",
-                    "data_points_processed": len(analytics.sensor_ids) * 100,  # Simulated
-                    "insights": [
-                        "System operating within normal parameters",
-                        "No significant anomalies detected",
-                        "Performance trending stable"
-                    ]
-                }
+                "time_window": analytics.time_window
             }
-            
-            # Save results
             results_path = f"/tmp/ct-087-analytics-{analytics.analytics_id}-{int(time.time())}.{analytics.output_format}"
-            with open(results_path, 'w') as f:
-                if analytics.output_format == "json":
-                    json.dump(results, f, indent=2)
-                elif analytics.output_format == "csv":
-                    f.write("timestamp,sensor_id,value,quality\\n")
-                    # Would write actual CSV data here
+            
+            # Heavy merge and file output run in a worker process; hour buckets are read from disk there
+            job_args = (
+                str(store.rollup_dir), hour_starts, minute_buckets, list(store.sensor_ids), analytics.sensor_ids,
+                percentiles, window_start, window_end, analytics.aggregation_method == "trend_analysis",
+                summary, results_path, analytics.output_format
+            )
+            loop = asyncio.get_running_loop()
+            try:
+                results_path, sensor_count, bucket_count = await loop.run_in_executor(
+                    self.get_analytics_executor(), run_analytics_rollup_job, *job_args
+                )
+            except BrokenProcessPool:
+                logger.warning("⚠️  Analytics process pool broken, running job in a thread")
+                self.analytics_executor = None
+                results_path, sensor_count, bucket_count = await asyncio.to_thread(run_analytics_rollup_job, *job_args)
                 
             analytics.last_run = datetime.now()
-            logger.info(f"✅ Analytics completed: {analytics.name}")
+            logger.info(f"✅ Analytics completed: {analytics.name} "
+                        f"({sensor_count} sensors, {bucket_count} buckets) -> {results_path}")
             
         except Exception as e:
             logger.error(f"❌ Analytics job failed: {e}")
@@ -1204,6 +3184,8 @@ class RemoteMonitoringEngine:
                     "cloud_platforms": len(self.cloud_connections),
                     "alert_channels": len(set(channel for rule in self.alert_rules.values() for channel in rule.channels))
                 },
+                "alert_dispatch": self.get_alert_metrics(),
+                "cloud_uplink": self.get_uplink_status(),
                 "generated_by": "ct-087-agent-5",
                 "generated_at": datetime.now().isoformat(),
                 "monitoring_status": "active" if self.monitoring_active else "configured",
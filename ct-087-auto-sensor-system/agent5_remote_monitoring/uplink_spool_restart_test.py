@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+CT-087 uplink spool restart test
+
+Spools a backlog for one connection that never manages to send, closes
+the spool and reopens it the way the engine does after a restart: the
+stream loop appends the next snapshot before the uplink task registers
+its connection. Every spooled record must still be delivered in order,
+and records spooled for a platform that is registered but disconnected
+must survive the restart as well.
+
+Usage:
+    python3 uplink_spool_restart_test.py --records 50 --segment-bytes 256
+"""
+
+import sys
+import json
+import tempfile
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+Path("/tmp/ct-087-logs").mkdir(parents=True, exist_ok=True)
+
+from remote_monitoring_engine import UplinkSpool
+
+def record(seq: int) -> str:
+    return json.dumps({"seq": seq, "sensors": {"sensor_001": {"value": seq, "units": "psi"}}})
+
+def drain(spool: UplinkSpool, consumer_id: str, batch_size: int):
+    """Read and commit batches until the consumer has no backlog."""
+    delivered = []
+    while spool.backlog(consumer_id):
+        records, position = spool.read(consumer_id, batch_size, 1 << 20)
+        assert records, f"{consumer_id} has backlog {spool.backlog(consumer_id)} but read nothing"
+        delivered.extend(json.loads(line)["seq"] for line in records)
+        spool.commit(consumer_id, position)
+    return delivered
+
+def run(records: int, segment_bytes: int, batch_size: int):
+    with tempfile.TemporaryDirectory() as spool_dir:
+        # First run: both platforms registered up front, neither delivers anything
+        spool = UplinkSpool(spool_dir, segment_bytes=segment_bytes)
+        for consumer_id in ("aws_iot", "azure_iot"):
+            spool.register(consumer_id)
+        for seq in range(records):
+            spool.append(record(seq))
+        segments_before = len(spool.segments)
+        spool.close()
+
+        # Restart: the stream loop appends before any uplink task registers
+        spool = UplinkSpool(spool_dir, segment_bytes=segment_bytes)
+        spool.append(record(records))
+        for consumer_id in ("aws_iot", "azure_iot"):
+            spool.register(consumer_id)
+
+        expected = list(range(records + 1))
+        for consumer_id in ("aws_iot", "azure_iot"):
+            delivered = drain(spool, consumer_id, batch_size)
+            assert delivered == expected, f"{consumer_id} delivered {len(delivered)}/{len(expected)} records"
+        assert spool.stats["records_discarded"] == 0, "Backlog was discarded by the size cap"
+        segments_after = len(spool.segments)
+        spool.close()
+
+    print(f"Spool restart: {records + 1} records across {segments_before} segments delivered in order "
+          f"to both connections after restart ({segments_after} segment left)")
+
+def main():
+    parser = argparse.ArgumentParser(description="CT-087 uplink spool restart test")
+    parser.add_argument("--records", type=int, default=50, help="Records spooled before the restart")
+    parser.add_argument("--segment-bytes", type=int, default=256, help="Small segments force several files")
+    parser.add_argument("--batch-size", type=int, default=7, help="Records per uplink batch")
+    args = parser.parse_args()
+    run(args.records, args.segment_bytes, args.batch_size)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+CT-087 WebSocket fan-out load test
+
+Starts a local WebSocketBroadcastHub, connects hundreds of clients and
+publishes synthetic sensor snapshots at a fixed rate. Reports fan-out
+latency (snapshot publish -> frame received) per client and hub counters.
+
+Usage:
+    python3 websocket_load_test.py --clients 500 --sensors 200 --rate 5 --duration 20
+"""
+
+import sys
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+from datetime import datetime
+from pathlib import Path
+
+import websockets
+
+sys.path.insert(0, str(Path(__file__).parent))
+Path("/tmp/ct-087-logs").mkdir(parents=True, exist_ok=True)
+
+from remote_monitoring_engine import SensorSnapshot, WebSocketBroadcastHub
+
+def make_sensor_data(sensor_count: int, change_fraction: float, previous=None):
+    """Synthetic snapshot payload; only change_fraction of the sensors move per tick."""
+    sensors = {}
+    for i in range(sensor_count):
+        sensor_id = f"sensor_{i:04d}"
+        old = previous["sensors"][sensor_id] if previous else None
+        value = old["value"] if old and random.random() > change_fraction else round(random.uniform(0, 100), 3)
+        sensors[sensor_id] = {
+            "value": value,
+            "units": "psi",
+            "quality": "good",
+            "timestamp": datetime.now().isoformat(),
+            "sensor_type": "pressure_gauge"
+        }
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "device_id": "ct-087-sensor-system",
+        "sensors": sensors,
+        "system_metrics": {"sensor_count": sensor_count}
+    }
+
+async def run_client(uri, publish_times, latencies, args, index):
+    """Connect, optionally subscribe, and record latency for every frame."""
+    frames = 0
+    async with websockets.connect(uri, max_size=None) as websocket:
+        await websocket.recv()  # welcome
+
+        if random.random() < args.subscribe_fraction:
+            sensors = [f"sensor_{i:04d}" for i in random.sample(range(args.sensors), args.subscribe_size)]
+            await websocket.send(json.dumps({"type": "subscribe", "sensors": sensors, "delta": not args.no_delta}))
+
+        slow = index < args.slow_clients
+        async for message in websocket:
+            received = time.perf_counter()
+            frame = json.loads(message)
+            published = publish_times.get(frame.get("version"))
+            if published is not None:
+                latencies.append(received - published)
+            frames += 1
+            if slow:
+                await asyncio.sleep(args.slow_delay)
+    return frames
+
+async def main(args):
+    hub = WebSocketBroadcastHub(max_clients=args.clients, delta_frames=not args.no_delta)
+    publish_times = {}
+    latencies = []
+
+    async with websockets.serve(hub.handle_client, "127.0.0.1", 0, max_queue=None) as server:
+        port = server.sockets[0].getsockname()[1]
+        uri = f"ws://127.0.0.1:{port}"
+
+        clients = [
+            asyncio.create_task(run_client(uri, publish_times, latencies, args, i))
+            for i in range(args.clients)
+        ]
+        while len(hub.clients) < args.clients:
+            await asyncio.sleep(0.05)
+        print(f"Connected {len(hub.clients)} clients to {uri}")
+
+        data = None
+        interval = 1.0 / args.rate
+        ticks = int(args.duration * args.rate)
+        start = time.perf_counter()
+        for version in range(1, ticks + 1):
+            data = make_sensor_data(args.sensors, args.change_fraction, data)
+            snapshot = SensorSnapshot(version=version, created_at=datetime.now(), data=data)
+            publish_times[version] = time.perf_counter()
+            hub.broadcast(snapshot)
+            await asyncio.sleep(max(0.0, start + version * interval - time.perf_counter()))
+
+        await asyncio.sleep(1.0)
+        for task in clients:
+            task.cancel()
+        frames = await asyncio.gather(*clients, return_exceptions=True)
+
+    received = sum(f for f in frames if isinstance(f, int))
+    latencies.sort()
+
+    def pct(p):
+        return latencies[min(len(latencies) - 1, int(p / 100 * len(latencies)))] * 1000 if latencies else 0.0
+
+    print(f"Snapshots published: {ticks} ({args.sensors} sensors, {args.change_fraction:.0%} changing per tick)")
+    print(f"Frames built:        {hub.stats['frames_built']}")
+    print(f"Frames sent:         {hub.stats['frames_sent']} ({hub.stats['bytes_sent'] / 1e6:.1f} MB)")
+    print(f"Frames dropped:      {hub.stats['frames_dropped']} (slow clients: {args.slow_clients})")
+    print(f"Latency samples:     {len(latencies)}")
+    if latencies:
+        print(f"Fan-out latency ms:  p50 {pct(50):.2f}  p95 {pct(95):.2f}  p99 {pct(99):.2f}  "
+              f"max {latencies[-1] * 1000:.2f}  mean {statistics.mean(latencies) * 1000:.2f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="WebSocket broadcast hub load test")
+    parser.add_argument("--clients", type=int, default=300)
+    parser.add_argument("--sensors", type=int, default=200)
+    parser.add_argument("--rate", type=float, default=5.0, help="snapshots per second")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds")
+    parser.add_argument("--change-fraction", type=float, default=0.1)
+    parser.add_argument("--subscribe-fraction", type=float, default=0.5)
+    parser.add_argument("--subscribe-size", type=int, default=20)
+    parser.add_argument("--slow-clients", type=int, default=10)
+    parser.add_argument("--slow-delay", type=float, default=1.0)
+    parser.add_argument("--no-delta", action="store_true")
+    asyncio.run(main(parser.parse_args()))